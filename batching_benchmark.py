@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+동시 쿼리 마이크로 배칭 성능 비교 프로그램
+쿼리마다 Ollama에 요청을 따로 보내는 방식과 MicroBatcher로 동시 쿼리를 묶는 방식의
+단일 쿼리 지연시간과 동시 요청 처리량을 비교합니다. (--rerank 지정 시 cross-encoder 리랭킹도 비교)
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from langchain_core.documents import Document
+
+from src.embeddings.ollama_embeddings import OllamaEmbeddings
+
+
+def make_queries(count: int) -> List[str]:
+    """서로 다른 쿼리 (같은 쿼리는 singleflight로 합쳐지므로 배칭 효과만 보려면 모두 달라야 함)"""
+    topics = ["회의 일정", "프로젝트 회고", "독서 메모", "운동 기록", "여행 계획", "할 일 목록", "아이디어", "장보기"]
+    return [f"{topics[i % len(topics)]} {i}번째 질문" for i in range(count)]
+
+
+def measure(name: str, func: Callable[[str], object], queries: List[str], concurrency: int) -> dict:
+    """단일 쿼리 지연시간(순차)과 동시 요청 처리량 측정"""
+    latencies = []
+    for query in queries[:10]:
+        start_time = time.perf_counter()
+        func(f"{query} (단일)")
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    latencies.sort()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(func, queries))
+    elapsed = time.perf_counter() - start_time
+
+    stats = {
+        "single_p50_ms": round(latencies[len(latencies) // 2], 1),
+        "concurrent_seconds": round(elapsed, 3),
+        "queries_per_second": round(len(queries) / elapsed, 1),
+    }
+    print(f"  {name:<10} 단일 p50 {stats['single_p50_ms']}ms, "
+          f"동시 {concurrency}개: {len(queries)}개 쿼리 {elapsed:.2f}초 ({stats['queries_per_second']}개/초)")
+    return stats
+
+
+def compare(label: str, unbatched: Callable[[str], object], batched: Callable[[str], object],
+            queries: List[str], concurrency: int) -> dict:
+    print(f"\n📊 {label}")
+    results = {
+        "unbatched": measure("개별 요청", unbatched, queries, concurrency),
+        "batched": measure("배칭", batched, queries, concurrency),
+    }
+    results["throughput_gain"] = round(
+        results["batched"]["queries_per_second"] / results["unbatched"]["queries_per_second"], 2
+    )
+    print(f"  ⚡ 처리량 {results['throughput_gain']}배")
+    return results
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="동시 쿼리 마이크로 배칭 성능 비교")
+    parser.add_argument("--concurrency", type=int, default=24, help="동시 요청 수")
+    parser.add_argument("--queries", type=int, default=240, help="처리량 측정에 쓸 쿼리 수")
+    parser.add_argument("--rerank", action="store_true", help="cross-encoder 리랭킹도 비교")
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    embeddings = OllamaEmbeddings()
+    results = {
+        "embed_query": compare(
+            "쿼리 임베딩 (Ollama)",
+            lambda query: embeddings._embed_batch([query])[0],
+            embeddings.embed_query,
+            queries, args.concurrency,
+        )
+    }
+    print(f"  묶음 통계: {embeddings.batch_stats()}")
+
+    if args.rerank:
+        from src.reranking.cross_encoder_reranker import CrossEncoderReranker
+
+        reranker = CrossEncoderReranker(cache_size=0)
+        candidates = [Document(page_content=f"{query}에 대한 노트 내용입니다.", metadata={"chunk_id": str(i)})
+                      for i, query in enumerate(queries[:20])]
+
+        def rerank_unbatched(query: str):
+            pairs = [[query, doc.page_content] for doc in candidates]
+            return reranker.cross_encoder.predict(pairs, batch_size=reranker.batch_size, show_progress_bar=False)
+
+        results["rerank"] = compare(
+            "리랭킹 (후보 20개)",
+            rerank_unbatched,
+            lambda query: reranker.rerank(query, candidates, top_k=5),
+            queries, args.concurrency,
+        )
+        print(f"  묶음 통계: {reranker.batch_stats()}")
+
+    with open("batching_results.json", "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print("\n💾 상세 결과가 batching_results.json에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
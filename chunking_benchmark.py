@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+청크 표현 방식 성능 비교 프로그램
+청크마다 pydantic Chunk와 메타데이터 사본을 만드는 기존 방식과 컬럼형 ChunkBatch의
+청크 분할 시간과 청크당 메모리를 10만 개 이상의 청크로 비교합니다.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import List
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.schemas.document import Document, Chunk
+from src.graphs.nodes.chunking_node import chunk_documents
+
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+
+def make_documents(num_documents: int, sections_per_document: int) -> List[Document]:
+    """섹션 수로 청크 수를 조절한 합성 노트 (실제 볼트와 비슷한 메타데이터 포함)"""
+    paragraph = "옵시디언 노트에 적어 둔 회의 내용과 할 일 목록, 참고 링크를 정리한 문단입니다. " * 5
+    documents = []
+    for i in range(num_documents):
+        note_id = f"projects/folder_{i % 50}/note_{i}.md"
+        content = "\n\n".join(f"## 섹션 {j}\n{paragraph}" for j in range(sections_per_document))
+        documents.append(Document(
+            id=note_id,
+            content=content,
+            metadata={
+                "id": note_id,
+                "title": f"note_{i}",
+                "source": f"/vault/{note_id}",
+                "folder": f"projects/folder_{i % 50}",
+                "tags": "회의, 프로젝트, 할일",
+                "create_date": "2024-01-01",
+                "modified_date": "2024-06-01",
+                "word_count": len(content.split()),
+            },
+            created_at="2024-01-01",
+        ))
+    return documents
+
+
+def legacy_chunk_documents(documents: List[Document]) -> List[Chunk]:
+    """기존 방식: 청크마다 메타데이터를 복사한 pydantic Chunk 생성"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+    chunks = []
+    for doc in documents:
+        text_chunks = splitter.split_text(doc.content)
+        total_chunks = len(text_chunks)
+        for idx, chunk_text in enumerate(text_chunks):
+            chunk_id = f"{doc.id}#chunk_{idx}"
+            chunks.append(Chunk(
+                id=chunk_id,
+                content=chunk_text,
+                document_id=doc.id,
+                chunk_index=idx,
+                metadata={**doc.metadata, "chunk_id": chunk_id, "chunk_index": idx, "total_chunks": total_chunks},
+            ))
+    return chunks
+
+
+def columnar_chunk_documents(documents: List[Document]):
+    """새 방식: 컬럼형 ChunkBatch"""
+    return chunk_documents(documents, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+
+def measure(name: str, func, documents: List[Document]) -> dict:
+    """실행 시간과 결과가 차지하는 메모리 측정 (시간 측정과 메모리 측정은 따로 실행)"""
+    gc.collect()
+    start_time = time.perf_counter()
+    result = func(documents)
+    elapsed = time.perf_counter() - start_time
+    num_chunks = len(result)
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(documents)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+
+    stats = {
+        "chunks": num_chunks,
+        "seconds": round(elapsed, 3),
+        "chunks_per_second": round(num_chunks / elapsed),
+        "retained_mb": round(retained / 1024 / 1024, 1),
+        "bytes_per_chunk": round(retained / num_chunks),
+    }
+    print(f"  {name:<10} 청크 {num_chunks:,}개, {elapsed:.2f}초 ({stats['chunks_per_second']:,}개/초), "
+          f"메모리 {stats['retained_mb']}MB (청크당 {stats['bytes_per_chunk']:,} bytes)")
+    return stats
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="청크 표현 방식 성능 비교")
+    parser.add_argument("--documents", type=int, default=5000, help="합성 노트 수")
+    parser.add_argument("--sections-per-document", type=int, default=48, help="노트당 섹션 수 (섹션 2개가 대략 청크 1개)")
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents, args.sections_per_document)
+    print(f"📄 합성 노트 {len(documents):,}개로 청크 분할 비교")
+
+    results = {
+        "legacy": measure("pydantic", legacy_chunk_documents, documents),
+        "columnar": measure("columnar", columnar_chunk_documents, documents),
+    }
+    legacy, columnar = results["legacy"], results["columnar"]
+    results["speedup"] = round(legacy["seconds"] / columnar["seconds"], 2)
+    results["memory_saving_ratio"] = round(1 - columnar["bytes_per_chunk"] / legacy["bytes_per_chunk"], 3)
+
+    print(f"\n⚡ 속도 {results['speedup']}배, 청크당 메모리 {results['memory_saving_ratio']:.1%} 절감")
+
+    with open("chunking_results.json", "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print("💾 상세 결과가 chunking_results.json에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Qwen3 임베딩 차원 축소(Matryoshka) 성능 비교 프로그램
+전체 차원 대비 256 / 512 / 1024 / 2048 차원의 recall@k, 검색 시간, 메모리 사용량을 비교합니다.
+문서는 전체 차원으로 한 번만 임베딩하고, 각 차원은 앞부분을 잘라 재정규화해서 평가합니다.
+"""
+import os
+import time
+import json
+from typing import List, Dict, Any
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.embeddings.ollama_embeddings import OllamaEmbeddings, truncate_embedding
+from src.obsidian.obsidian_loader import process_obsidian_vault
+from embedding_benchmark import EmbeddingBenchmark
+
+load_dotenv()
+
+
+class DimensionBenchmark:
+    """임베딩 차원별 recall / 지연시간 비교 클래스"""
+
+    def __init__(self, vault_path: str, dims: List[int] = None, k: int = 10):
+        self.vault_path = vault_path
+        self.dims = dims or [256, 512, 1024, 2048]
+        self.k = k
+        self.queries = [case["query"] for case in EmbeddingBenchmark(vault_path).test_queries]
+
+    @staticmethod
+    def _to_matrix(embeddings: List[List[float]], dim: int = None) -> np.ndarray:
+        """차원 축소 후 행렬로 변환"""
+        return np.asarray([truncate_embedding(e, dim) for e in embeddings], dtype=np.float32)
+
+    def _top_k(self, doc_matrix: np.ndarray, query_vector: np.ndarray) -> List[int]:
+        """코사인 유사도 상위 k개 문서 인덱스"""
+        scores = doc_matrix @ query_vector
+        k = min(self.k, len(scores))
+        rows = np.argpartition(-scores, k - 1)[:k]
+        return rows[np.argsort(-scores[rows])].tolist()
+
+    def run_benchmark(self) -> Dict[str, Any]:
+        """벤치마크 실행"""
+        print("📚 옵시디언 노트 로딩 중...")
+        documents = process_obsidian_vault(self.vault_path)
+        texts = [doc["content"] for doc in documents]
+
+        embeddings = OllamaEmbeddings()
+        print(f"\n🤖 {len(texts)}개 청크 전체 차원 임베딩 중...")
+        start_time = time.time()
+        doc_embeddings = embeddings.embed_documents(texts)
+        embed_time = time.time() - start_time
+        query_embeddings = [embeddings.embed_query(query) for query in self.queries]
+
+        full_dim = len(doc_embeddings[0])
+        full_docs = self._to_matrix(doc_embeddings)
+        full_queries = self._to_matrix(query_embeddings)
+        ground_truth = [set(self._top_k(full_docs, q)) for q in full_queries]
+
+        results = {"full_dim": full_dim, "chunks": len(texts), "embed_time": embed_time, "dims": {}}
+
+        for dim in self.dims + [full_dim]:
+            if dim > full_dim:
+                continue
+
+            doc_matrix = self._to_matrix(doc_embeddings, dim)
+            query_matrix = self._to_matrix(query_embeddings, dim)
+
+            recalls = []
+            start_time = time.time()
+            for query_vector, truth in zip(query_matrix, ground_truth):
+                found = set(self._top_k(doc_matrix, query_vector))
+                recalls.append(len(found & truth) / len(truth))
+            search_time = (time.time() - start_time) / len(query_matrix)
+
+            results["dims"][dim] = {
+                "recall": sum(recalls) / len(recalls),
+                "avg_search_time": search_time,
+                "index_bytes": int(doc_matrix.nbytes),
+            }
+
+        return results
+
+    def print_summary(self, results: Dict[str, Any]):
+        """결과 요약 출력"""
+        print("=" * 60)
+        print(f"📊 차원별 비교 (청크 {results['chunks']}개, 전체 차원 {results['full_dim']}, recall@{self.k})")
+        print("=" * 60)
+        for dim, data in results["dims"].items():
+            print(f"  {dim:>5}차원: recall {data['recall']:.3f}, "
+                  f"검색 {data['avg_search_time'] * 1000:.2f}ms, "
+                  f"인덱스 {data['index_bytes'] / 1024 / 1024:.1f}MB")
+
+    def save_results(self, results: Dict[str, Any], output_file: str = "dimension_results.json"):
+        """결과를 JSON 파일로 저장"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 상세 결과가 {output_file}에 저장되었습니다.")
+
+
+def main():
+    """메인 함수"""
+    vault_path = "/Users/mrbluesky/Documents/memo"  # 옵시디언 볼트 경로
+
+    if not os.path.exists(vault_path):
+        print(f"❌ 옵시디언 볼트를 찾을 수 없습니다: {vault_path}")
+        return
+
+    benchmark = DimensionBenchmark(vault_path)
+    results = benchmark.run_benchmark()
+    benchmark.print_summary(results)
+    benchmark.save_results(results)
+
+
+if __name__ == "__main__":
+    main()
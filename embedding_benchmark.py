@@ -81,7 +81,7 @@ class EmbeddingBenchmark:
             import shutil
             shutil.rmtree(google_db_path)
 
-        google_db = VectorDB(google_db_path, embedding_type="google")
+        google_db = VectorDB(google_db_path, embedding_type="google", semantic_cache_threshold=None)
         start_time = time.time()
         google_db.add_documents(documents)
         google_setup_time = time.time() - start_time
@@ -93,7 +93,7 @@ class EmbeddingBenchmark:
             import shutil
             shutil.rmtree(kosimcse_db_path)
 
-        kosimcse_db = VectorDB(kosimcse_db_path, embedding_type="kosimcse")
+        kosimcse_db = VectorDB(kosimcse_db_path, embedding_type="kosimcse", semantic_cache_threshold=None)
         start_time = time.time()
         kosimcse_db.add_documents(documents)
         kosimcse_setup_time = time.time() - start_time
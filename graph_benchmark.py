@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+LangGraph 그래프 생성 오버헤드 비교 프로그램
+쿼리마다 그래프를 새로 빌드/컴파일하던 방식과 모듈 캐시된 컴파일 그래프를 재사용하는 방식의 쿼리당 오버헤드를 비교합니다.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.graphs.query_graph import create_query_graph, get_query_graph
+from src.graphs.indexing_graph import create_indexing_graph, get_indexing_graph
+from src.schemas.query import QueryState, Query
+
+
+def measure(label: str, fn, iterations: int) -> float:
+    """fn을 iterations번 실행한 평균 시간(ms)"""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    avg_ms = (time.perf_counter() - start_time) * 1000 / iterations
+    print(f"  {label:<28} {avg_ms:8.3f}ms")
+    return avg_ms
+
+
+def main():
+    """메인 함수"""
+    iterations = 200
+
+    print(f"⏱️ 그래프 준비 오버헤드 (평균, {iterations}회)")
+    rebuild_query = measure("쿼리 그래프 매번 컴파일", create_query_graph, iterations)
+    cached_query = measure("쿼리 그래프 캐시 재사용", get_query_graph, iterations)
+    rebuild_index = measure("인덱싱 그래프 매번 컴파일", create_indexing_graph, iterations)
+    cached_index = measure("인덱싱 그래프 캐시 재사용", get_indexing_graph, iterations)
+
+    print(f"\n🚀 쿼리당 절감: {rebuild_query - cached_query:.3f}ms, "
+          f"인덱싱 실행당 절감: {rebuild_index - cached_index:.3f}ms")
+
+    # 벡터DB가 있으면 공유 그래프로 동시 실행까지 확인
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "./obsidian_vectordb"
+    if not os.path.exists(db_path):
+        return
+
+    graph = get_query_graph()
+    config = {"configurable": {"db_path": db_path}}
+    queries = ["회의 일정", "프로젝트 아이디어", "파이썬 문법", "버그 수정"] * 4
+
+    def run(query_text: str):
+        return graph.invoke(QueryState(query=Query(text=query_text, top_k=5)), config=config)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(run, queries))
+    elapsed = time.perf_counter() - start_time
+
+    errors = [r["error"] for r in results if r.get("error")]
+    print(f"\n🧵 공유 그래프 동시 실행: {len(queries)}개 쿼리, {elapsed:.2f}초, 에러 {len(errors)}개")
+
+
+if __name__ == "__main__":
+    main()
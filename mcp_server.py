@@ -4,7 +4,13 @@
 Claude Code에서 옵시디언 노트를 검색하고 조회할 수 있게 해주는 MCP 서버
 """
 import asyncio
+import contextlib
+import json
 import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
 from pathlib import Path
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
@@ -12,9 +18,26 @@ from mcp.types import ServerCapabilities
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 import frontmatter
+from langchain_core.documents import Document
 
-from src.vectorstore.vector_db import VectorDB
+from src.vectorstore.vector_db import VectorDB, replace_index_directory
+from src.vectorstore.sharded_db import ShardedVectorDB, PartialShardResults, load_shard_configs
+from src.graphs.query_graph import aquery_obsidian
+from src.retrieval.lexical_index import get_lexical_index
+from src.reranking.cross_encoder_reranker import get_shared_reranker
+from src.reranking.cascade import CascadeReranker
 from src.obsidian.obsidian_loader import process_obsidian_vault, clean_text
+from src.obsidian.note_index import (
+    NoteIndexStore, find_text_offset, line_bounds, read_lines, read_range, utf8_boundary
+)
+from src.utils.result_cache import ResultCache, make_cache_key
+from src.utils.singleflight import SingleFlight
+from src.utils.cursor_store import CursorStore, CursorExpiredError
+from src.utils.warmup import Warmup
+from src.utils.client_limiter import ClientLimiter
+from src.utils.metrics import metrics
+from src.utils.perf_stats import performance_stats
+from src.utils.admission import get_embedding_admission
 from src.logging.logger_factory import LoggerFactory, init_logging
 
 # 로깅 초기화
@@ -30,16 +53,79 @@ VAULT_PATH = "/Users/mrbluesky/Documents/memo"  # 옵시디언 볼트 경로
 VECTORDB_PATH = os.path.expanduser("~/obsidian_vectordb")
 # 임베딩 타입 설정 ("google" 또는 "kosimcse" 또는 "ollama")
 EMBEDDING_TYPE = os.getenv("EMBEDDING_TYPE", "ollama")
+# 벡터 양자화 설정 ("int8" 또는 "binary", 미설정 시 비압축)
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION") or None
+# 임베딩 출력 차원 (ollama Qwen3 전용, 예: 256, 512, 1024. 미설정 시 인덱스 기록값 또는 전체 차원)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM")) if os.getenv("EMBEDDING_DIM") else None
+# 멀티 볼트 샤드 설정 파일 (설정 시 VAULT_PATH/VECTORDB_PATH 대신 샤드별 볼트/벡터DB 사용)
+SHARDS_CONFIG = os.getenv("OBSIDIAN_SHARDS_CONFIG")
+# 근사 중복 쿼리 캐시 임계값 (코사인 유사도, 지정할 때만 사용)
+SEMANTIC_CACHE_THRESHOLD = (float(os.getenv("SEMANTIC_CACHE_THRESHOLD"))
+                            if os.getenv("SEMANTIC_CACHE_THRESHOLD", "").lower() not in ("", "off") else None)
+# 검색 결과 캐시 크기 (0이면 캐시 사용 안 함)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+# cross-encoder 리랭킹 사용 여부
+USE_RERANKING = os.getenv("USE_RERANKING", "").lower() in ("1", "true", "yes")
+# 워밍업이 끝나지 않았을 때 도구가 기다리는 최대 시간 (초과하면 준비 상태를 응답)
+WARMUP_WAIT_SECONDS = float(os.getenv("WARMUP_WAIT_SECONDS", "2.0"))
+# 검색 한 번에 순위를 매겨 두는 후보 수 (다음 페이지는 커서로 이 목록에서 잘라서 반환)
+SEARCH_POOL_SIZE = int(os.getenv("SEARCH_POOL_SIZE", "50"))
+# 후보 목록 중 cross-encoder로 리랭킹하는 상위 후보 수 (나머지는 융합 순서 유지, 리랭킹 시간 제한 안에 들도록)
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+# 리랭킹에 적응형 캐스케이드 사용 여부 (dense 점수 차이가 뚜렷하면 생략, 경합이 많으면 후보 확대)
+RERANK_CASCADE = os.getenv("RERANK_CASCADE", "").lower() in ("1", "true", "yes")
+# 캐스케이드 리랭킹의 쿼리당 지연시간 예산 (ms, 넘으면 남은 후보는 융합 순서 유지)
+RERANK_LATENCY_BUDGET_MS = float(os.getenv("RERANK_LATENCY_BUDGET_MS", "300"))
+# 하이브리드 검색 브랜치 공통 마감 (초, 넘긴 브랜치는 빠지고 결과는 캐시하지 않음: 콜드 스타트/대량 인덱싱 중 쿼리 임베딩도 기다리도록 넉넉히)
+RETRIEVAL_DEADLINE = float(os.getenv("RETRIEVAL_DEADLINE", "10.0"))
+# 노트 조회 한 번에 돌려주는 최대 바이트 수 (넘으면 잘라서 이어 읽을 위치를 알려줌)
+NOTE_MAX_BYTES = int(os.getenv("NOTE_MAX_BYTES", "20000"))
+# 노트 헤딩/줄 오프셋 인덱스 저장 경로 (벡터DB 디렉터리와 분리: 새로고침 교체, 디스크 통계, 샤드 모드와 무관)
+NOTE_INDEX_PATH = os.path.expanduser(os.getenv("NOTE_INDEX_PATH") or "~/obsidian_note_index")
+# 서버 전송 방식 ("stdio": 클라이언트마다 프로세스 실행, "http": 상주 서버 하나를 여러 클라이언트가 공유)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio").lower()
+# HTTP 모드 바인드 주소/포트 (엔드포인트: http://<host>:<port>/mcp)
+MCP_HTTP_HOST = os.getenv("MCP_HTTP_HOST", "127.0.0.1")
+MCP_HTTP_PORT = int(os.getenv("MCP_HTTP_PORT", "8765"))
+# 클라이언트(세션) 하나가 동시에 실행할 수 있는 도구 호출 수 (넘으면 대기)
+MCP_CLIENT_CONCURRENCY = int(os.getenv("MCP_CLIENT_CONCURRENCY", "4"))
+
+# 검색 응답 캐시 (인덱스 버전이 바뀌면 자동 무효화)
+search_cache = ResultCache(max_entries=SEARCH_CACHE_SIZE, name="search")
+# 진행 중인 동일 검색 합치기
+search_flight = SingleFlight("search")
+# 검색/목록 페이지네이션 커서
+cursor_store = CursorStore()
+# 노트별 헤딩/줄 오프셋 인덱스 (섹션/범위 조회용)
+note_index_store = NoteIndexStore(NOTE_INDEX_PATH)
+# 클라이언트별 동시 도구 호출 제한
+client_limiter = ClientLimiter(max_concurrent=MCP_CLIENT_CONCURRENCY)
 
 # 벡터DB 인스턴스 (지연 로딩)
 db = None
+# 워밍업 스레드와 도구 호출이 동시에 초기화하지 않도록 보호
+_db_lock = threading.Lock()
+# 동시에 들어온 새로고침 요청이 서로의 재구축 디렉터리를 교체하지 않도록 보호
+_refresh_lock = threading.Lock()
 
 def ensure_vectordb():
     """벡터DB 초기화 (필요시)"""
+    with _db_lock:
+        return _ensure_vectordb()
+
+
+def _ensure_vectordb():
     global db
-    if db is None:
+    if db is None and SHARDS_CONFIG:
+        logger.info(f"샤딩 벡터DB 초기화 시작 - 타입: {EMBEDDING_TYPE}, 설정: {SHARDS_CONFIG}")
+        db = ShardedVectorDB(load_shard_configs(SHARDS_CONFIG), embedding_type=EMBEDDING_TYPE,
+                             quantization=VECTOR_QUANTIZATION, embedding_dim=EMBEDDING_DIM,
+                             semantic_cache_threshold=SEMANTIC_CACHE_THRESHOLD)
+    elif db is None:
         logger.info(f"벡터DB 초기화 시작 - 타입: {EMBEDDING_TYPE}, 경로: {VECTORDB_PATH}")
-        db = VectorDB(VECTORDB_PATH, embedding_type=EMBEDDING_TYPE)
+        db = VectorDB(VECTORDB_PATH, embedding_type=EMBEDDING_TYPE,
+                      quantization=VECTOR_QUANTIZATION, embedding_dim=EMBEDDING_DIM,
+                      semantic_cache_threshold=SEMANTIC_CACHE_THRESHOLD)
 
         # # 벡터DB가 비어있으면 초기화
         # try:
@@ -55,6 +141,259 @@ def ensure_vectordb():
     return db
 
 
+def _run_with_refresh_lock(rebuild):
+    """새로고침은 한 번에 하나만 실행"""
+    with _refresh_lock:
+        return rebuild()
+
+
+def rebuild_vectordb() -> int:
+    """
+    볼트 전체를 새 디렉터리에 인덱싱한 뒤 기존 벡터DB와 교체 (교체 전까지는 기존 인덱스로 검색 가능)
+
+    Returns:
+        저장된 청크 수
+    """
+    global db
+    current = ensure_vectordb()
+    documents = process_obsidian_vault(VAULT_PATH)
+
+    build_path = f"{VECTORDB_PATH.rstrip(os.sep)}.rebuild-{uuid.uuid4().hex[:8]}"
+    try:
+        built_db = VectorDB(build_path, embedding_type=EMBEDDING_TYPE,
+                            quantization=VECTOR_QUANTIZATION, embedding_dim=EMBEDDING_DIM,
+                            embeddings=current.embeddings, semantic_cache_threshold=SEMANTIC_CACHE_THRESHOLD)
+        built_db.add_documents(documents)
+        built_db.close()
+    except Exception:
+        shutil.rmtree(build_path, ignore_errors=True)
+        raise
+
+    with _db_lock:
+        if db is not None:
+            db.close()
+        db = None
+        replace_index_directory(VECTORDB_PATH, build_path)
+        _ensure_vectordb()
+
+    logger.info(f"✅ 벡터DB 새로고침 완료! 총 {len(documents)}개 문서 청크 업데이트")
+    return len(documents)
+
+
+def _warm_collections():
+    """Chroma 컬렉션 열기 (로딩된 샤드만, 콜드 샤드는 그대로 둠)"""
+    db_instance = ensure_vectordb()
+    shard_dbs = db_instance.shards.values() if isinstance(db_instance, ShardedVectorDB) else [db_instance]
+    count = sum(shard_db.vectorstore._collection.count() for shard_db in shard_dbs)
+    logger.info(f"📦 컬렉션 청크 수: {count}")
+
+
+def _warm_reranker():
+    """리랭커 로딩 + 더미 추론"""
+    get_shared_reranker().score("워밍업", [Document(page_content="워밍업 문서")])
+
+
+def create_warmup() -> Warmup:
+    """서버 워밍업 단계: 벡터DB(임베딩 모델) 로딩 → 컬렉션 → 더미 임베딩 → 어휘 인덱스 → 리랭커"""
+    phases = [
+        ("vectordb", ensure_vectordb),
+        ("collection", _warm_collections),
+        ("embedding", lambda: ensure_vectordb().embeddings.embed_query("워밍업")),
+        ("lexical_index", lambda: get_lexical_index(ensure_vectordb(), wait=True)),
+    ]
+    if USE_RERANKING:
+        phases.append(("reranker", _warm_reranker))
+    return Warmup(phases)
+
+
+# 백그라운드 워밍업 (main에서 시작)
+warmup = create_warmup()
+
+
+async def readiness_response() -> list[TextContent] | None:
+    """워밍업 중이면 잠시 기다린 뒤에도 끝나지 않을 때 준비 상태 응답 (시작 전이거나 끝났으면 None)"""
+    if warmup.state == "pending" or await warmup.await_ready(WARMUP_WAIT_SECONDS):
+        return None
+    return [TextContent(type="text", text=warmup.describe())]
+
+
+def collect_stats() -> dict:
+    """서버 성능 통계 (워밍업 중에는 벡터DB를 초기화하지 않음)"""
+    return {
+        "warmup": warmup.status(),
+        "index_version": db.index_version if db is not None else None,
+        **performance_stats(db),
+        "search_cache": search_cache.stats(),
+        "semantic_cache": db.semantic_cache_stats() if db is not None else None,
+        "coalesced_searches": search_flight.stats(),
+        "clients": client_limiter.stats(),
+        "embedding_admission": get_embedding_admission().stats(),
+        "rerank_cascade": CascadeReranker.stats() if USE_RERANKING and RERANK_CASCADE else None,
+    }
+
+
+def get_vault_paths() -> list[str]:
+    """노트 목록 조회 대상 경로 (샤드 모드에서는 샤드별 노트 경로)"""
+    if SHARDS_CONFIG:
+        return list(dict.fromkeys(shard.notes_path for shard in load_shard_configs(SHARDS_CONFIG)))
+    return [VAULT_PATH]
+
+
+async def run_search(db_instance, query: str, top_k: int) -> tuple[list, bool]:
+    """쿼리 그래프 실행 (순위가 매겨진 결과, 일부 브랜치 누락 또는 리랭킹 시간 초과/실패 여부)"""
+    # 컴파일된 쿼리 그래프를 ainvoke로 실행 (동시 요청이 하나의 이벤트 루프에서 번갈아 진행)
+    state = await aquery_obsidian(query, top_k=top_k,
+                                  config={"vector_db": db_instance, "use_reranking": USE_RERANKING,
+                                          "rerank_candidates": RERANK_CANDIDATES,
+                                          "rerank_cascade": RERANK_CASCADE,
+                                          "rerank_latency_budget_ms": RERANK_LATENCY_BUDGET_MS,
+                                          "retrieval_deadline": RETRIEVAL_DEADLINE})
+    if state.get("error"):
+        raise RuntimeError(state["error"])
+
+    degraded = any(status not in ("ok", "disabled") for status in state.get("branch_status", {}).values())
+    return state["retrieved_results"], degraded
+
+
+def page_limit(arguments: dict, default: int, maximum: int) -> int:
+    """요청의 limit를 1 이상 maximum 이하 정수로 변환 (클라이언트가 5.0처럼 실수로 보내도 동작)"""
+    return min(max(int(arguments.get("limit") or default), 1), maximum)
+
+
+def format_result_block(index: int, meta: dict, content: str) -> TextContent:
+    """검색 결과 하나 (제목, 청크 위치, 경로, 본문 미리보기)"""
+    title = meta.get('title', '제목 없음')
+    source = meta.get('source', '경로 없음')
+    chunk_info = f"({meta.get('chunk_index', 0)+1}/{meta.get('total_chunks', 1)} 청크)"
+
+    text = f"**{index}. {title}** {chunk_info}\n"
+    text += f"📁 `{source}`\n"
+    text += f"📄 {content[:300]}{'...' if len(content) > 300 else ''}"
+    return TextContent(type="text", text=text)
+
+
+def format_batch_results(queries: list[str], result_sets: list) -> list[TextContent]:
+    """다중 검색 결과를 쿼리별 머리말 + 결과별 블록으로 나눠서 반환"""
+    with metrics.timed("stage.format"):
+        blocks = []
+        for query, results in zip(queries, result_sets):
+            if not results:
+                blocks.append(TextContent(type="text", text=f"🔍 '{query}': 검색 결과가 없습니다."))
+                continue
+            blocks.append(TextContent(type="text", text=f"🔍 '{query}' 검색 결과 ({len(results)}개):"))
+            for i, (doc, _) in enumerate(results, start=1):
+                blocks.append(format_result_block(i, doc.metadata, doc.page_content))
+        return blocks
+
+
+def format_search_page(query: str, results: list, offset: int, total: int,
+                       next_cursor: str | None) -> list[TextContent]:
+    """검색 결과 한 페이지를 머리말 + 결과별 + 다음 커서 블록으로 나눠서 반환"""
+    with metrics.timed("stage.format"):
+        if total == 0:
+            return [TextContent(type="text", text=f"'{query}'에 대한 검색 결과가 없습니다.")]
+
+        blocks = [TextContent(type="text", text=f"🔍 '{query}' 검색 결과 ({offset+1}-{offset+len(results)} / {total}개):")]
+        for i, result in enumerate(results, start=offset + 1):
+            blocks.append(format_result_block(i, result.metadata, result.content))
+
+        if next_cursor:
+            blocks.append(TextContent(type="text", text=f"➡️ 다음 결과가 더 있습니다. cursor: {next_cursor}"))
+        return blocks
+
+
+def read_note_part(file_path: str, arguments: dict, chunk: Document | None = None) -> str:
+    """
+    노트의 요청한 부분만 읽기 (헤딩 오프셋 인덱스로 seek, 파일 전체를 읽지 않음)
+    섹션 → 검색 청크 주변 → 줄 범위 → 바이트 범위 순으로 적용하고, 지정이 없으면 본문 처음부터 (긴 노트는 목차 포함)
+    """
+    index = note_index_store.get(file_path)
+    max_bytes = min(int(arguments.get("max_bytes") or NOTE_MAX_BYTES), NOTE_MAX_BYTES * 5)
+    response = f"# {index.title}\n\n"
+
+    def byte_range(start: int, end: int, label: str) -> str:
+        # 잘라서 보여줄 때는 UTF-8 문자 경계에서 끊어야 경계의 문자가 이번/다음 페이지 양쪽에서 빠지지 않음
+        start = utf8_boundary(file_path, start)
+        shown_end = min(end, start + max_bytes)
+        if shown_end < end:
+            shown_end = utf8_boundary(file_path, shown_end)
+            if shown_end <= start:  # max_bytes가 첫 문자보다 작으면 그 문자 하나는 보여줌
+                shown_end = min(end, utf8_boundary(file_path, start + 4))
+        text = f"## {label} (바이트 {start:,}-{shown_end:,} / {index.size:,})\n\n"
+        text += read_range(file_path, start, shown_end)
+        if shown_end < end:
+            text += f"\n\n✂️ {max_bytes:,}B까지만 표시했습니다. 이어서 보려면 start_byte={shown_end}, end_byte={end}"
+        return text
+
+    if arguments.get("section"):
+        section = index.find_section(arguments["section"])
+        if section is None:
+            return response + f"❌ 섹션을 찾을 수 없습니다: {arguments['section']}\n\n## 목차\n{index.outline()}"
+        return response + byte_range(section.start, section.end, f"{section.path} (줄 {section.line})")
+
+    if chunk is not None:
+        # 같은 문장이 반복되는 노트에서는 청크 순번으로 추정한 위치에 가장 가까운 곳을 선택
+        meta = chunk.metadata
+        near = index.body_offset + (index.size - index.body_offset) * meta.get("chunk_index", 0) \
+            // max(meta.get("total_chunks", 1), 1)
+        position = find_text_offset(file_path, chunk.page_content, index.body_offset, near=near)
+        if position is None:
+            return response + "❌ 노트가 인덱싱 이후 바뀌어서 청크 위치를 찾지 못했습니다. 벡터DB를 새로고침하세요."
+        section = index.section_at(position)
+        start, end = (section.start, section.end) if section else (index.body_offset, index.size)
+        if end - start > max_bytes:
+            # 섹션이 크면 청크 위치 주변만 (줄 경계에 맞춤)
+            start, end = line_bounds(file_path, max(start, position - max_bytes // 4),
+                                     min(end, position + max_bytes * 3 // 4))
+        label = f"{section.path} (줄 {section.line})" if section else "본문"
+        return response + byte_range(start, end, f"검색 청크 주변: {label}")
+
+    if arguments.get("start_line") or arguments.get("end_line"):
+        start_line = max(int(arguments.get("start_line") or 1), 1)
+        end_line = min(int(arguments.get("end_line") or index.line_count), index.line_count)
+        text, last_line = read_lines(file_path, index, start_line, end_line, max_bytes)
+        response += f"## 줄 {start_line}-{last_line} / {index.line_count}\n\n{text}"
+        if last_line < end_line:
+            response += f"\n\n✂️ {max_bytes:,}B까지만 표시했습니다. 이어서 보려면 start_line={last_line + 1}"
+        return response
+
+    if arguments.get("start_byte") is not None or arguments.get("end_byte") is not None:
+        start = max(int(arguments.get("start_byte") or 0), 0)
+        end = min(int(arguments.get("end_byte") or index.size), index.size)
+        return response + byte_range(start, end, "바이트 범위")
+
+    # 전체 조회: 메타데이터 + (긴 노트면 목차) + 본문 처음부터 max_bytes까지
+    if index.metadata:
+        response += "## 메타데이터\n"
+        for key, value in index.metadata.items():
+            response += f"- **{key}**: {value}\n"
+        response += "\n"
+    if index.size - index.body_offset > max_bytes and index.sections:
+        response += f"## 목차 (section으로 조회)\n{index.outline()}\n\n"
+    return response + byte_range(index.body_offset, index.size, "내용")
+
+
+def format_note_entry(index: int, file_path: Path, modified_time: float) -> TextContent | None:
+    """최근 노트 목록의 노트 하나 (읽을 수 없는 노트는 None)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            post = frontmatter.load(f)
+    except Exception:
+        return None
+
+    title = post.metadata.get('title', file_path.stem)
+    modified_str = datetime.fromtimestamp(modified_time).strftime('%Y-%m-%d %H:%M')
+
+    text = f"**{index}. {title}**\n"
+    text += f"📁 `{file_path}`\n"
+    text += f"🕒 {modified_str}\n"
+
+    # 첫 몇 줄 미리보기
+    preview = clean_text(post.content)[:150]
+    text += f"📄 {preview}{'...' if len(post.content) > 150 else ''}"
+    return TextContent(type="text", text=text)
+
+
 @server.list_tools()
 async def list_tools() -> list[Tool]:
     """사용 가능한 도구 목록"""
@@ -70,24 +409,90 @@ async def list_tools() -> list[Tool]:
                         "description": "검색할 내용 (한글/영어 모두 지원)"
                     },
                     "limit": {
-                        "type": "number", 
-                        "description": "검색 결과 개수 (기본값: 5, 최대 10)",
+                        "type": "integer",
+                        "description": "페이지당 검색 결과 개수 (기본값: 5, 최대 10)",
+                        "minimum": 1,
+                        "maximum": 10
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "이전 응답의 cursor (지정 시 query 없이 다음 페이지 조회, 재검색 없음)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="search_obsidian_notes_batch",
+            description="여러 검색어로 옵시디언 노트를 한 번에 검색합니다. 한 주제를 여러 관점으로 찾을 때 "
+                        "search_obsidian_notes를 여러 번 호출하는 대신 사용하세요.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "queries": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "검색할 내용 목록 (최대 10개)",
+                        "minItems": 1,
+                        "maxItems": 10
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "검색어당 결과 개수 (기본값: 5, 최대 10)",
                         "minimum": 1,
                         "maximum": 10
+                    },
+                    "dedupe": {
+                        "type": "boolean",
+                        "description": "여러 검색어에 중복으로 나온 청크를 가장 관련 높은 검색어 결과에만 표시 (기본값: true)"
                     }
                 },
-                "required": ["query"]
+                "required": ["queries"]
             }
         ),
         Tool(
             name="get_obsidian_note",
-            description="특정 옵시디언 노트의 전체 내용을 조회합니다.",
+            description="특정 옵시디언 노트의 내용을 조회합니다. 긴 노트는 목차가 함께 나오며 섹션, 검색 결과 청크 주변, "
+                        "줄 범위, 바이트 범위만 골라서 읽을 수 있습니다.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "file_path": {
                         "type": "string", 
                         "description": "노트 파일의 전체 경로"
+                    },
+                    "section": {
+                        "type": "string",
+                        "description": "읽을 섹션의 헤딩 텍스트 또는 경로 (예: '결정 사항', '회의 > 결정 사항')"
+                    },
+                    "chunk": {
+                        "type": "integer",
+                        "description": "검색 결과에 표시된 청크 번호 (1부터, 지정 시 그 청크가 있는 섹션/주변을 반환)",
+                        "minimum": 1
+                    },
+                    "start_line": {
+                        "type": "integer",
+                        "description": "읽을 첫 줄 번호 (1부터)",
+                        "minimum": 1
+                    },
+                    "end_line": {
+                        "type": "integer",
+                        "description": "읽을 마지막 줄 번호",
+                        "minimum": 1
+                    },
+                    "start_byte": {
+                        "type": "integer",
+                        "description": "읽을 시작 바이트 위치 (잘린 응답의 이어 읽기 위치)",
+                        "minimum": 0
+                    },
+                    "end_byte": {
+                        "type": "integer",
+                        "description": "읽을 끝 바이트 위치",
+                        "minimum": 0
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": "응답에 포함할 최대 바이트 수 (기본값: NOTE_MAX_BYTES)",
+                        "minimum": 1000
                     }
                 },
                 "required": ["file_path"]
@@ -100,80 +505,152 @@ async def list_tools() -> list[Tool]:
                 "type": "object",
                 "properties": {
                     "limit": {
-                        "type": "number",
-                        "description": "표시할 노트 개수 (기본값: 10)",
+                        "type": "integer",
+                        "description": "페이지당 노트 개수 (기본값: 10)",
                         "minimum": 1,
                         "maximum": 20
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "이전 응답의 cursor (지정 시 다음 페이지 조회)"
                     }
                 }
             }
         ),
+        Tool(
+            name="get_obsidian_rag_stats",
+            description="옵시디언 RAG 서버의 인덱스/성능 통계를 조회합니다. 청크/노트 수, 인덱스 세대와 디스크 사용량, "
+                        "도구별/단계별(embed, ann, rerank, format) p50/p95/p99 지연시간, 초당 임베딩 요청 수, "
+                        "캐시별 적중률, 서버 준비(워밍업) 상태를 포함합니다.",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
         Tool(
             name="refresh_obsidian_vectordb",
             description="옵시디언 노트가 업데이트되었을 때 벡터DB를 새로고침합니다.",
             inputSchema={
                 "type": "object",
-                "properties": {}
+                "properties": {
+                    "shard": {
+                        "type": "string",
+                        "description": "샤드 모드에서 특정 샤드만 새로고침 (생략 시 전체)"
+                    }
+                }
             }
         )
     ]
 
 
+def current_client():
+    """도구를 호출한 클라이언트 세션 (MCP 요청 밖에서 직접 호출하면 "local")"""
+    try:
+        return server.request_context.session
+    except LookupError:
+        return "local"
+
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """도구 실행"""
+    """도구 실행 (클라이언트별 동시 실행 수 제한)"""
+    with metrics.timed(f"tool.{name}"):
+        async with client_limiter.slot(current_client()):
+            return await handle_tool(name, arguments)
+
+
+async def handle_tool(name: str, arguments: dict) -> list[TextContent]:
+    """도구별 처리"""
     
     if name == "search_obsidian_notes":
         try:
+            # 다음 페이지: 첫 검색 때 순위를 매겨 둔 후보 목록에서 잘라서 반환 (재임베딩/재검색 없음)
+            cursor = arguments.get("cursor")
+            if cursor:
+                page = cursor_store.resolve(cursor)
+                if page.context.get("kind") != "search":
+                    raise CursorExpiredError("검색 결과 커서가 아닙니다")
+                return format_search_page(page.context["query"], page.items, page.offset, page.total,
+                                          page.next_cursor)
+
+            query = arguments.get("query")
+            if not query:
+                raise ValueError("query 또는 cursor가 필요합니다")
+            not_ready = await readiness_response()
+            if not_ready:
+                return not_ready
             db_instance = ensure_vectordb()
-            query = arguments["query"]
-            limit = min(arguments.get("limit", 5), 10)
-            
-            results = db_instance.search(query, k=limit)
-            
-            if not results:
-                response = f"'{query}'에 대한 검색 결과가 없습니다."
-            else:
-                response = f"🔍 '{query}' 검색 결과 ({len(results)}개):\n\n"
-                
-                for i, doc in enumerate(results):
-                    meta = doc.metadata
-                    title = meta.get('title', '제목 없음')
-                    source = meta.get('source', '경로 없음')
-                    chunk_info = f"({meta.get('chunk_index', 0)+1}/{meta.get('total_chunks', 1)} 청크)"
-                    
-                    response += f"**{i+1}. {title}** {chunk_info}\n"
-                    response += f"📁 `{source}`\n"
-                    response += f"📄 {doc.page_content[:300]}{'...' if len(doc.page_content) > 300 else ''}\n\n"
-                    response += "---\n\n"
-            
-            return [TextContent(type="text", text=response)]
+            limit = page_limit(arguments, 5, 10)
+            pool_size = max(SEARCH_POOL_SIZE, limit)
+
+            # 같은 인덱스 버전에서 같은 검색어로 검색한 적이 있으면 캐시된 후보 목록 사용
+            cache_key = make_cache_key(query, pool_size)
+            index_version = db_instance.index_version
+            results = search_cache.get(cache_key, index_version) if SEARCH_CACHE_SIZE > 0 else None
+
+            if results is None:
+                # 같은 검색이 이미 진행 중이면 그래프를 다시 실행하지 않고 그 결과를 함께 받음
+                results, degraded = await search_flight.ado(
+                    cache_key + (index_version,), lambda: run_search(db_instance, query, pool_size)
+                )
+
+                # 마감 초과/오류로 빠진 브랜치가 있거나 리랭킹이 빠졌으면 불완전한 결과이므로 캐시하지 않음
+                if SEARCH_CACHE_SIZE > 0 and not degraded:
+                    search_cache.put(cache_key, index_version, results)
+
+            next_cursor = cursor_store.create(results, offset=limit, page_size=limit, kind="search", query=query)
+            return format_search_page(query, results[:limit], 0, len(results), next_cursor)
             
         except Exception as e:
             return [TextContent(type="text", text=f"❌ 검색 중 오류 발생: {str(e)}")]
     
+    elif name == "search_obsidian_notes_batch":
+        try:
+            queries = [query for query in arguments.get("queries") or [] if query and query.strip()]
+            if not queries:
+                raise ValueError("queries가 비어 있습니다")
+            if len(queries) > 10:
+                raise ValueError(f"검색어는 최대 10개까지 가능합니다: {len(queries)}개")
+            not_ready = await readiness_response()
+            if not_ready:
+                return not_ready
+            db_instance = ensure_vectordb()
+            limit = page_limit(arguments, 5, 10)
+
+            # 검색어 전체를 배치 요청 한 번으로 임베딩하고 ANN 조회도 한 번에 실행 (워커 스레드)
+            try:
+                result_sets = await asyncio.to_thread(
+                    db_instance.search_many, queries, limit, arguments.get("dedupe", True)
+                )
+            except PartialShardResults as e:
+                # 응답한 샤드 결과는 보여주되 빠진 샤드가 있다는 것을 알림
+                return [TextContent(type="text", text=f"⚠️ {e} (나머지 샤드 결과만 표시)"),
+                        *format_batch_results(queries, e.results)]
+            return format_batch_results(queries, result_sets)
+
+        except Exception as e:
+            return [TextContent(type="text", text=f"❌ 다중 검색 중 오류 발생: {str(e)}")]
+
     elif name == "get_obsidian_note":
         try:
             file_path = arguments["file_path"]
             
             if not os.path.exists(file_path):
                 return [TextContent(type="text", text=f"❌ 파일을 찾을 수 없습니다: {file_path}")]
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-            
-            response = f"# {post.metadata.get('title', Path(file_path).stem)}\n\n"
-            
-            # 메타데이터 표시
-            if post.metadata:
-                response += "## 메타데이터\n"
-                for key, value in post.metadata.items():
-                    response += f"- **{key}**: {value}\n"
-                response += "\n"
-            
-            response += "## 내용\n\n"
-            response += clean_text(post.content)
-            
+
+            # 검색 청크 주변 조회는 벡터DB에서 청크 본문을 가져와 원본 파일에서 위치를 찾음
+            chunk = None
+            if arguments.get("chunk"):
+                not_ready = await readiness_response()
+                if not_ready:
+                    return not_ready
+                db_instance = ensure_vectordb()
+                chunk = await asyncio.to_thread(db_instance.get_chunk, file_path, int(arguments["chunk"]) - 1)
+                if chunk is None:
+                    return [TextContent(type="text", text=f"❌ 청크를 찾을 수 없습니다: {file_path} #{arguments['chunk']}")]
+
+            # 처음 조회하는 긴 노트는 인덱스 생성을 위해 한 번 스캔하므로 워커 스레드에서 실행
+            response = await asyncio.to_thread(read_note_part, file_path, arguments, chunk)
             return [TextContent(type="text", text=response)]
             
         except Exception as e:
@@ -181,62 +658,65 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     
     elif name == "list_recent_obsidian_notes":
         try:
-            limit = min(arguments.get("limit", 10), 20)
-            vault_path = Path(VAULT_PATH)
-            
-            # .md 파일들을 수정 시간 순으로 정렬
-            md_files = list(vault_path.rglob("*.md"))
-            md_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-            
-            response = f"📚 최근 수정된 옵시디언 노트 (최대 {limit}개):\n\n"
-            
-            for i, file_path in enumerate(md_files[:limit]):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        post = frontmatter.load(f)
-                    
-                    title = post.metadata.get('title', file_path.stem)
-                    modified_time = file_path.stat().st_mtime
-                    from datetime import datetime
-                    modified_str = datetime.fromtimestamp(modified_time).strftime('%Y-%m-%d %H:%M')
-                    
-                    response += f"**{i+1}. {title}**\n"
-                    response += f"📁 `{file_path}`\n" 
-                    response += f"🕒 {modified_str}\n"
-                    
-                    # 첫 몇 줄 미리보기
-                    preview = clean_text(post.content)[:150]
-                    response += f"📄 {preview}{'...' if len(post.content) > 150 else ''}\n\n"
-                    
-                except Exception:
-                    continue
-            
-            return [TextContent(type="text", text=response)]
+            cursor = arguments.get("cursor")
+            if cursor:
+                page = cursor_store.resolve(cursor)
+                if page.context.get("kind") != "recent":
+                    raise CursorExpiredError("노트 목록 커서가 아닙니다")
+                items, offset, total, next_cursor = page.items, page.offset, page.total, page.next_cursor
+            else:
+                limit = page_limit(arguments, 10, 20)
+                # .md 파일들을 수정 시간 순으로 정렬 (전체 목록은 커서 저장소에 보관해 다음 페이지에서 재탐색하지 않음)
+                md_files = [(md_file, md_file.stat().st_mtime)
+                            for vault_path in get_vault_paths() for md_file in Path(vault_path).rglob("*.md")]
+                md_files.sort(key=lambda entry: entry[1], reverse=True)
+                items, offset, total = md_files[:limit], 0, len(md_files)
+                next_cursor = cursor_store.create(md_files, offset=limit, page_size=limit, kind="recent")
+
+            # 노트마다 별도 블록으로 반환 (큰 목록을 하나의 문자열로 만들지 않음)
+            blocks = [TextContent(type="text",
+                                  text=f"📚 최근 수정된 옵시디언 노트 ({offset+1}-{offset+len(items)} / {total}개):")]
+            for i, (file_path, modified_time) in enumerate(items, start=offset + 1):
+                entry = format_note_entry(i, file_path, modified_time)
+                if entry is not None:
+                    blocks.append(entry)
+
+            if next_cursor:
+                blocks.append(TextContent(type="text", text=f"➡️ 다음 노트가 더 있습니다. cursor: {next_cursor}"))
+            return blocks
             
         except Exception as e:
             return [TextContent(type="text", text=f"❌ 노트 목록 조회 실패: {str(e)}")]
     
+    elif name == "get_obsidian_rag_stats":
+        # 인덱스 통계는 컬렉션을 조회하므로 워커 스레드에서 실행
+        stats = await asyncio.to_thread(collect_stats)
+        return [TextContent(type="text", text=json.dumps(stats, ensure_ascii=False, indent=2))]
+
     elif name == "refresh_obsidian_vectordb":
         try:
-            global db
+            not_ready = await readiness_response()
+            if not_ready:
+                return not_ready
 
             logger.info("🔄 벡터DB 새로고침 시작...")
 
-            # 기존 벡터DB 삭제
-            import shutil
-            if os.path.exists(VECTORDB_PATH):
-                shutil.rmtree(VECTORDB_PATH)
-                logger.info("기존 벡터DB 삭제 완료")
+            # 재구축은 볼트 읽기, 임베딩, 디스크 쓰기라서 워커 스레드에서 실행 (다른 세션의 검색을 막지 않음)
+            if SHARDS_CONFIG:
+                db_instance = ensure_vectordb()
+                shard = arguments.get("shard")
+                rebuild = (lambda: {shard: db_instance.rebuild_shard(shard)}) if shard else db_instance.rebuild_all
+                counts = await asyncio.to_thread(_run_with_refresh_lock, rebuild)
 
-            # 새로운 벡터DB 생성
-            db = VectorDB(VECTORDB_PATH, embedding_type=EMBEDDING_TYPE)
-            documents = process_obsidian_vault(VAULT_PATH)
-            db.add_documents(documents)
+                response = f"✅ 샤드 새로고침 완료!\n"
+                for shard_name, count in counts.items():
+                    response += f"📊 {shard_name}: {count}개 문서 청크\n"
+                return [TextContent(type="text", text=response)]
 
-            logger.info(f"✅ 벡터DB 새로고침 완료! 총 {len(documents)}개 문서 청크 업데이트")
+            count = await asyncio.to_thread(_run_with_refresh_lock, rebuild_vectordb)
 
             response = f"✅ 벡터DB 새로고침 완료!\n"
-            response += f"📊 총 {len(documents)}개 문서 청크가 업데이트되었습니다."
+            response += f"📊 총 {count}개 문서 청크가 업데이트되었습니다."
 
             return [TextContent(type="text", text=response)]
 
@@ -247,6 +727,36 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     return [TextContent(type="text", text=f"❌ 알 수 없는 도구: {name}")]
 
 
+def create_http_app():
+    """streamable HTTP 전송용 ASGI 앱 (모든 세션이 이 프로세스의 모델, 캐시, 인덱스를 공유)"""
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+    session_manager = StreamableHTTPSessionManager(app=server)
+
+    async def handle_mcp(scope, receive, send):
+        await session_manager.handle_request(scope, receive, send)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        # 모델/컬렉션 로딩은 백그라운드에서 진행하고 연결은 바로 받음
+        warmup.start()
+        async with session_manager.run():
+            logger.info(f"MCP HTTP 서버 대기 중: http://{MCP_HTTP_HOST}:{MCP_HTTP_PORT}/mcp")
+            yield
+
+    return Starlette(routes=[Mount("/mcp", app=handle_mcp)], lifespan=lifespan)
+
+
+async def run_http_server():
+    """상주 HTTP 서버 실행 (여러 클라이언트가 한 프로세스에 연결)"""
+    import uvicorn
+
+    config = uvicorn.Config(create_http_app(), host=MCP_HTTP_HOST, port=MCP_HTTP_PORT, log_level="warning")
+    await uvicorn.Server(config).serve()
+
+
 async def main():
     """MCP 서버 실행"""
     try:
@@ -255,9 +765,18 @@ async def main():
         logger.info(f"볼트 경로: {VAULT_PATH}")
         logger.info(f"벡터DB 경로: {VECTORDB_PATH}")
         logger.info(f"임베딩 타입: {EMBEDDING_TYPE}")
+        logger.info(f"벡터 양자화: {VECTOR_QUANTIZATION or '사용 안 함'}")
+        logger.info(f"임베딩 차원: {EMBEDDING_DIM or '인덱스 기록값/전체'}")
+        logger.info(f"전송 방식: {MCP_TRANSPORT}")
+
+        if MCP_TRANSPORT == "http":
+            await run_http_server()
+            return
+        if MCP_TRANSPORT != "stdio":
+            raise ValueError(f"지원하지 않는 MCP_TRANSPORT: {MCP_TRANSPORT} (stdio 또는 http)")
 
-        ensure_vectordb()
-        logger.info("✅ 초기화 완료!")
+        # 모델/컬렉션 로딩은 백그라운드에서 진행하고 연결은 바로 받음
+        warmup.start()
 
         # 서버 실행
         logger.info("MCP 서버 스트림 대기 중...")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+벡터 양자화 성능 비교 프로그램
+비압축 인덱스 대비 int8 / binary 양자화의 메모리 절감량, recall 손실, 검색 시간을 비교합니다.
+"""
+import os
+import time
+import json
+
+from dotenv import load_dotenv
+
+from src.vectorstore.vector_db import VectorDB
+from src.vectorstore.quantized_index import QUANTIZATION_TYPES
+from embedding_benchmark import EmbeddingBenchmark
+
+load_dotenv()
+
+
+def main():
+    """메인 함수"""
+    db_path = os.path.expanduser("~/obsidian_vectordb")
+    embedding_type = os.getenv("EMBEDDING_TYPE", "ollama")
+
+    if not os.path.exists(db_path):
+        print(f"❌ 벡터DB를 찾을 수 없습니다: {db_path}")
+        return
+
+    queries = [case["query"] for case in EmbeddingBenchmark(vault_path="").test_queries]
+    results = {}
+
+    for quantization in QUANTIZATION_TYPES:
+        print(f"\n🗜️ {quantization} 양자화 평가 중...")
+        db = VectorDB(db_path, embedding_type=embedding_type, quantization=quantization, semantic_cache_threshold=None)
+        report = db.quantization_report(queries, k=10)
+
+        start_time = time.time()
+        for query in queries:
+            db.search(query, k=5)
+        report["avg_search_time"] = (time.time() - start_time) / len(queries)
+        results[quantization] = report
+
+        print(f"  RAM: {report['float32_ram_bytes']:,} → {report['quantized_ram_bytes']:,} bytes "
+              f"({report['ram_saving_ratio']:.1%} 절감)")
+        print(f"  recall@10: 1차 {report['first_pass_recall']:.3f}, 재채점 후 {report['rescored_recall']:.3f}")
+        print(f"  평균 검색 시간: {report['avg_search_time']:.3f}초")
+
+    with open("quantization_results.json", "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print("\n💾 상세 결과가 quantization_results.json에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+허용 제어를 거치는 임베딩 래퍼
+쿼리 임베딩은 대화형(INTERACTIVE), 문서 임베딩은 대량(BULK) 우선순위로 AdmissionController의 자리를 받은 뒤
+실제 임베딩 백엔드를 호출한다. 문서 임베딩은 bulk_chunk_size개씩 나눠서 자리를 받으므로, 긴 인덱싱 도중에도
+쿼리가 다음 청크 앞에 끼어들 수 있다.
+호출 하나가 백엔드 요청 하나인 임베딩(Google 등)용이고, 쿼리를 모아서 보내는 Ollama/KoSimCSE 임베딩은
+admission 속성으로 실제 백엔드 요청마다 자리를 받는다.
+"""
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from src.utils.admission import AdmissionController, BULK, INTERACTIVE
+
+
+class AdmittedEmbeddings(Embeddings):
+    """임베딩 인스턴스를 감싸는 우선순위 허용 제어 래퍼 (그 밖의 속성은 감싼 인스턴스에 위임)"""
+
+    def __init__(self, embeddings: Embeddings, admission: AdmissionController, bulk_chunk_size: int = None):
+        """
+        Args:
+            embeddings: 감쌀 임베딩 인스턴스
+            admission: 공유 허용 제어 (인덱싱과 검색이 같은 인스턴스를 써야 우선순위가 적용됨)
+            bulk_chunk_size: 문서 임베딩 한 번에 자리를 받는 텍스트 수 (기본: 감싼 인스턴스의 batch_size 또는 32)
+        """
+        self.embeddings = embeddings
+        self.admission = admission
+        self.bulk_chunk_size = bulk_chunk_size or getattr(embeddings, "batch_size", 32)
+
+    def __getattr__(self, name):
+        # model_name, output_dim, batch_stats 등 (fingerprint/통계용)
+        if name in ("embeddings", "admission", "bulk_chunk_size"):
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self.admission.slot(INTERACTIVE):
+            return self.embeddings.embed_query(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """쿼리 여러 개 임베딩 (대화형, 자리 하나로 한 번에)"""
+        with self.admission.slot(INTERACTIVE):
+            if hasattr(self.embeddings, "embed_queries"):
+                return self.embeddings.embed_queries(texts)
+            return [self.embeddings.embed_query(text) for text in texts]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), self.bulk_chunk_size):
+            with self.admission.slot(BULK):
+                embeddings.extend(self.embeddings.embed_documents(texts[start:start + self.bulk_chunk_size]))
+        return embeddings
+
+    async def aembed_query(self, text: str) -> List[float]:
+        async with self.admission.aslot(INTERACTIVE):
+            return await self.embeddings.aembed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), self.bulk_chunk_size):
+            async with self.admission.aslot(BULK):
+                embeddings.extend(await self.embeddings.aembed_documents(texts[start:start + self.bulk_chunk_size]))
+        return embeddings
@@ -2,24 +2,33 @@
 KoSimCSE 기반 한국어 문장 임베딩 클래스
 BM-K/KoSimCSE-roberta 모델을 LangChain Embeddings 인터페이스에 맞게 래핑
 """
+import contextlib
 import torch
-from typing import List
+from typing import List, Optional
 from transformers import AutoModel, AutoTokenizer
 from langchain_core.embeddings import Embeddings
+from src.utils.metrics import metrics
+from src.utils.micro_batcher import MicroBatcher
+from src.utils.admission import AdmissionController, BULK, INTERACTIVE
 
 
 class KoSimCSEEmbeddings(Embeddings):
     """KoSimCSE 모델을 사용하는 한국어 임베딩 클래스"""
 
-    def __init__(self, model_name: str = "BM-K/KoSimCSE-roberta", device: str = None):
+    def __init__(self, model_name: str = "BM-K/KoSimCSE-roberta", device: str = None, batch_size: int = 32,
+                 admission: Optional[AdmissionController] = None):
         """
         KoSimCSE 임베딩 초기화
 
         Args:
             model_name: 사용할 모델명 (기본: BM-K/KoSimCSE-roberta)
             device: 사용할 디바이스 (기본: auto-detect)
+            batch_size: forward 한 번에 넣을 최대 텍스트 수 (문서 임베딩, 동시 쿼리 묶음 공통)
+            admission: forward마다 자리를 받을 허용 제어 (쿼리는 INTERACTIVE, 문서는 BULK, None이면 제한 없음)
         """
         self.model_name = model_name
+        self.batch_size = batch_size
+        self.admission = admission
 
         # 디바이스 설정
         if device is None:
@@ -37,14 +46,18 @@ class KoSimCSEEmbeddings(Embeddings):
         self.model.to(self.device)
         self.model.eval()  # 평가 모드로 설정
 
+        # 서로 다른 동시 쿼리는 모아서 forward 한 번으로 임베딩
+        self._query_batcher = MicroBatcher(self._embed_query_batch, name="embed_query", max_batch_size=batch_size)
+
         print("✅ KoSimCSE 모델 로딩 완료!")
 
-    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def _get_embeddings(self, texts: List[str], priority: int = BULK) -> List[List[float]]:
         """
         텍스트 리스트를 임베딩 벡터로 변환
 
         Args:
             texts: 임베딩할 텍스트 리스트
+            priority: 허용 제어 우선순위 (INTERACTIVE 또는 BULK)
 
         Returns:
             임베딩 벡터 리스트 (각 벡터는 768차원)
@@ -65,7 +78,9 @@ class KoSimCSEEmbeddings(Embeddings):
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
         # 임베딩 추출 (gradient 계산 비활성화)
-        with torch.no_grad():
+        metrics.incr("stage.embed.texts", len(texts))
+        slot = self.admission.slot(priority) if self.admission is not None else contextlib.nullcontext()
+        with slot, torch.no_grad(), metrics.timed("stage.embed"):
             outputs = self.model(**inputs)
             # [CLS] 토큰의 임베딩을 사용 (첫 번째 토큰)
             embeddings = outputs.last_hidden_state[:, 0, :]
@@ -85,11 +100,14 @@ class KoSimCSEEmbeddings(Embeddings):
         Returns:
             임베딩 벡터 리스트
         """
-        return self._get_embeddings(texts)
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._get_embeddings(texts[start:start + self.batch_size]))
+        return embeddings
 
     def embed_query(self, text: str) -> List[float]:
         """
-        쿼리 텍스트를 임베딩으로 변환 (LangChain 인터페이스)
+        쿼리 텍스트를 임베딩으로 변환 (LangChain 인터페이스, 동시 쿼리와 한 번의 forward로 묶음)
 
         Args:
             text: 임베딩할 쿼리 텍스트
@@ -97,8 +115,31 @@ class KoSimCSEEmbeddings(Embeddings):
         Returns:
             임베딩 벡터
         """
-        embeddings = self._get_embeddings([text])
-        return embeddings[0] if embeddings else []
+        return self._query_batcher.run(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """embed_query의 비동기 버전 (묶음 결과를 이벤트 루프에서 기다림)"""
+        return await self._query_batcher.asubmit(text)
+
+    def _embed_query_batch(self, texts: List[str]) -> List[List[float]]:
+        """동시 쿼리 묶음 임베딩 (묶음 하나가 대화형 자리 하나)"""
+        return self._get_embeddings(texts, INTERACTIVE)
+
+    def batch_stats(self):
+        """동시 쿼리 묶음 통계"""
+        return self._query_batcher.stats()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        쿼리 여러 개를 한 번의 배치 추론으로 임베딩
+
+        Args:
+            texts: 임베딩할 쿼리 텍스트 리스트
+
+        Returns:
+            쿼리 순서대로의 임베딩 벡터 리스트
+        """
+        return self._get_embeddings(texts, INTERACTIVE)
 
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """
@@ -111,7 +152,7 @@ class KoSimCSEEmbeddings(Embeddings):
         Returns:
             유사도 점수 (0-100 범위)
         """
-        embeddings = self._get_embeddings([text1, text2])
+        embeddings = self._get_embeddings([text1, text2], INTERACTIVE)
         if len(embeddings) != 2:
             return 0.0
 
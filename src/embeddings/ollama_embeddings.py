@@ -1,48 +1,172 @@
+import asyncio
+import contextlib
+import math
+import httpx
 import requests
-from typing import List
+from typing import List, Optional
 from langchain.embeddings.base import Embeddings
 from src.logging.logger_factory import LoggerFactory
+from src.utils.singleflight import SingleFlight
+from src.utils.micro_batcher import MicroBatcher, AsyncMicroBatcher
+from src.utils.admission import AdmissionController, BULK, INTERACTIVE
+from src.utils.metrics import metrics
 
 logger = LoggerFactory.get_logger("obsidian_rag.ollama_embeddings")
 
 
+def truncate_embedding(embedding: List[float], output_dim: Optional[int]) -> List[float]:
+    """
+    Matryoshka 방식 차원 축소: 앞쪽 output_dim 차원만 남기고 L2 재정규화
+
+    Args:
+        embedding: 원본 임베딩 벡터
+        output_dim: 남길 차원 수 (None이면 원본 그대로)
+
+    Returns:
+        축소 및 재정규화된 임베딩 벡터
+    """
+    if output_dim is None or output_dim >= len(embedding):
+        return embedding
+
+    truncated = embedding[:output_dim]
+    norm = math.sqrt(sum(value * value for value in truncated))
+    if norm == 0:
+        return truncated
+    return [value / norm for value in truncated]
+
+
 class OllamaEmbeddings(Embeddings):
     """Ollama 임베딩 클래스"""
 
-    def __init__(self, model_name: str = "hf.co/Qwen/Qwen3-Embedding-8B-GGUF:Q4_K_M", base_url: str = "http://localhost:11434"):
+    def __init__(self,
+                 model_name: str = "hf.co/Qwen/Qwen3-Embedding-8B-GGUF:Q4_K_M",
+                 base_url: str = "http://localhost:11434",
+                 output_dim: Optional[int] = None,
+                 batch_size: int = 32,
+                 query_batch_wait_ms: float = 0.0,
+                 request_timeout: float = 60.0,
+                 admission: Optional[AdmissionController] = None):
+        """
+        Ollama 임베딩 초기화
+
+        Args:
+            model_name: Ollama 모델명
+            base_url: Ollama 서버 주소
+            output_dim: 출력 차원 (예: 256, 512, 1024). None이면 모델 전체 차원 사용
+            batch_size: 요청 한 번에 보낼 최대 텍스트 수 (문서 임베딩, 동시 쿼리 묶음 공통)
+            query_batch_wait_ms: 동시 쿼리를 묶기 위해 첫 쿼리 후 기다리는 시간 (0이면 대기 없이 greedy)
+            request_timeout: Ollama 요청과 쿼리 묶음 결과를 기다리는 최대 시간 (초)
+            admission: Ollama 요청마다 자리를 받을 허용 제어 (쿼리 묶음은 INTERACTIVE, 문서는 BULK, None이면 제한 없음)
+        """
+        if output_dim is not None and output_dim <= 0:
+            raise ValueError(f"output_dim은 양수여야 합니다: {output_dim}")
+
         self.model_name = model_name
         self.base_url = base_url
-        logger.info(f"🤖 Ollama 임베딩 초기화: {model_name}, URL: {base_url}")
+        self.output_dim = output_dim
+        self.batch_size = batch_size
+        self.request_timeout = request_timeout
+        self.admission = admission
+        # 비동기 요청용 클라이언트 (첫 비동기 호출 시 생성, 커넥션 재사용)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        # 같은 쿼리의 동시 임베딩 요청은 Ollama에 한 번만 보냄
+        self._query_flight = SingleFlight("embed_query")
+        # 서로 다른 동시 쿼리는 모아서 한 번의 요청으로 임베딩
+        self._query_batcher = MicroBatcher(self._embed_query_batch, name="embed_query",
+                                           max_batch_size=batch_size, max_wait_ms=query_batch_wait_ms)
+        # 비동기 쿼리 묶음은 이벤트 루프 안에서 httpx로 요청 (작업 스레드에서 동기 요청을 하지 않음)
+        self._aquery_batcher = AsyncMicroBatcher(self._aembed_query_batch, name="embed_query",
+                                                 max_batch_size=batch_size, max_wait_ms=query_batch_wait_ms)
+        logger.info(f"🤖 Ollama 임베딩 초기화: {model_name}, URL: {base_url}, 차원: {output_dim or '전체'}")
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """문서들을 임베딩"""
-        embeddings = []
-        for text in texts:
+    def _slot(self, priority: int):
+        """허용 제어 자리 (실제 Ollama 요청 동안만 점유, 묶음 대기열에 있는 동안은 점유하지 않음)"""
+        return self.admission.slot(priority) if self.admission is not None else contextlib.nullcontext()
+
+    def _aslot(self, priority: int):
+        return self.admission.aslot(priority) if self.admission is not None else contextlib.nullcontext()
+
+    def _embed_batch(self, texts: List[str], priority: int = BULK) -> List[List[float]]:
+        """텍스트 여러 개를 요청 한 번으로 임베딩 (/api/embed의 리스트 input)"""
+        metrics.incr("stage.embed.texts", len(texts))
+        with self._slot(priority), metrics.timed("stage.embed"):
             response = requests.post(
                 f"{self.base_url}/api/embed",
                 json={
                     "model": self.model_name,
-                    "input": text
-                }
+                    "input": texts
+                },
+                timeout=self.request_timeout
             )
-            if response.status_code == 200:
-                embedding = response.json()["embeddings"][0]
-                embeddings.append(embedding)
-            else:
-                raise Exception(f"Ollama 임베딩 실패: {response.status_code}, {response.text}")
+        if response.status_code == 200:
+            return [truncate_embedding(embedding, self.output_dim) for embedding in response.json()["embeddings"]]
+        else:
+            raise Exception(f"Ollama 임베딩 실패: {response.status_code}, {response.text}")
+
+    def _embed_query_batch(self, texts: List[str]) -> List[List[float]]:
+        """동시 쿼리 묶음 임베딩 (묶음 하나가 대화형 자리 하나)"""
+        return self._embed_batch(texts, INTERACTIVE)
 
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서들을 임베딩 (batch_size개씩 묶어서 요청)"""
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._embed_batch(texts[start:start + self.batch_size]))
         return embeddings
 
     def embed_query(self, text: str) -> List[float]:
-        """쿼리를 임베딩"""
-        response = requests.post(
-            f"{self.base_url}/api/embed",
-            json={
-                "model": self.model_name,
-                "input": text
-            }
+        """
+        쿼리를 임베딩
+        같은 쿼리가 이미 요청 중이면 그 결과를 함께 받고, 다른 동시 쿼리와는 한 번의 요청으로 묶어서 보냄
+        """
+        return self._query_flight.do(text, lambda: self._query_batcher.run(text, timeout=self.request_timeout))
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """쿼리 여러 개를 batch_size개씩 묶어서 임베딩 (검색 여러 개를 한 번에 할 때)"""
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._embed_batch(texts[start:start + self.batch_size], INTERACTIVE))
+        return embeddings
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=self.request_timeout)
+        return self._async_client
+
+    async def _aembed(self, input_value, priority: int = BULK) -> List[List[float]]:
+        metrics.incr("stage.embed.texts", len(input_value) if isinstance(input_value, list) else 1)
+        async with self._aslot(priority):
+            with metrics.timed("stage.embed"):
+                response = await self._get_async_client().post(
+                    "/api/embed",
+                    json={
+                        "model": self.model_name,
+                        "input": input_value
+                    }
+                )
+        if response.status_code != 200:
+            raise Exception(f"Ollama 임베딩 실패: {response.status_code}, {response.text}")
+        return [truncate_embedding(embedding, self.output_dim) for embedding in response.json()["embeddings"]]
+
+    async def _aembed_query_batch(self, texts: List[str]) -> List[List[float]]:
+        """동시 비동기 쿼리 묶음 임베딩 (묶음 하나가 대화형 자리 하나)"""
+        return await self._aembed(texts, INTERACTIVE)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서들을 비동기로 임베딩 (이벤트 루프를 막지 않음, batch_size개씩 묶어서 요청)"""
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(await self._aembed(texts[start:start + self.batch_size]))
+        return embeddings
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        쿼리를 비동기로 임베딩 (동시 쿼리 합치기/묶기는 embed_query와 같고, 요청은 이벤트 루프에서 httpx로 보냄)
+        """
+        return await self._query_flight.ado(
+            text, lambda: asyncio.wait_for(self._aquery_batcher.submit(text), self.request_timeout)
         )
-        if response.status_code == 200:
-            return response.json()["embeddings"][0]
-        else:
-            raise Exception(f"Ollama 쿼리 임베딩 실패: {response.status_code}, {response.text}")
\ No newline at end of file
+
+    def batch_stats(self):
+        """동시 쿼리 묶음 통계 (동기 묶음, async는 비동기 묶음)"""
+        return {**self._query_batcher.stats(), "async": self._aquery_batcher.stats()}
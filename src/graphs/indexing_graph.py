@@ -1,40 +1,81 @@
 """Indexing workflow for processing Obsidian documents into vector store."""
+import threading
 from typing import Dict, Any
 
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
-from src.graphs.nodes import obsidian_read_node, chunking_node, vector_store_node
+from src.graphs.nodes import (
+    plan_indexing_node,
+    dispatch_batches,
+    process_batch_node,
+    finalize_indexing_node,
+)
+from src.graphs.instrumentation import instrument_node, run_timer
 from src.schemas.document import IndexingState
 
 
+DEFAULT_MAX_CONCURRENCY = 4
+
+
 def create_indexing_graph():
+    """
+    배치 map-reduce 인덱싱 그래프 생성
+    plan → (배치별 process_batch 병렬 실행) → finalize
+    """
     # 그래프 초기화
     graph = StateGraph(IndexingState)
 
     # 노드 추가
-    graph.add_node("read", obsidian_read_node)
-    graph.add_node("chunk", chunking_node)
-    graph.add_node("store", vector_store_node)
+    graph.add_node("plan", instrument_node("indexing.plan", plan_indexing_node,
+                                           count_items=lambda update: update.get("total_files", 0)))
+    graph.add_node("process_batch", instrument_node("indexing.process_batch", process_batch_node,
+                                                    count_items=lambda update: update.get("total_chunks", 0)))
+    graph.add_node("finalize", instrument_node("indexing.finalize", finalize_indexing_node))
 
-    # 엣지 연결
-    graph.add_edge(START, "read")
-    graph.add_edge("read", "chunk")
-    graph.add_edge("chunk", "store")
-    graph.add_edge("store", END)
+    # 엣지 연결 (배치 수만큼 process_batch로 fan-out 후 finalize에서 합류)
+    graph.add_edge(START, "plan")
+    graph.add_conditional_edges("plan", dispatch_batches, ["process_batch", "finalize"])
+    graph.add_edge("process_batch", "finalize")
+    graph.add_edge("finalize", END)
 
     return graph.compile()
 
-def index_obsidian_vault(vault_path: str, config: Dict[str, Any] = None):
-    """옵시디언 볼트를 인덱싱"""
+
+# 컴파일된 그래프 캐시 (모듈 단위로 한 번만 컴파일)
+_compiled_indexing_graph = None
+_compile_lock = threading.Lock()
+
+
+def get_indexing_graph():
+    """컴파일된 인덱싱 그래프 반환 (최초 1회만 빌드/컴파일, 스레드 간 공유 가능)"""
+    global _compiled_indexing_graph
+    if _compiled_indexing_graph is None:
+        with _compile_lock:
+            if _compiled_indexing_graph is None:
+                _compiled_indexing_graph = create_indexing_graph()
+    return _compiled_indexing_graph
+
+
+def index_obsidian_vault(vault_path: str, config: Dict[str, Any] = None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    """
+    옵시디언 볼트를 배치 단위로 인덱싱
+
+    Args:
+        vault_path: 옵시디언 볼트 경로
+        config: configurable 설정 (db_path, chunk_size, chunk_overlap, batch_size 등)
+        max_concurrency: 동시에 처리할 최대 배치 수
+    """
     if config is None:
         config = {}
 
     config["vault_path"] = vault_path
 
-    graph = create_indexing_graph()
+    graph = get_indexing_graph()
     initial_state = IndexingState()
 
-    # configurable로 전달
-    result = graph.invoke(initial_state, config={"configurable": config})
-    return result
\ No newline at end of file
+    # configurable로 전달, 병렬 배치 수는 최상위 max_concurrency로 제한
+    with run_timer("indexing") as run:
+        result = graph.invoke(initial_state, config={"configurable": config, "max_concurrency": max_concurrency})
+        run.items = result.get("total_chunks", 0)
+    return result
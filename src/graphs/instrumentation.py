@@ -0,0 +1,201 @@
+"""
+LangGraph 노드 계측
+노드(및 노드 안의 단계)마다 실행 시간, 처리 항목 수, 처리량을 기록해서 프로세스 내 히스토그램(p50/p95/p99)으로 집계하고,
+필요하면 한 줄에 하나씩 JSON(JSONL)으로도 남긴다. 어느 노드가 병목인지 볼트별로 비교할 때 사용한다.
+
+    graph.add_node("fuse", instrument_node("query.fuse", fusion_node, count_items=...))
+
+    with stage_timer("indexing.read") as stage:
+        documents = read_documents(...)
+        stage.items = len(documents)
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Any, Dict
+
+from src.utils.metrics import metrics
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.instrumentation")
+
+NODE_METRIC_PREFIX = "graph.node."
+RUN_METRIC_PREFIX = "graph.run."
+
+# JSONL 출력 경로 (환경 변수 또는 set_jsonl_path로 지정, None이면 기록 안 함)
+_jsonl_path: Optional[str] = os.getenv("OBSIDIAN_RAG_METRICS_JSONL") or None
+_jsonl_lock = threading.Lock()
+
+
+def set_jsonl_path(path: Optional[str]):
+    """계측 결과를 남길 JSONL 파일 경로 설정 (None이면 끔)"""
+    global _jsonl_path
+    _jsonl_path = path
+
+
+def _write_jsonl(record: Dict[str, Any]):
+    if _jsonl_path is None:
+        return
+    line = json.dumps(record, ensure_ascii=False)
+    try:
+        with _jsonl_lock, open(_jsonl_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"⚠️ 계측 JSONL 기록 실패: {e}")
+
+
+def _record(prefix: str, kind: str, name: str, elapsed_ms: float, items: int, error: bool):
+    """실행 시간/항목 수/처리량을 레지스트리와 JSONL에 기록"""
+    base = f"{prefix}{name}"
+    metrics.incr(f"{base}.calls")
+    metrics.incr(f"{base}.items", items)
+    if error:
+        metrics.incr(f"{base}.errors")
+    metrics.observe(f"{base}.latency_ms", elapsed_ms)
+
+    throughput = items / (elapsed_ms / 1000) if elapsed_ms > 0 and items else 0.0
+    if items:
+        metrics.observe(f"{base}.throughput", throughput)
+
+    _write_jsonl({
+        "ts": round(time.time(), 3),
+        "kind": kind,
+        "name": name,
+        "wall_ms": round(elapsed_ms, 3),
+        "items": items,
+        "items_per_sec": round(throughput, 1),
+        "error": error,
+    })
+
+
+def record_node(name: str, elapsed_ms: float, items: int = 0, error: bool = False):
+    """노드/단계 한 번의 실행 기록"""
+    _record(NODE_METRIC_PREFIX, "node", name, elapsed_ms, items, error)
+
+
+def record_run(name: str, elapsed_ms: float, items: int = 0, error: bool = False):
+    """그래프 실행(invoke/ainvoke) 한 번의 기록"""
+    _record(RUN_METRIC_PREFIX, "run", name, elapsed_ms, items, error)
+
+
+def _safe_count(count_items: Optional[Callable[[Any], int]], result: Any) -> int:
+    if count_items is None or result is None:
+        return 0
+    try:
+        return int(count_items(result))
+    except Exception:
+        return 0
+
+
+def instrument_node(name: str, func: Callable, count_items: Optional[Callable[[Any], int]] = None) -> Callable:
+    """
+    노드 함수를 계측 래퍼로 감싸기 (동기/비동기 함수 모두 지원, 시그니처는 그대로 유지)
+
+    Args:
+        name: 지표 이름 (예: "query.retrieve_dense")
+        func: 노드 함수
+        count_items: 노드 반환값에서 처리 항목 수를 세는 함수
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            error = False
+            try:
+                result = await func(*args, **kwargs)
+                return result
+            except Exception:
+                error = True
+                raise
+            finally:
+                record_node(name, (time.perf_counter() - started) * 1000, _safe_count(count_items, result), error)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = None
+        error = False
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            record_node(name, (time.perf_counter() - started) * 1000, _safe_count(count_items, result), error)
+
+    return wrapper
+
+
+class _Stage:
+    """stage_timer가 넘겨주는 핸들 (블록 안에서 items 지정)"""
+
+    def __init__(self):
+        self.items = 0
+
+
+@contextmanager
+def stage_timer(name: str):
+    """노드 안의 단계(읽기/청크 분할/저장 등)를 계측하는 컨텍스트 매니저"""
+    stage = _Stage()
+    started = time.perf_counter()
+    error = False
+    try:
+        yield stage
+    except Exception:
+        error = True
+        raise
+    finally:
+        record_node(name, (time.perf_counter() - started) * 1000, stage.items, error)
+
+
+@contextmanager
+def run_timer(name: str):
+    """그래프 실행 전체를 계측하는 컨텍스트 매니저"""
+    stage = _Stage()
+    started = time.perf_counter()
+    error = False
+    try:
+        yield stage
+    except Exception:
+        error = True
+        raise
+    finally:
+        record_run(name, (time.perf_counter() - started) * 1000, stage.items, error)
+
+
+def _summarize(prefix: str) -> Dict[str, Dict[str, Any]]:
+    names = sorted({name[len(prefix):-len(".latency_ms")]
+                    for name in metrics.histogram_names(prefix) if name.endswith(".latency_ms")})
+    stats = {}
+    for name in names:
+        base = f"{prefix}{name}"
+        latency = metrics.histogram(f"{base}.latency_ms").summary()
+        total_ms = latency["mean"] * latency["count"]
+        items = metrics.counter(f"{base}.items")
+        stats[name] = {
+            "calls": metrics.counter(f"{base}.calls"),
+            "errors": metrics.counter(f"{base}.errors"),
+            "items": items,
+            "latency_ms": latency,
+            "total_ms": round(total_ms, 3),
+            "items_per_sec": round(items / (total_ms / 1000), 1) if total_ms > 0 else 0.0,
+        }
+    return stats
+
+
+def node_stats() -> Dict[str, Dict[str, Any]]:
+    """노드/단계별 호출 수, 에러 수, 항목 수, 지연시간 분포, 누적 처리량"""
+    return _summarize(NODE_METRIC_PREFIX)
+
+
+def run_stats() -> Dict[str, Dict[str, Any]]:
+    """그래프별 실행 통계"""
+    return _summarize(RUN_METRIC_PREFIX)
@@ -1,14 +1,49 @@
 """Graph node definitions."""
-from src.graphs.nodes.obsidian_read_node import obsidian_read_node
-from src.graphs.nodes.chunking_node import chunking_node
-from src.graphs.nodes.vector_store_node import vector_store_node
-from src.graphs.nodes.retrieval_node import retrieval_node
-from src.graphs.nodes.context_builder_node import context_builder_node
+from src.graphs.nodes.obsidian_read_node import read_documents
+from src.graphs.nodes.chunking_node import chunk_documents
+from src.graphs.nodes.vector_store_node import store_chunks
+from src.graphs.nodes.indexing_batch_node import (
+    plan_indexing_node,
+    dispatch_batches,
+    process_batch_node,
+    finalize_indexing_node,
+)
+from src.graphs.nodes.retrieval_node import (
+    prepare_retrieval_node,
+    aprepare_retrieval_node,
+    dense_retrieval_node,
+    adense_retrieval_node,
+)
+from src.graphs.nodes.lexical_retrieval_node import (
+    lexical_retrieval_node,
+    alexical_retrieval_node,
+    title_retrieval_node,
+    atitle_retrieval_node,
+)
+from src.graphs.nodes.fusion_node import fusion_node, afusion_node
+from src.graphs.nodes.rerank_node import rerank_node, arerank_node
+from src.graphs.nodes.context_builder_node import context_builder_node, acontext_builder_node
 
 __all__ = [
-    "obsidian_read_node",
-    "chunking_node",
-    "vector_store_node",
-    "retrieval_node",
+    "read_documents",
+    "chunk_documents",
+    "store_chunks",
+    "plan_indexing_node",
+    "dispatch_batches",
+    "process_batch_node",
+    "finalize_indexing_node",
+    "prepare_retrieval_node",
+    "aprepare_retrieval_node",
+    "dense_retrieval_node",
+    "adense_retrieval_node",
+    "lexical_retrieval_node",
+    "alexical_retrieval_node",
+    "title_retrieval_node",
+    "atitle_retrieval_node",
+    "fusion_node",
+    "afusion_node",
+    "rerank_node",
+    "arerank_node",
     "context_builder_node",
+    "acontext_builder_node",
 ]
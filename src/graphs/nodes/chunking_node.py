@@ -1,49 +1,20 @@
 """Node for chunking documents."""
-from langgraph.types import RunnableConfig
+from typing import List
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from src.schemas.document import IndexingState, Chunk
+from src.schemas.document import Document
+from src.schemas.chunk_batch import ChunkBatch
 
 from src.logging.logger_factory import LoggerFactory
-logger = LoggerFactory.get_logger("obsidian_rag.ollama_embeddings")
-
-def chunking_node(state: IndexingState, config: RunnableConfig) -> IndexingState:
-    logger.info(f"{'*' * 50}")
-    logger.info("CHUNKING_NODE")
-    logger.info(f"{'*' * 50}")
-
-    try:
-        if state.error:
-            return state
-
-        # 청크 분할
-        chunk_size = config.get("configurable", {}).get("chunk_size", 500)
-        chunk_overlap = config.get("configurable", {}).get("chunk_overlap", 50)
-        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-
-        chunks = []
-        for doc in state.documents:
-            text_chunks = splitter.split_text(doc.content)
-            total_chunks = len(text_chunks)
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.chunking")
 
-            for idx, chunk_text in enumerate(text_chunks):
-                chunk_id = f"{doc.id}#chunk_{idx}"
-                chunk_metadata = {**doc.metadata,
-                                  "chunk_id": chunk_id,
-                                  "chunk_index": idx,
-                                  "total_chunks": total_chunks}
-                chunk = Chunk(
-                    id= chunk_id,
-                    content=chunk_text,
-                    document_id=doc.id,
-                    chunk_index=idx,
-                    metadata=chunk_metadata
-                )
-                chunks.append(chunk)
+def chunk_documents(documents: List[Document], chunk_size: int = 500, chunk_overlap: int = 50) -> ChunkBatch:
+    """문서들을 청크로 분할 (청크마다 모델/메타데이터 사본을 만들지 않는 컬럼형 ChunkBatch로 반환)"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
-        state.chunks = chunks
-        return state
+    chunks = ChunkBatch()
+    for doc in documents:
+        chunks.add_document(doc.id, doc.metadata, splitter.split_text(doc.content))
 
-    except Exception as e:
-        state.error = f"Failed to obsidian chunk documents: {str(e)}"
-        return state
\ No newline at end of file
+    return chunks
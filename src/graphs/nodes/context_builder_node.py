@@ -3,7 +3,7 @@ from langgraph.types import RunnableConfig
 
 from src.schemas.query import QueryState
 from src.logging.logger_factory import LoggerFactory
-logger = LoggerFactory.get_logger("obsidian_rag.ollama_embeddings")
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.context_builder")
 
 def context_builder_node(state: QueryState, config: RunnableConfig) -> QueryState:
     """MCP 응답용 컨텍스트를 생성하는 노드"""
@@ -36,3 +36,8 @@ def context_builder_node(state: QueryState, config: RunnableConfig) -> QueryStat
     except Exception as e:
         state.error = f"Failed to build context: {str(e)}"
         return state
+
+
+async def acontext_builder_node(state: QueryState, config: RunnableConfig) -> QueryState:
+    """context_builder_node의 비동기 버전 (문자열 조립뿐이라 이벤트 루프에서 바로 실행)"""
+    return context_builder_node(state, config)
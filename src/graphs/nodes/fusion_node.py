@@ -0,0 +1,94 @@
+"""Node for fusing results from the parallel retrieval branches."""
+from collections import defaultdict
+from typing import List, Dict, Any
+
+from langgraph.types import RunnableConfig
+
+from src.schemas.query import QueryState, SearchResult
+from src.graphs.nodes.retrieval_node import _candidate_k
+from src.logging.logger_factory import LoggerFactory
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.fusion")
+
+DEFAULT_RRF_K = 60
+
+
+def _result_key(result: SearchResult) -> str:
+    return result.chunk_id or f"{result.document_id}:{hash(result.content)}"
+
+
+def reciprocal_rank_fusion(branch_results: Dict[str, List[SearchResult]],
+                           weights: Dict[str, float] = None,
+                           rrf_k: int = DEFAULT_RRF_K) -> List[SearchResult]:
+    """
+    Reciprocal Rank Fusion: 브랜치별 순위만으로 점수를 합산 (브랜치마다 점수 척도가 달라도 됨)
+
+    Returns:
+        RRF 점수 내림차순 SearchResult (metadata["retrievers"]에 결과를 낸 브랜치 기록)
+    """
+    weights = weights or {}
+    scores: Dict[str, float] = defaultdict(float)
+    sources: Dict[str, List[str]] = defaultdict(list)
+    first_seen: Dict[str, SearchResult] = {}
+
+    for branch, results in branch_results.items():
+        weight = weights.get(branch, 1.0)
+        for rank, result in enumerate(results, 1):
+            key = _result_key(result)
+            scores[key] += weight / (rrf_k + rank)
+            sources[key].append(branch)
+            first_seen.setdefault(key, result)
+
+    ranked = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [
+        first_seen[key].model_copy(update={
+            "score": scores[key],
+            "metadata": {**first_seen[key].metadata, "retrievers": ",".join(sources[key])},
+        })
+        for key in ranked
+    ]
+
+
+def fusion_node(state: QueryState, config: RunnableConfig) -> QueryState:
+    """마감 안에 도착한 브랜치 결과를 RRF로 합치는 노드 (마감을 넘긴 브랜치는 제외된 상태)"""
+    logger.info(f"{'*' * 50}")
+    logger.info("FUSION_NODE")
+    logger.info(f"{'*' * 50}")
+
+    try:
+        if state.error or not state.query:
+            return state
+
+        configurable = config.get("configurable", {})
+        branch_results = {name: results for name, results in state.branch_results.items() if results}
+        logger.info(f"🔀 브랜치 상태: {state.branch_status}")
+
+        if not branch_results:
+            # 결과가 없는 이유가 모든 브랜치의 실패라면 에러로 전달
+            statuses = list(state.branch_status.values())
+            errors = [status for status in statuses if status.startswith("error")]
+            if errors and "ok" not in statuses:
+                state.error = f"Failed to retrieve documents: {'; '.join(errors)}"
+            state.retrieved_results = []
+            return state
+
+        if len(branch_results) == 1:
+            # 결과를 낸 브랜치가 하나뿐이면 원래 점수와 순서를 그대로 사용
+            fused = next(iter(branch_results.values()))
+        else:
+            fused = reciprocal_rank_fusion(
+                branch_results,
+                weights=configurable.get("fusion_weights"),
+                rrf_k=configurable.get("rrf_k", DEFAULT_RRF_K),
+            )
+
+        state.retrieved_results = fused[:_candidate_k(state, configurable)]
+        return state
+
+    except Exception as e:
+        state.error = f"Failed to fuse retrieval results: {str(e)}"
+        return state
+
+
+async def afusion_node(state: QueryState, config: RunnableConfig) -> QueryState:
+    """fusion_node의 비동기 버전 (메모리 내 병합뿐이라 이벤트 루프에서 바로 실행)"""
+    return fusion_node(state, config)
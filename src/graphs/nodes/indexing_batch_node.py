@@ -0,0 +1,222 @@
+"""Nodes for batched (map-reduce) indexing."""
+import os
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Union, Tuple
+
+from langgraph.types import RunnableConfig, Send
+
+from src.obsidian.obsidian_loader import list_markdown_files
+from src.schemas.document import IndexingState, IndexingBatch
+from src.graphs.nodes.obsidian_read_node import read_documents
+from src.graphs.nodes.chunking_node import chunk_documents
+from src.graphs.nodes.vector_store_node import store_chunks, get_indexing_vectordb
+from src.graphs.instrumentation import stage_timer
+from src.vectorstore.index_metadata import embedding_fingerprint
+from src.vectorstore.indexing_checkpoint import (
+    IndexingCheckpoint, manifest_hash, load_checkpoint, save_checkpoint, clear_checkpoint
+)
+from src.logging.logger_factory import LoggerFactory
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.indexing_batch")
+
+DEFAULT_BATCH_SIZE = 50
+
+# 체크포인트 파일 읽기-수정-쓰기 직렬화 (진행 상황은 메모리가 아니라 db_path의 체크포인트 파일에만 보관)
+_checkpoint_lock = threading.Lock()
+
+
+def _db_path(configurable: Dict[str, Any]) -> str:
+    return configurable.get("db_path", "./obsidian_vectordb")
+
+
+def _batch_size(configurable: Dict[str, Any]) -> int:
+    return max(1, configurable.get("batch_size", DEFAULT_BATCH_SIZE))
+
+
+def _build_manifest(vault_path: str) -> List[Tuple[str, str, float]]:
+    """(파일 경로, 노트 ID, 수정 시간) 목록 (노트 ID는 parse_markdown_file의 id와 같음)"""
+    manifest = []
+    for file_path in list_markdown_files(vault_path):
+        note_id = str(Path(file_path).relative_to(vault_path))
+        manifest.append((file_path, note_id, os.path.getmtime(file_path)))
+    return manifest
+
+
+def _delete_removed_notes(configurable: Dict[str, Any], checkpoint: IndexingCheckpoint,
+                          note_ids: List[str]) -> int:
+    """체크포인트에는 저장됐지만 볼트에서 사라진 노트의 청크를 벡터DB와 체크포인트에서 삭제"""
+    current = set(note_ids)
+    removed = [note_id for note_id in checkpoint.completed_notes if note_id not in current]
+    if not removed:
+        return 0
+
+    deleted_chunks = get_indexing_vectordb(configurable).delete_documents(removed)
+    for note_id in removed:
+        checkpoint.completed_notes.pop(note_id, None)
+    logger.info(f"🗑️ 볼트에서 삭제된 노트 {len(removed)}개 정리: 청크 {deleted_chunks}개 삭제")
+    return len(removed)
+
+
+def _plan_batches(configurable: Dict[str, Any],
+                  checkpoint: IndexingCheckpoint) -> Tuple[List[IndexingBatch], int, int, int, str]:
+    """
+    매니페스트를 배치로 나누고 체크포인트 기준으로 이미 저장된 노트를 제외
+    (볼트에서 삭제된 노트는 벡터DB에서 지움)
+
+    Returns:
+        (처리할 배치, 전체 배치 수, 건너뛴 파일 수, 삭제된 노트 수, 매니페스트 해시)
+    """
+    manifest = _build_manifest(configurable["vault_path"])
+    batch_size = _batch_size(configurable)
+    note_ids = [note_id for _, note_id, _ in manifest]
+    deleted = _delete_removed_notes(configurable, checkpoint, note_ids)
+
+    batches = []
+    skipped = 0
+    total_batches = 0
+    for batch_index, start in enumerate(range(0, len(manifest), batch_size)):
+        total_batches += 1
+        pending = [(path, mtime) for path, note_id, mtime in manifest[start:start + batch_size]
+                   if not checkpoint.is_note_done(note_id, mtime)]
+        skipped += min(batch_size, len(manifest) - start) - len(pending)
+        if pending:
+            batches.append(IndexingBatch(
+                batch_index=batch_index,
+                file_paths=[path for path, _ in pending],
+                file_mtimes=[mtime for _, mtime in pending],
+            ))
+
+    return batches, total_batches, skipped, deleted, manifest_hash(note_ids)
+
+
+def plan_indexing_node(state: IndexingState, config: RunnableConfig) -> Dict[str, Any]:
+    """볼트 경로를 확인하고 체크포인트를 불러와 처리할 파일/배치 수를 계산하는 노드"""
+    logger.info(f"{'*' * 50}")
+    logger.info("PLAN_INDEXING_NODE")
+    logger.info(f"{'*' * 50}")
+
+    configurable = config.get("configurable", {})
+    vault_path = configurable.get("vault_path")
+    if not vault_path:
+        return {"error": "vault_path not provided in config"}
+    if not os.path.isdir(vault_path):
+        return {"error": f"vault_path does not exist: {vault_path}"}
+
+    db_path = _db_path(configurable)
+    try:
+        vector_db = get_indexing_vectordb(configurable)
+    except Exception as e:
+        return {"error": f"Failed to open vector db: {str(e)}"}
+    fingerprint = embedding_fingerprint(vector_db.embedding_type, vector_db.embeddings)
+
+    # 체크포인트 확인 (임베딩 설정이 바뀌었으면 이전 진행 상황은 무효)
+    if not configurable.get("resume", True):
+        clear_checkpoint(db_path)
+    checkpoint = load_checkpoint(db_path)
+    if checkpoint is not None and checkpoint.fingerprint != fingerprint:
+        logger.warning(f"⚠️ 체크포인트의 임베딩 설정이 달라 처음부터 인덱싱합니다: {checkpoint.fingerprint}")
+        checkpoint = None
+    if checkpoint is None:
+        checkpoint = IndexingCheckpoint(fingerprint=fingerprint)
+
+    batches, total_batches, skipped, deleted, manifest = _plan_batches(configurable, checkpoint)
+    checkpoint.start_manifest(manifest, _batch_size(configurable), total_batches)
+    with _checkpoint_lock:
+        save_checkpoint(db_path, checkpoint)
+
+    total_files = skipped + sum(len(batch.file_paths) for batch in batches)
+    logger.info(f"📋 인덱싱 계획: 파일 {total_files}개 중 {skipped}개 건너뜀, "
+                f"배치 {len(batches)}/{total_batches}개 처리 (커서 {checkpoint.batch_cursor})")
+    return {
+        "total_files": total_files,
+        "total_batches": total_batches,
+        "pending_batches": len(batches),
+        "skipped_files": skipped,
+        "deleted_notes": deleted,
+        "batches": batches,
+    }
+
+
+def dispatch_batches(state: IndexingState, config: RunnableConfig) -> Union[str, List[Send]]:
+    """처리할 배치마다 process_batch 노드로 Send (동시 실행 수는 config의 max_concurrency로 제한)"""
+    if state.error or state.pending_batches == 0:
+        return "finalize"
+
+    return [Send("process_batch", batch) for batch in state.batches]
+
+
+def _commit_checkpoint(configurable: Dict[str, Any], batch: IndexingBatch, note_ids: List[str]):
+    """
+    배치 저장 완료를 체크포인트 파일에 기록 (읽기에 성공한 노트만 완료 처리)
+    파일을 다시 읽어 갱신하므로 같은 DB에 동시에 도는 실행끼리도 서로의 기록을 덮어쓰지 않는다.
+    """
+    mtimes = {str(Path(path).relative_to(configurable["vault_path"])): mtime
+              for path, mtime in zip(batch.file_paths, batch.file_mtimes)}
+    db_path = _db_path(configurable)
+
+    with _checkpoint_lock:
+        checkpoint = load_checkpoint(db_path)
+        if checkpoint is None:
+            raise RuntimeError(f"인덱싱 체크포인트가 없습니다: {db_path}")
+        checkpoint.mark_batch(batch.batch_index, {note_id: mtimes[note_id]
+                                                  for note_id in note_ids if note_id in mtimes})
+        save_checkpoint(db_path, checkpoint)
+
+
+def process_batch_node(batch: IndexingBatch, config: RunnableConfig) -> Dict[str, Any]:
+    """배치 하나를 읽기 → 청크 분할 → 저장 → 체크포인트 기록 (문서/청크는 이 노드 안에서만 유지)"""
+    configurable = config.get("configurable", {})
+
+    try:
+        with stage_timer("indexing.read") as stage:
+            documents = read_documents(batch.file_paths, configurable["vault_path"])
+            stage.items = len(documents)
+        with stage_timer("indexing.chunk") as stage:
+            chunks = chunk_documents(
+                documents,
+                chunk_size=configurable.get("chunk_size", 500),
+                chunk_overlap=configurable.get("chunk_overlap", 50),
+            )
+            stage.items = len(chunks)
+        note_ids = [doc.id for doc in documents]
+        with stage_timer("indexing.store") as stage:
+            stored = store_chunks(chunks, configurable, document_ids=note_ids)
+            stage.items = stored
+        _commit_checkpoint(configurable, batch, note_ids)
+    except Exception as e:
+        logger.error(f"❌ 배치 {batch.batch_index} 실패: {e}")
+        return {
+            "processed_files": len(batch.file_paths),
+            "failed_batches": [f"batch {batch.batch_index}: {str(e)}"],
+        }
+
+    logger.info(f"✅ 배치 {batch.batch_index}: 문서 {len(documents)}개, 청크 {stored}개 저장")
+    return {
+        "processed_files": len(batch.file_paths),
+        "total_documents": len(documents),
+        "total_chunks": stored,
+        "completed_batches": [batch.batch_index],
+    }
+
+
+def finalize_indexing_node(state: IndexingState, config: RunnableConfig) -> Dict[str, Any]:
+    """배치 결과를 집계하는 노드"""
+    logger.info(f"{'*' * 50}")
+    logger.info("FINALIZE_INDEXING_NODE")
+    logger.info(f"{'*' * 50}")
+
+    if state.error:
+        return {}
+
+    with _checkpoint_lock:
+        checkpoint = load_checkpoint(_db_path(config.get("configurable", {})))
+
+    logger.info(f"📊 인덱싱 결과: 배치 {len(state.completed_batches)}/{state.pending_batches}개 완료 "
+                f"(건너뛴 파일 {state.skipped_files}개, 삭제된 노트 {state.deleted_notes}개), 문서 {state.total_documents}개, "
+                f"청크 {state.total_chunks}개, 체크포인트 커서 "
+                f"{checkpoint.batch_cursor if checkpoint else '-'}/{state.total_batches}")
+
+    if state.failed_batches:
+        return {"error": f"Failed to index {len(state.failed_batches)} batch(es): "
+                         + "; ".join(state.failed_batches) + " (rerun to resume from checkpoint)"}
+    return {}
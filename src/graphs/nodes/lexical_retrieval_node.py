@@ -0,0 +1,57 @@
+"""Nodes for the lexical (BM25) and title/metadata retrieval branches."""
+import asyncio
+from typing import List, Dict, Any
+
+from langgraph.types import RunnableConfig
+
+from src.schemas.query import QueryState, SearchResult
+from src.retrieval.lexical_index import LexicalIndex, get_lexical_index
+from src.graphs.nodes.retrieval_node import (
+    _get_vector_db, _candidate_k, _to_search_results, run_branch, arun_branch
+)
+from src.logging.logger_factory import LoggerFactory
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.lexical_retrieval")
+
+
+def _ready_index(configurable: Dict[str, Any]) -> LexicalIndex:
+    """어휘 인덱스 (첫 생성이 끝나기 전이면 브랜치 오류로 처리해서 불완전한 결과가 캐시되지 않게 함)"""
+    index = get_lexical_index(_get_vector_db(configurable))
+    if index is None:
+        raise RuntimeError("어휘 인덱스 생성 중")
+    return index
+
+
+def _lexical_search(state: QueryState, configurable: Dict[str, Any]) -> List[SearchResult]:
+    index = _ready_index(configurable)
+    return _to_search_results(index.search(state.query.text, k=_candidate_k(state, configurable)), distance=False)
+
+
+def _title_search(state: QueryState, configurable: Dict[str, Any]) -> List[SearchResult]:
+    index = _ready_index(configurable)
+    return _to_search_results(index.search_titles(state.query.text, k=state.query.top_k), distance=False)
+
+
+def lexical_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """BM25 어휘 검색 브랜치 (정확한 단어 일치)"""
+    configurable = config.get("configurable", {})
+    return run_branch("lexical", state, config, lambda: _lexical_search(state, configurable))
+
+
+async def alexical_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """lexical_retrieval_node의 비동기 버전"""
+    configurable = config.get("configurable", {})
+    return await arun_branch("lexical", state, config,
+                             lambda: asyncio.to_thread(_lexical_search, state, configurable))
+
+
+def title_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """노트 제목/태그 조회 브랜치"""
+    configurable = config.get("configurable", {})
+    return run_branch("title", state, config, lambda: _title_search(state, configurable))
+
+
+async def atitle_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """title_retrieval_node의 비동기 버전"""
+    configurable = config.get("configurable", {})
+    return await arun_branch("title", state, config,
+                             lambda: asyncio.to_thread(_title_search, state, configurable))
@@ -1,36 +1,21 @@
 """Node for reading Obsidian documents."""
-from langgraph.types import RunnableConfig
+from typing import List
 
-from src.obsidian.obsidian_loader import get_raw_documents
-from src.schemas.document import IndexingState, Document
+from src.obsidian.obsidian_loader import read_raw_documents
+from src.schemas.document import Document
 from src.logging.logger_factory import LoggerFactory
-logger = LoggerFactory.get_logger("obsidian_rag.ollama_embeddings")
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.obsidian_read")
 
-def obsidian_read_node(state: IndexingState, config: RunnableConfig) -> IndexingState:
-    """옵시디언 문서를 읽어오는 노드"""
-    logger.info(f"{'*' * 50}")
-    logger.info("OBSIDIAN_READ_NODE")
-    logger.info(f"{'*' * 50}")
-    try:
-        # RunnableConfig에서 configurable 가져오기
-        vault_path = config.get("configurable", {}).get("vault_path")
-        if not vault_path:
-            state.error = "vault_path not provided in config"
-            return state
-
-        raw_documents = get_raw_documents(vault_path)
-        documents = []
-        for doc in raw_documents:
-            documents.append(
-                Document(
-                    id=doc["metadata"]["id"],
-                    content=doc["content"],
-                    metadata=doc["metadata"],
-                    created_at=doc["metadata"].get("create_date"),
-                )
+def read_documents(file_paths: List[str], vault_path: str) -> List[Document]:
+    """배치에 속한 옵시디언 문서들을 읽어오기"""
+    documents = []
+    for doc in read_raw_documents(file_paths, vault_path):
+        documents.append(
+            Document(
+                id=doc["metadata"]["id"],
+                content=doc["content"],
+                metadata=doc["metadata"],
+                created_at=doc["metadata"].get("create_date"),
             )
-        state.documents = documents
-        return state
-    except Exception as e:
-        state.error = f"Failed to obsidian read documents: {str(e)}"
-        return state
+        )
+    return documents
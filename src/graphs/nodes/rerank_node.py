@@ -1,12 +1,168 @@
 """Node for reranking retrieved documents using cross-encoder."""
-# from typing import Dict, Any
-#
-# from src.schemas.query import QueryState
-#
-#
-# def rerank_node(state: QueryState, config: Dict[str, Any]) -> QueryState:
-#     try:
-#         if state.error or not state.query or not state.retrieved_results:
-#             return state
-#
-#     model_name = config.get("rerank_model", "")
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import List, Optional, Callable, Dict, Any
+
+from langchain_core.documents import Document
+from langgraph.types import RunnableConfig
+
+from src.schemas.query import QueryState, SearchResult
+from src.reranking.cross_encoder_reranker import CrossEncoderReranker, get_shared_reranker
+from src.reranking.cascade import CascadeReranker, get_shared_cascade
+from src.logging.logger_factory import LoggerFactory
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.rerank")
+
+# 리랭킹 전용 executor (노드 스레드를 막지 않고 시간 제한을 걸기 위함)
+_rerank_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rerank")
+
+# 캐스케이드가 경로를 정할 때 기준으로 삼는 결과 수 (MCP 검색 한 페이지 최대 결과 수)
+DEFAULT_CASCADE_K = 10
+
+
+def _rerank(reranker: CrossEncoderReranker, query_text: str, results: List[SearchResult],
+            top_k: int, candidates: Optional[int] = None) -> List[SearchResult]:
+    """
+    공유 cross-encoder로 SearchResult 리스트를 리랭킹
+    candidates가 주어지면 상위 candidates개만 리랭킹하고 나머지는 기존 순서대로 뒤에 붙인다.
+    """
+    window = results if candidates is None else results[:candidates]
+    documents = [
+        Document(page_content=result.content, metadata={**result.metadata, "_index": idx})
+        for idx, result in enumerate(window)
+    ]
+
+    reranked = []
+    for doc, score in reranker.rerank(query_text, documents, top_k=min(top_k, len(documents))):
+        original = results[doc.metadata["_index"]]
+        reranked.append(original.model_copy(update={"score": float(score)}))
+    return (reranked + results[len(window):])[:top_k]
+
+
+def _cascade_rerank(cascade: CascadeReranker, query_text: str, results: List[SearchResult],
+                    dense_results: List[SearchResult], top_k: int, candidates: Optional[int],
+                    cascade_k: int) -> List[SearchResult]:
+    """
+    적응형 캐스케이드로 SearchResult 리스트를 리랭킹
+    경로(skip/shrink/full/grow)는 dense 브랜치의 bi-encoder 거리로 정하고, 리랭킹은 융합 순서의 후보에 적용한다.
+    리랭킹하지 않은 후보는 기존 점수와 순서를 그대로 유지한다.
+    """
+    window = results[:cascade.policy.max_candidates]
+    pairs = [
+        (Document(page_content=result.content, metadata={**result.metadata, "_index": idx}), 1 - result.score)
+        for idx, result in enumerate(window)
+    ]
+    distances = [1 - result.score for result in dense_results] or None
+
+    ranked, _ = cascade.rerank(query_text, pairs, k=min(cascade_k, len(pairs)),
+                               candidate_k=candidates or len(pairs), distances=distances)
+    picked = [doc.metadata["_index"] for doc, _ in ranked]
+    reranked = [results[idx].model_copy(update={"score": float(score)})
+                for idx, (_, score) in zip(picked, ranked)]
+    picked_set = set(picked)
+    rest = [result for idx, result in enumerate(window) if idx not in picked_set]
+    return (reranked + rest + results[len(window):])[:top_k]
+
+
+def _rerank_job(state: QueryState, configurable: Dict[str, Any],
+                reranker: CrossEncoderReranker) -> Callable[[], List[SearchResult]]:
+    """리랭킹 executor에서 실행할 작업 (rerank_cascade가 켜져 있으면 캐스케이드, 아니면 상위 후보 전체 리랭킹)"""
+    top_k = state.query.top_k
+    candidates = configurable.get("rerank_candidates")
+    if configurable.get("rerank_cascade", False):
+        cascade = get_shared_cascade(reranker, configurable.get("rerank_latency_budget_ms", 300.0))
+        return partial(_cascade_rerank, cascade, state.query.text, state.retrieved_results,
+                       state.branch_results.get("dense") or [], top_k, candidates,
+                       configurable.get("cascade_k", DEFAULT_CASCADE_K))
+    return partial(_rerank, reranker, state.query.text, state.retrieved_results, top_k, candidates)
+
+
+def rerank_node(state: QueryState, config: RunnableConfig) -> QueryState:
+    """
+    검색 후보를 cross-encoder로 리랭킹하는 노드 (시간 초과/실패 시 bi-encoder 순서 유지)
+    결과는 branch_status["rerank"]에 기록해서 시간 초과로 리랭킹이 빠진 결과가 캐시되지 않게 한다.
+    """
+    logger.info(f"{'*' * 50}")
+    logger.info("RERANK_NODE")
+    logger.info(f"{'*' * 50}")
+
+    try:
+        if state.error or not state.query or not state.retrieved_results:
+            return state
+
+        configurable = config.get("configurable", {})
+        top_k = state.query.top_k
+
+        if not configurable.get("use_reranking", False):
+            state.retrieved_results = state.retrieved_results[:top_k]
+            state.branch_status["rerank"] = "disabled"
+            return state
+
+        model_name = configurable.get("rerank_model", "jhgan/ko-sroberta-multitask")
+        timeout = configurable.get("rerank_timeout", 2.0)
+
+        # 모델 로딩은 시간 제한 밖에서 (첫 쿼리가 로딩 시간 때문에 항상 시간 초과되지 않도록, 보통 워밍업에서 이미 로딩됨)
+        reranker = get_shared_reranker(model_name)
+        # 시간 초과 시 이미 실행 중인 리랭킹은 멈출 수 없으므로 결과만 버림 (점수는 캐시에 남아 다음 쿼리가 재사용)
+        future = _rerank_executor.submit(_rerank_job(state, configurable, reranker))
+        try:
+            state.retrieved_results = future.result(timeout=timeout)
+            state.branch_status["rerank"] = "ok"
+        except FutureTimeoutError:
+            logger.warning(f"⚠️ 리랭킹 시간 초과({timeout}초), bi-encoder 순서로 대체")
+            state.retrieved_results = state.retrieved_results[:top_k]
+            state.branch_status["rerank"] = "timeout"
+        except Exception as e:
+            logger.warning(f"⚠️ 리랭킹 실패, bi-encoder 순서로 대체: {e}")
+            state.retrieved_results = state.retrieved_results[:top_k]
+            state.branch_status["rerank"] = f"error: {e}"
+
+        return state
+
+    except Exception as e:
+        state.error = f"Failed to rerank documents: {str(e)}"
+        return state
+
+
+async def arerank_node(state: QueryState, config: RunnableConfig) -> QueryState:
+    """rerank_node의 비동기 버전 (리랭킹은 전용 executor에서 실행하고 이벤트 루프에서 시간 제한만 기다림)"""
+    logger.info(f"{'*' * 50}")
+    logger.info("RERANK_NODE (async)")
+    logger.info(f"{'*' * 50}")
+
+    try:
+        if state.error or not state.query or not state.retrieved_results:
+            return state
+
+        configurable = config.get("configurable", {})
+        top_k = state.query.top_k
+
+        if not configurable.get("use_reranking", False):
+            state.retrieved_results = state.retrieved_results[:top_k]
+            state.branch_status["rerank"] = "disabled"
+            return state
+
+        model_name = configurable.get("rerank_model", "jhgan/ko-sroberta-multitask")
+        timeout = configurable.get("rerank_timeout", 2.0)
+
+        reranker = await asyncio.to_thread(get_shared_reranker, model_name)
+        future = asyncio.get_running_loop().run_in_executor(
+            _rerank_executor, _rerank_job(state, configurable, reranker)
+        )
+        try:
+            state.retrieved_results = await asyncio.wait_for(future, timeout=timeout)
+            state.branch_status["rerank"] = "ok"
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ 리랭킹 시간 초과({timeout}초), bi-encoder 순서로 대체")
+            state.retrieved_results = state.retrieved_results[:top_k]
+            state.branch_status["rerank"] = "timeout"
+        except Exception as e:
+            logger.warning(f"⚠️ 리랭킹 실패, bi-encoder 순서로 대체: {e}")
+            state.retrieved_results = state.retrieved_results[:top_k]
+            state.branch_status["rerank"] = f"error: {e}"
+
+        return state
+
+    except Exception as e:
+        state.error = f"Failed to rerank documents: {str(e)}"
+        return state
@@ -1,51 +1,171 @@
-"""Node for retrieving similar documents from vector store."""
+"""Nodes for hybrid retrieval: shared deadline and the dense vector branch."""
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Tuple, Dict, Any, Callable, Awaitable
+
+from langchain_core.documents import Document
 from langgraph.types import RunnableConfig
 
 from src.schemas.query import QueryState, SearchResult
-from src.vectorstore.vector_db import VectorDB
+from src.vectorstore.vector_db import get_vectordb
+from src.vectorstore.sharded_db import PartialShardResults
+from src.utils.metrics import metrics
 from src.logging.logger_factory import LoggerFactory
-logger = LoggerFactory.get_logger("obsidian_rag.ollama_embeddings")
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.retrieval")
 
-def retrieval_node(state: QueryState, config: RunnableConfig) -> QueryState:
-    """벡터 DB에서 유사 문서를 검색하는 노드"""
-    logger.info(f"{'*' * 50}")
-    logger.info("RETRIEVAL_NODE")
-    logger.info(f"{'*' * 50}")
-    try:
-        if state.error or not state.query:
-            return state
-
-        # 설정
-        db_path = config.get("configurable", {}).get("db_path", "./obsidian_vectordb")
-        embedding_type = os.getenv("EMBEDDING_TYPE", "ollama")
-        top_k = state.query.top_k
-
-        # 기존 VectorDB 사용
-        vector_db = VectorDB(
-            persist_directory=db_path,
-            embedding_type=embedding_type,
-            use_reranking=False  # retrieval 단계에선 리랭킹 안함
+DEFAULT_RETRIEVERS = ("dense", "lexical", "title")
+# 공통 마감 기본값 (초): 콜드 스타트나 대량 인덱싱 중 Ollama 쿼리 임베딩도 기다릴 수 있도록 넉넉하게 둔다
+DEFAULT_RETRIEVAL_DEADLINE = 10.0
+BRANCH_METRIC_PREFIX = "retrieval.branch."
+
+# 동기 그래프에서 브랜치 검색을 마감 시간 안에서만 기다리기 위한 executor
+_branch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retrieval-branch")
+
+
+def _get_vector_db(configurable: Dict[str, Any]):
+    """configurable로 넘어온 벡터DB(MCP 서버 등), 없으면 db_path의 공유 VectorDB"""
+    vector_db = configurable.get("vector_db")
+    if vector_db is not None:
+        return vector_db
+
+    db_path = configurable.get("db_path", "./obsidian_vectordb")
+    embedding_type = os.getenv("EMBEDDING_TYPE", "ollama")
+    return get_vectordb(db_path, embedding_type=embedding_type)  # retrieval 단계에선 리랭킹 안함
+
+
+def _candidate_k(state: QueryState, configurable: Dict[str, Any]) -> int:
+    """검색할 후보 수 (리랭킹을 쓰면 rerank_node가 고를 수 있도록 후보를 넉넉히 가져옴)"""
+    top_k = state.query.top_k
+    if configurable.get("use_reranking", False):
+        top_k = max(top_k, configurable.get("rerank_candidates") or 20)
+    return top_k
+
+
+def _to_search_results(results: List[Tuple[Document, float]], distance: bool = True) -> List[SearchResult]:
+    """(문서, 점수) → SearchResult 스키마로 변환 (distance=True면 거리를 유사도로 변환)"""
+    search_results = []
+    for doc, score in results:
+        search_result = SearchResult(
+            content=doc.page_content,
+            score=float(1 - score) if distance else float(score),  # distance → similarity 변환
+            document_id=doc.metadata.get("id", ""),
+            chunk_id=doc.metadata.get("chunk_id", ""),
+            metadata=doc.metadata
         )
+        search_results.append(search_result)
+    return search_results
+
+
+def _branch_enabled(name: str, configurable: Dict[str, Any]) -> bool:
+    return name in configurable.get("retrievers", DEFAULT_RETRIEVERS)
+
+
+def _remaining(state: QueryState) -> float:
+    """공통 마감까지 남은 시간 (초)"""
+    if state.deadline is None:
+        return DEFAULT_RETRIEVAL_DEADLINE
+    return max(0.0, state.deadline - time.monotonic())
+
+
+def _branch_outcome(name: str, status: str) -> Dict[str, Any]:
+    """브랜치 결과 상태를 retrieval.branch.<이름>.<ok|timeout|partial|error> 카운터에 기록 (dense 마감 초과를 따로 집계)"""
+    metrics.incr(f"{BRANCH_METRIC_PREFIX}{name}.{status.split(':', 1)[0]}")
+    return {"branch_status": {name: status}}
+
+
+def run_branch(name: str, state: QueryState, config: RunnableConfig,
+               search: Callable[[], List[SearchResult]]) -> Dict[str, Any]:
+    """
+    검색 브랜치 실행 (동기): 공통 마감까지만 기다리고, 넘기면 결과 없이 timeout으로 표시
+    일부 샤드만 응답한 검색은 그 결과를 쓰되 partial로 표시한다.
+    마감을 넘긴 검색은 백그라운드에서 끝나도록 두고 응답을 막지 않는다.
+    """
+    if state.error or not state.query or not _branch_enabled(name, config.get("configurable", {})):
+        return {"branch_status": {name: "disabled"}}
 
-        # 검색 (점수 포함)
-        results = vector_db.search_with_score(state.query.text, k=top_k)
+    future = _branch_executor.submit(search)
+    try:
+        results = future.result(timeout=_remaining(state))
+    except FutureTimeoutError:
+        logger.warning(f"⏱️ 검색 브랜치 마감 초과로 제외: {name}")
+        return _branch_outcome(name, "timeout")
+    except PartialShardResults as e:
+        # 응답한 샤드 결과는 쓰되 partial로 표시해서 불완전한 결과가 캐시되지 않게 함
+        logger.warning(f"⚠️ 검색 브랜치 일부 결과만 사용 ({name}): {e}")
+        return {"branch_results": {name: e.results}, **_branch_outcome(name, f"partial: {e}")}
+    except Exception as e:
+        logger.warning(f"⚠️ 검색 브랜치 실패 ({name}): {e}")
+        return _branch_outcome(name, f"error: {e}")
+
+    return {"branch_results": {name: results}, **_branch_outcome(name, "ok")}
 
-        # SearchResult 스키마로 변환
-        search_results = []
-        for doc, score in results:
-            search_result = SearchResult(
-                content=doc.page_content,
-                score=float(1 - score),  # distance → similarity 변환
-                document_id=doc.metadata.get("id", ""),
-                chunk_id=doc.metadata.get("chunk_id", ""),
-                metadata=doc.metadata
-            )
-            search_results.append(search_result)
 
-        state.retrieved_results = search_results
-        return state
+async def arun_branch(name: str, state: QueryState, config: RunnableConfig,
+                      search: Callable[[], Awaitable[List[SearchResult]]]) -> Dict[str, Any]:
+    """run_branch의 비동기 버전 (마감을 넘기면 대기를 취소하고 timeout으로 표시)"""
+    if state.error or not state.query or not _branch_enabled(name, config.get("configurable", {})):
+        return {"branch_status": {name: "disabled"}}
 
+    try:
+        results = await asyncio.wait_for(search(), timeout=_remaining(state))
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ 검색 브랜치 마감 초과로 제외: {name}")
+        return _branch_outcome(name, "timeout")
+    except PartialShardResults as e:
+        # 응답한 샤드 결과는 쓰되 partial로 표시해서 불완전한 결과가 캐시되지 않게 함
+        logger.warning(f"⚠️ 검색 브랜치 일부 결과만 사용 ({name}): {e}")
+        return {"branch_results": {name: e.results}, **_branch_outcome(name, f"partial: {e}")}
     except Exception as e:
-        state.error = f"Failed to retrieve documents: {str(e)}"
-        return state
\ No newline at end of file
+        logger.warning(f"⚠️ 검색 브랜치 실패 ({name}): {e}")
+        return _branch_outcome(name, f"error: {e}")
+
+    return {"branch_results": {name: results}, **_branch_outcome(name, "ok")}
+
+
+def prepare_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """모든 검색 브랜치가 공유할 마감 시각 설정"""
+    logger.info(f"{'*' * 50}")
+    logger.info("PREPARE_RETRIEVAL_NODE")
+    logger.info(f"{'*' * 50}")
+
+    budget = config.get("configurable", {}).get("retrieval_deadline", DEFAULT_RETRIEVAL_DEADLINE)
+    return {"deadline": time.monotonic() + budget}
+
+
+async def aprepare_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """prepare_retrieval_node의 비동기 버전"""
+    return prepare_retrieval_node(state, config)
+
+
+def dense_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """벡터 DB에서 유사 문서를 검색하는 브랜치"""
+    configurable = config.get("configurable", {})
+
+    def search() -> List[SearchResult]:
+        vector_db = _get_vector_db(configurable)
+        try:
+            results = vector_db.search_with_score(state.query.text, k=_candidate_k(state, configurable))
+        except PartialShardResults as e:
+            e.results = _to_search_results(e.results)
+            raise
+        return _to_search_results(results)
+
+    return run_branch("dense", state, config, search)
+
+
+async def adense_retrieval_node(state: QueryState, config: RunnableConfig) -> Dict[str, Any]:
+    """dense_retrieval_node의 비동기 버전 (aembed_query + 워커 스레드 조회로 이벤트 루프를 막지 않음)"""
+    configurable = config.get("configurable", {})
+
+    async def search() -> List[SearchResult]:
+        vector_db = _get_vector_db(configurable)
+        try:
+            results = await vector_db.asearch_with_score(state.query.text, k=_candidate_k(state, configurable))
+        except PartialShardResults as e:
+            e.results = _to_search_results(e.results)
+            raise
+        return _to_search_results(results)
+
+    return await arun_branch("dense", state, config, search)
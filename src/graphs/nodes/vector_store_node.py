@@ -1,45 +1,49 @@
 """Node for storing embeddings in vector database."""
 import os
-from langgraph.types import RunnableConfig
+from typing import List, Dict, Any, Optional
 
-from src.schemas.document import IndexingState
-from src.vectorstore.vector_db import VectorDB
+from src.schemas.chunk_batch import ChunkBatch
+from src.vectorstore.vector_db import VectorDB, get_vectordb
 from src.logging.logger_factory import LoggerFactory
-logger = LoggerFactory.get_logger("obsidian_rag.ollama_embeddings")
-
-def vector_store_node(state: IndexingState, config: RunnableConfig) -> IndexingState:
-    logger.info(f"{'*' * 50}")
-    logger.info("VECTOR_STORE_NODE")
-    logger.info(f"{'*' * 50}")
-
-    try:
-        if state.error:
-            return state
-
-        # 설정
-        db_path = config.get("configurable", {}).get("db_path", "./obsidian_vectordb")
-        embedding_type = os.getenv("EMBEDDING_TYPE", "ollama")
-        use_reranking = config.get("configurable", {}).get("use_reranking", False)
-
-        vector_db = VectorDB(
-            persist_directory=db_path,
-            embedding_type=embedding_type,
-            use_reranking=use_reranking,
-        )
-
-        # chunk 스키마 → 딕셔너리 변환
+logger = LoggerFactory.get_logger("obsidian_rag.graphs.vector_store")
+
+def store_chunks(chunks: ChunkBatch, configurable: Dict[str, Any], document_ids: Optional[List[str]] = None) -> int:
+    """
+    청크들을 벡터DB에 저장 (같은 db_path의 VectorDB는 배치 간에 공유)
+    청크 ID(문서 ID#chunk_N)로 먼저 upsert한 뒤, 다시 인덱싱하는 문서의 이전 청크 중 이번에 쓰지 않은 ID만 지워서
+    재실행해도 중복/잔여 청크가 남지 않고, 임베딩이 실패해도 이전 청크가 그대로 검색된다.
+
+    Args:
+        chunks: 저장할 청크 묶음
+        configurable: 그래프 configurable 설정
+        document_ids: 이번에 (다시) 인덱싱한 문서 ID (이전 청크 정리 대상)
+
+    Returns:
+        저장된 청크 수
+    """
+    vector_db = get_indexing_vectordb(configurable)
+
+    chunk_ids = chunks.ids if chunks else []
+    if chunks:
+        # 컬럼형 청크 → 딕셔너리 변환 (청크별 메타데이터는 여기서 처음 만들어짐)
         documents = [
             {
-                "content": chunk.content,
-                "metadata": chunk.metadata,
+                "content": text,
+                "metadata": metadata,
             }
-            for chunk in state.chunks
+            for _, text, metadata in chunks.records()
         ]
 
-        vector_db.add_documents(documents)
+        vector_db.add_documents(documents, ids=chunk_ids)
+
+    if document_ids:
+        vector_db.delete_documents(document_ids, keep_ids=chunk_ids)
+    return len(chunk_ids)
 
-        return state
 
-    except Exception as e:
-        state.error = f"Failed to store in vector db: {str(e)}"
-        return state
\ No newline at end of file
+def get_indexing_vectordb(configurable: Dict[str, Any]) -> VectorDB:
+    """인덱싱 설정에 맞는 공유 VectorDB"""
+    db_path = configurable.get("db_path", "./obsidian_vectordb")
+    embedding_type = os.getenv("EMBEDDING_TYPE", "ollama")
+    use_reranking = configurable.get("use_reranking", False)
+    return get_vectordb(db_path, embedding_type=embedding_type, use_reranking=use_reranking)
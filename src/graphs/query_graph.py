@@ -1,40 +1,122 @@
 """Query workflow for retrieving and reranking documents."""
+import threading
 from typing import Dict, Any
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from src.schemas.query import QueryState, Query
-from src.graphs.nodes.retrieval_node import retrieval_node
-from src.graphs.nodes.context_builder_node import context_builder_node
+from src.graphs.nodes.retrieval_node import (
+    prepare_retrieval_node, aprepare_retrieval_node, dense_retrieval_node, adense_retrieval_node
+)
+from src.graphs.nodes.lexical_retrieval_node import (
+    lexical_retrieval_node, alexical_retrieval_node, title_retrieval_node, atitle_retrieval_node
+)
+from src.graphs.nodes.fusion_node import fusion_node, afusion_node
+from src.graphs.nodes.rerank_node import rerank_node, arerank_node
+from src.graphs.nodes.context_builder_node import context_builder_node, acontext_builder_node
+from src.graphs.instrumentation import instrument_node, run_timer
+
+
+RETRIEVAL_BRANCHES = {
+    "dense": (dense_retrieval_node, adense_retrieval_node),
+    "lexical": (lexical_retrieval_node, alexical_retrieval_node),
+    "title": (title_retrieval_node, atitle_retrieval_node),
+}
+
+
+def _count_results(state: QueryState) -> int:
+    return len(state.retrieved_results)
+
+
+def _count_branch_results(update: Dict[str, Any]) -> int:
+    return sum(len(results) for results in update.get("branch_results", {}).values())
+
+
+def _instrumented(name: str, func, afunc, count_items=_count_results) -> RunnableLambda:
+    """동기/비동기 노드를 같은 지표 이름으로 계측해서 하나의 노드로 묶기"""
+    return RunnableLambda(instrument_node(name, func, count_items=count_items),
+                          afunc=instrument_node(name, afunc, count_items=count_items))
 
 
 def create_query_graph():
-    """쿼리 그래프 생성"""
+    """
+    쿼리 그래프 생성
+    prepare(공통 마감 설정) → dense / lexical / title 브랜치 병렬 실행 → fuse(RRF) → rerank → build_context
+    """
 
     # 그래프 초기화
     graph = StateGraph(QueryState)
 
-    # 노드 추가
-    graph.add_node("retrieve", retrieval_node)
-    graph.add_node("build_context", context_builder_node)
+    # 노드 추가 (invoke는 동기 노드, ainvoke는 비동기 노드로 실행)
+    graph.add_node("prepare", _instrumented("query.prepare", prepare_retrieval_node, aprepare_retrieval_node,
+                                            count_items=None))
+    for branch, (func, afunc) in RETRIEVAL_BRANCHES.items():
+        graph.add_node(f"retrieve_{branch}", _instrumented(f"query.retrieve_{branch}", func, afunc,
+                                                           count_items=_count_branch_results))
+    graph.add_node("fuse", _instrumented("query.fuse", fusion_node, afusion_node))
+    graph.add_node("rerank", _instrumented("query.rerank", rerank_node, arerank_node))
+    graph.add_node("build_context", _instrumented("query.build_context", context_builder_node, acontext_builder_node))
 
-    # 엣지 연결
-    graph.set_entry_point("retrieve")
-    graph.add_edge("retrieve", "build_context")
+    # 엣지 연결 (브랜치는 같은 superstep에서 동시에 실행되고 fuse에서 합류)
+    graph.set_entry_point("prepare")
+    for branch in RETRIEVAL_BRANCHES:
+        graph.add_edge("prepare", f"retrieve_{branch}")
+    graph.add_edge([f"retrieve_{branch}" for branch in RETRIEVAL_BRANCHES], "fuse")
+    graph.add_edge("fuse", "rerank")
+    graph.add_edge("rerank", "build_context")
     graph.add_edge("build_context", END)
 
     return graph.compile()
 
 
+# 컴파일된 그래프 캐시 (모듈 단위로 한 번만 컴파일)
+_compiled_query_graph = None
+_compile_lock = threading.Lock()
+
+
+def get_query_graph():
+    """
+    컴파일된 쿼리 그래프 반환 (최초 1회만 빌드/컴파일)
+
+    컴파일된 그래프는 체크포인터 없이 상태를 invoke 단위로만 들고 있으므로 스레드 간 공유해도 안전하다.
+    실행별 설정은 config["configurable"]로만 전달한다.
+    """
+    global _compiled_query_graph
+    if _compiled_query_graph is None:
+        with _compile_lock:
+            if _compiled_query_graph is None:
+                _compiled_query_graph = create_query_graph()
+    return _compiled_query_graph
+
+
 # 편의 함수
 def query_obsidian(query_text: str, top_k: int = 5, config: Dict[str, Any] = None):
     """옵시디언 노트 검색"""
     if config is None:
         config = {}
 
-    graph = create_query_graph()
+    graph = get_query_graph()
+    initial_state = QueryState(
+        query=Query(text=query_text, top_k=top_k)
+    )
+
+    with run_timer("query") as run:
+        result = graph.invoke(initial_state, config={"configurable": config})
+        run.items = len(result.get("retrieved_results", []))
+    return result
+
+
+async def aquery_obsidian(query_text: str, top_k: int = 5, config: Dict[str, Any] = None):
+    """옵시디언 노트 검색 (비동기, 같은 컴파일된 그래프를 ainvoke로 실행)"""
+    if config is None:
+        config = {}
+
+    graph = get_query_graph()
     initial_state = QueryState(
         query=Query(text=query_text, top_k=top_k)
     )
 
-    result = graph.invoke(initial_state, config={"configurable": config})
+    with run_timer("query") as run:
+        result = await graph.ainvoke(initial_state, config={"configurable": config})
+        run.items = len(result.get("retrieved_results", []))
     return result
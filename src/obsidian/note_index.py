@@ -0,0 +1,356 @@
+"""
+노트 헤딩 오프셋 인덱스
+노트마다 헤딩의 바이트 위치, 섹션 범위, 일정 간격의 줄 시작 위치를 한 번 스캔해서 JSON으로 저장해 두고,
+노트 조회는 파일 전체를 읽지 않고 seek(범위/섹션/줄) 또는 mmap(검색 청크 위치 찾기)으로 필요한 부분만 읽는다.
+파일의 (수정 시간, 크기)가 바뀌면 인덱스를 다시 만든다.
+
+    store = NoteIndexStore(os.path.join(VECTORDB_PATH, "note_index"))
+    index = store.get(file_path)
+    section = index.find_section("회의 > 결정 사항")
+    text = read_range(file_path, section.start, section.end)
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import frontmatter
+from pydantic import BaseModel, Field
+
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.note_index")
+
+NOTE_INDEX_FORMAT = 1
+# 줄 번호 → 바이트 위치 체크포인트 간격 (줄 범위 조회는 가장 가까운 체크포인트에서 seek 후 읽음)
+LINE_CHECKPOINT_INTERVAL = 256
+
+_HEADING_RE = re.compile(rb"^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$")
+_FENCE_RE = re.compile(rb"^[ \t]{0,3}(```|~~~)")
+_FRONTMATTER_FENCE = b"---"
+
+
+class NoteSection(BaseModel):
+    """헤딩 하나가 시작하는 섹션 (하위 헤딩 섹션 포함)"""
+    level: int = Field(description="헤딩 레벨 (1~6)")
+    title: str = Field(description="헤딩 텍스트")
+    path: str = Field(description="상위 헤딩을 포함한 경로 (예: 회의 > 결정 사항)")
+    line: int = Field(description="헤딩 줄 번호 (1부터, 파일 기준)")
+    start: int = Field(description="헤딩 줄 시작 바이트 위치")
+    end: int = Field(description="섹션 끝 바이트 위치 (같거나 높은 레벨의 다음 헤딩 또는 파일 끝)")
+
+
+class NoteOffsetIndex(BaseModel):
+    """노트 하나의 헤딩/줄 오프셋 인덱스"""
+    format: int = Field(default=NOTE_INDEX_FORMAT, description="인덱스 형식 버전")
+    source: str = Field(description="노트 파일 경로")
+    mtime_ns: int = Field(description="인덱싱 당시 파일 수정 시간 (ns)")
+    size: int = Field(description="인덱싱 당시 파일 크기 (바이트)")
+    title: str = Field(description="frontmatter title 또는 파일 이름")
+    metadata: Dict[str, str] = Field(default_factory=dict, description="frontmatter (문자열로 변환)")
+    body_offset: int = Field(default=0, description="frontmatter 다음 본문 시작 바이트 위치")
+    line_count: int = Field(default=0, description="전체 줄 수")
+    line_checkpoints: List[int] = Field(
+        default_factory=list,
+        description=f"1, {LINE_CHECKPOINT_INTERVAL + 1}, ... 번째 줄의 시작 바이트 위치"
+    )
+    sections: List[NoteSection] = Field(default_factory=list, description="헤딩 순서대로의 섹션 목록")
+
+    def find_section(self, query: str) -> Optional[NoteSection]:
+        """
+        헤딩 텍스트 또는 경로("상위 > 하위")로 섹션 찾기
+        (경로/제목 완전 일치 → 경로 끝부분 일치 → 제목 부분 일치 순, 대소문자 무시)
+        """
+        needle = " > ".join(part.strip() for part in query.strip().lstrip("#").split(">")).lower()
+        if not needle:
+            return None
+        for matches in (
+            lambda s: s.path.lower() == needle or s.title.lower() == needle,
+            lambda s: s.path.lower().endswith(" > " + needle),
+            lambda s: needle in s.title.lower(),
+        ):
+            for section in self.sections:
+                if matches(section):
+                    return section
+        return None
+
+    def section_at(self, offset: int) -> Optional[NoteSection]:
+        """바이트 위치를 포함하는 가장 깊은 섹션 (첫 헤딩 이전이면 None)"""
+        found = None
+        for section in self.sections:
+            if section.start > offset:
+                break
+            if offset < section.end:
+                found = section
+        return found
+
+    def line_checkpoint(self, line: int) -> Tuple[int, int]:
+        """줄 번호 이전의 가장 가까운 (체크포인트 줄 번호, 바이트 위치)"""
+        if not self.line_checkpoints:
+            return 1, 0
+        slot = min(max(line - 1, 0) // LINE_CHECKPOINT_INTERVAL, len(self.line_checkpoints) - 1)
+        return slot * LINE_CHECKPOINT_INTERVAL + 1, self.line_checkpoints[slot]
+
+    def outline(self) -> str:
+        """헤딩 목차 (줄 번호, 섹션 크기 포함)"""
+        lines = []
+        for section in self.sections:
+            indent = "  " * (section.level - 1)
+            lines.append(f"{indent}- {section.title} (줄 {section.line}, {section.end - section.start:,}B)")
+        return "\n".join(lines)
+
+
+def _parse_frontmatter(header: bytes, source: str) -> Tuple[str, Dict[str, str]]:
+    """frontmatter 블록에서 제목과 메타데이터 추출 (파싱 실패 시 파일 이름)"""
+    title = Path(source).stem
+    if not header:
+        return title, {}
+    try:
+        post = frontmatter.loads(header.decode("utf-8", errors="replace"))
+    except Exception as e:
+        logger.warning(f"⚠️ frontmatter 파싱 실패 ({source}): {e}")
+        return title, {}
+    metadata = {str(key): str(value) for key, value in post.metadata.items()}
+    return metadata.get("title", title), metadata
+
+
+def build_note_index(path: str) -> NoteOffsetIndex:
+    """
+    노트를 줄 단위로 한 번 스캔해서 오프셋 인덱스 생성 (파일 전체를 메모리에 올리지 않음)
+
+    Args:
+        path: 노트 파일 경로
+
+    Returns:
+        헤딩 섹션, 줄 체크포인트, frontmatter 정보를 담은 인덱스
+    """
+    stat = os.stat(path)
+    headings: List[Tuple[int, str, int, int]] = []  # (레벨, 제목, 줄 번호, 시작 위치)
+    checkpoints: List[int] = []
+    header = b""
+    body_offset = 0
+    in_frontmatter = False
+    fence: Optional[bytes] = None
+    offset = 0
+    line_no = 0
+
+    with open(path, "rb") as f:
+        for raw in f:
+            line_no += 1
+            if (line_no - 1) % LINE_CHECKPOINT_INTERVAL == 0:
+                checkpoints.append(offset)
+            line = raw.rstrip(b"\r\n")
+
+            if line_no == 1 and line.strip() == _FRONTMATTER_FENCE:
+                in_frontmatter = True
+            elif in_frontmatter:
+                if line.strip() == _FRONTMATTER_FENCE:
+                    in_frontmatter = False
+                    body_offset = offset + len(raw)
+            elif fence is not None:
+                # 코드 블록 안의 '#'은 헤딩이 아님
+                if line.lstrip().startswith(fence):
+                    fence = None
+            else:
+                fence_match = _FENCE_RE.match(line)
+                if fence_match:
+                    fence = fence_match.group(1)
+                else:
+                    heading = _HEADING_RE.match(line)
+                    if heading:
+                        title = heading.group(2).decode("utf-8", errors="replace").strip()
+                        headings.append((len(heading.group(1)), title, line_no, offset))
+            offset += len(raw)
+
+        if body_offset:
+            f.seek(0)
+            header = f.read(body_offset)
+
+    # 닫히지 않은 frontmatter는 본문으로 취급
+    title, metadata = _parse_frontmatter(header, path)
+
+    # 열린 섹션 스택: 같거나 높은 레벨의 헤딩이 나오면 그 위치에서 닫음
+    sections: List[NoteSection] = []
+    open_sections: List[NoteSection] = []
+    for level, heading_title, line, start in headings:
+        while open_sections and open_sections[-1].level >= level:
+            open_sections.pop().end = start
+        path_titles = [section.title for section in open_sections] + [heading_title]
+        section = NoteSection(level=level, title=heading_title, path=" > ".join(path_titles),
+                              line=line, start=start, end=offset)
+        open_sections.append(section)
+        sections.append(section)
+
+    return NoteOffsetIndex(
+        source=path, mtime_ns=stat.st_mtime_ns, size=offset, title=title, metadata=metadata,
+        body_offset=body_offset, line_count=line_no, line_checkpoints=checkpoints, sections=sections,
+    )
+
+
+def utf8_boundary(path: str, offset: int) -> int:
+    """offset이 UTF-8 문자 중간이면 그 문자의 시작 바이트로 당긴 위치 (문자 경계나 파일 끝이면 그대로)"""
+    if offset <= 0:
+        return 0
+    window_start = max(0, offset - 3)  # UTF-8 문자는 최대 4바이트
+    with open(path, "rb") as f:
+        f.seek(window_start)
+        data = f.read(offset - window_start + 1)
+    position = offset - window_start
+    if position >= len(data):
+        return offset
+    # 연속 바이트(0b10xxxxxx)면 선두 바이트까지 이동
+    while position > 0 and data[position] & 0xC0 == 0x80:
+        position -= 1
+    return window_start + position
+
+
+def read_range(path: str, start: int, end: int) -> str:
+    """
+    바이트 범위 [start, end) 읽기 (seek, 범위 경계에서 잘린 UTF-8 문자는 버림)
+    페이지를 나눠 읽을 때는 경계를 utf8_boundary로 맞춰야 경계의 문자가 양쪽에서 모두 빠지지 않는다.
+    """
+    if end <= start:
+        return ""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return data.decode("utf-8", errors="ignore")
+
+
+def read_lines(path: str, index: NoteOffsetIndex, start_line: int, end_line: int,
+               max_bytes: int) -> Tuple[str, int]:
+    """
+    줄 범위 [start_line, end_line] 읽기 (가장 가까운 줄 체크포인트로 seek 후 필요한 줄까지만 읽음)
+
+    Returns:
+        (텍스트, 실제로 읽은 마지막 줄 번호) (max_bytes를 넘으면 그 전 줄까지)
+    """
+    line, offset = index.line_checkpoint(start_line)
+    chunks: List[bytes] = []
+    size = 0
+    last_line = start_line - 1
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if line > end_line:
+                break
+            if line >= start_line:
+                if chunks and size + len(raw) > max_bytes:
+                    break
+                chunks.append(raw)
+                size += len(raw)
+                last_line = line
+            line += 1
+    return b"".join(chunks).decode("utf-8", errors="replace"), last_line
+
+
+def find_text_offset(path: str, text: str, start: int = 0, near: Optional[int] = None,
+                     max_words: int = 24) -> Optional[int]:
+    """
+    정리된 청크 텍스트(공백이 한 칸으로 합쳐진 텍스트)가 원본 파일에서 시작하는 바이트 위치
+    (앞부분 단어들을 공백 무관 패턴으로 만들어 mmap에서 검색, 못 찾으면 None)
+
+    Args:
+        path: 노트 파일 경로
+        text: 청크 텍스트
+        start: 검색 시작 위치 (frontmatter 건너뛰기)
+        near: 예상 위치 (같은 문장이 여러 번 나오면 이 위치에 가장 가까운 곳 선택, None이면 첫 위치)
+        max_words: 패턴에 사용할 앞부분 단어 수
+    """
+    words = text.split()[:max_words]
+    if not words or os.path.getsize(path) == 0:
+        return None
+    pattern = re.compile(rb"\s+".join(re.escape(word.encode("utf-8")) for word in words))
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        best = None
+        for match in pattern.finditer(mm, start):
+            if near is None:
+                return match.start()
+            if best is not None and abs(match.start() - near) >= abs(best - near):
+                break
+            best = match.start()
+        return best
+
+
+def line_bounds(path: str, start: int, end: int) -> Tuple[int, int]:
+    """바이트 범위를 줄 경계까지 넓힘 (mmap에서 앞뒤 줄바꿈 검색)"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        line_start = mm.rfind(b"\n", 0, start) + 1
+        line_end = mm.find(b"\n", end)
+        return line_start, len(mm) if line_end < 0 else line_end + 1
+
+
+class NoteIndexStore:
+    """노트 오프셋 인덱스 저장소 (메모리 LRU + 노트별 JSON 파일, 파일이 바뀌면 다시 생성)"""
+
+    def __init__(self, directory: Optional[str], max_entries: int = 256):
+        """
+        Args:
+            directory: 인덱스 JSON을 저장할 디렉터리 (None이면 메모리에만 보관)
+            max_entries: 메모리에 보관할 최대 인덱스 수
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, NoteOffsetIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _index_path(self, path: str) -> str:
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, f"{digest}.json")
+
+    @staticmethod
+    def _is_fresh(index: NoteOffsetIndex, stat: os.stat_result) -> bool:
+        return (index.format == NOTE_INDEX_FORMAT and index.mtime_ns == stat.st_mtime_ns
+                and index.size == stat.st_size)
+
+    def _load(self, path: str) -> Optional[NoteOffsetIndex]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._index_path(path), "r", encoding="utf-8") as f:
+                return NoteOffsetIndex(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ 노트 인덱스 로드 실패, 다시 생성합니다 ({path}): {e}")
+            return None
+
+    def _save(self, path: str, index: NoteOffsetIndex):
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            index_path = self._index_path(path)
+            tmp_path = index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index.model_dump(), f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.warning(f"⚠️ 노트 인덱스 저장 실패 ({path}): {e}")
+
+    def get(self, path: str) -> NoteOffsetIndex:
+        """노트의 최신 오프셋 인덱스 (메모리 → 저장된 JSON → 새로 스캔 순)"""
+        stat = os.stat(path)
+        with self._lock:
+            index = self._entries.get(path)
+            if index is not None and self._is_fresh(index, stat):
+                self._entries.move_to_end(path)
+                return index
+
+        index = self._load(path)
+        if index is None or not self._is_fresh(index, stat):
+            index = build_note_index(path)
+            self._save(path, index)
+            logger.debug(f"📑 노트 인덱스 생성: {path} (헤딩 {len(index.sections)}개, {index.size:,}B)")
+
+        with self._lock:
+            self._entries[path] = index
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
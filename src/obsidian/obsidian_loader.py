@@ -99,14 +99,15 @@ def create_document_chunks(
 
 
 def process_obsidian_vault(
-    vault_path: str, chunk_size: int = 1000, chunk_overlap: int = 200
+    vault_path: str, chunk_size: int = 1000, chunk_overlap: int = 200, subfolder: str = None
 ) -> List[Dict[str, Any]]:
-    """옵시디언 볼트 전체 처리"""
+    """옵시디언 볼트 전체 처리 (subfolder 지정 시 해당 폴더만, ID는 볼트 기준 상대경로 유지)"""
     path_of_vault = Path(vault_path)
+    root = path_of_vault / subfolder if subfolder else path_of_vault
     text_splitter = create_text_splitter(chunk_size, chunk_overlap)
     all_chunks = []
 
-    for md_file in path_of_vault.rglob("*.md"):
+    for md_file in root.rglob("*.md"):
         print(f"📖 처리 중: {md_file.name}")
 
         try:
@@ -124,10 +125,21 @@ def get_raw_documents(vault_path: str) -> List[Dict[str, Any]]:
     옵시디언 볼트로부터 raw documents를 가져옴
     LangGraph를 이용하여 노드별로 역할을 구분하기 위해 process_obsidian_vault 함수의 기능을 쪼갬
     """
-    path_of_vault = Path(vault_path)
+    return read_raw_documents(list_markdown_files(vault_path), vault_path)
+
+
+def list_markdown_files(vault_path: str, subfolder: str = None) -> List[str]:
+    """볼트의 마크다운 파일 경로 목록 (배치 분할이 실행마다 같도록 정렬)"""
+    root = Path(vault_path) / subfolder if subfolder else Path(vault_path)
+    return sorted(str(md_file) for md_file in root.rglob("*.md"))
+
+
+def read_raw_documents(file_paths: List[str], vault_path: str) -> List[Dict[str, Any]]:
+    """지정한 마크다운 파일들만 파싱 (배치 인덱싱용)"""
     raw_documents = []
 
-    for md_file in path_of_vault.rglob("*.md"):
+    for file_path in file_paths:
+        md_file = Path(file_path)
         print(f"📖 처리 중: {md_file.name}")
 
         try:
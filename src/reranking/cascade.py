@@ -0,0 +1,210 @@
+"""
+적응형 캐스케이드 리랭킹
+bi-encoder 후보들의 점수 간격을 보고 리랭킹을 건너뛰거나(skip), 리랭킹할 후보 수를 줄이거나(shrink) 늘리고(grow),
+쿼리당 지연시간 예산을 다 쓰면 남은 후보는 bi-encoder 순서 그대로 둔다.
+"""
+import threading
+import time
+from typing import List, Tuple, Dict, Any, Optional
+
+from langchain_core.documents import Document
+
+from src.reranking.cross_encoder_reranker import CrossEncoderReranker
+from src.utils.metrics import metrics
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.cascade_reranker")
+
+CASCADE_PATHS = ("skip", "shrink", "full", "grow")
+
+_shared_cascades: Dict[Tuple[str, Optional[float]], "CascadeReranker"] = {}
+_shared_lock = threading.Lock()
+
+
+class CascadePolicy:
+    """bi-encoder 점수 분포로 리랭킹 경로와 후보 수를 결정하는 정책"""
+
+    def __init__(self,
+                 skip_margin: float = 0.15,
+                 close_margin: float = 0.05,
+                 min_candidates: int = 5,
+                 max_candidates: int = 40,
+                 latency_budget_ms: Optional[float] = 300.0):
+        """
+        Args:
+            skip_margin: 1위와 2위의 거리 차이가 이 값 이상이면 리랭킹 생략
+            close_margin: 1위와의 거리 차이가 이 값 이내인 후보를 '경합 후보'로 간주
+            min_candidates: 리랭킹할 최소 후보 수
+            max_candidates: 리랭킹할 최대 후보 수 (bi-encoder로 미리 가져오는 수)
+            latency_budget_ms: 쿼리당 리랭킹 지연시간 예산 (None이면 제한 없음)
+        """
+        self.skip_margin = skip_margin
+        self.close_margin = close_margin
+        self.min_candidates = min_candidates
+        self.max_candidates = max_candidates
+        self.latency_budget_ms = latency_budget_ms
+
+    def decide(self, distances: List[float], k: int, candidate_k: int) -> Tuple[str, int]:
+        """
+        리랭킹 경로 결정
+
+        Args:
+            distances: bi-encoder 후보 거리 (오름차순)
+            k: 최종 결과 수
+            candidate_k: 기본 리랭킹 후보 수
+
+        Returns:
+            (경로, 리랭킹할 후보 수)
+        """
+        if len(distances) <= 1:
+            return "skip", 0
+
+        if distances[1] - distances[0] >= self.skip_margin:
+            return "skip", 0
+
+        # 1위와 경합하는 후보가 많을수록 더 넓게 리랭킹
+        close = sum(1 for d in distances if d - distances[0] <= self.close_margin)
+        rerank_n = max(k, self.min_candidates, close * 2)
+        rerank_n = min(rerank_n, self.max_candidates, len(distances))
+
+        if rerank_n < candidate_k:
+            return "shrink", rerank_n
+        if rerank_n > candidate_k:
+            return "grow", rerank_n
+        return "full", rerank_n
+
+
+class CascadeReranker:
+    """정책에 따라 cross-encoder 리랭킹을 적응적으로 수행하는 래퍼"""
+
+    def __init__(self, reranker: CrossEncoderReranker, policy: Optional[CascadePolicy] = None):
+        self.reranker = reranker
+        self.policy = policy or CascadePolicy()
+        # 캐시에 없는 쌍 하나당 평균 모델 계산 시간 (ms, 지수이동평균) - 예산 확인과 전체 리랭킹 비용 추정용
+        self._pair_cost_ms: Optional[float] = None
+
+    def _score_within_budget(self, query: str, documents: List[Document],
+                             started: float) -> List[Optional[float]]:
+        """
+        예산 안에서 점수 계산 (캐시 적중분은 비용 없이 사용, 예산 초과 시 남은 문서는 None)
+
+        캐시에 없는 문서만 배치 단위로 모델에 보내고, 배치마다 쌍당 비용 추정치로 예상 시간을 계산해서
+        남은 예산에 들어가는 만큼만 실행한다 (추정치가 아직 없는 첫 배치는 그대로 실행).
+        """
+        budget = self.policy.latency_budget_ms
+        batch_size = self.reranker.batch_size
+        scores = self.reranker.cached_scores(query, documents)
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            affordable = self._affordable_pairs(budget, started, len(batch))
+            if affordable < len(batch):
+                metrics.incr("rerank.cascade.budget_exhausted")
+                logger.debug(f"⏱️ 리랭킹 예산 소진: 모델 계산 {start + affordable}/{len(missing)}개")
+                batch = batch[:affordable]
+
+            if batch:
+                batch_started = time.perf_counter()
+                batch_scores = self.reranker.score(query, [documents[i] for i in batch])
+                self._update_pair_cost((time.perf_counter() - batch_started) * 1000 / len(batch))
+                for i, score in zip(batch, batch_scores):
+                    scores[i] = score
+            if affordable < batch_size:
+                break
+
+        return scores
+
+    def _affordable_pairs(self, budget: Optional[float], started: float, requested: int) -> int:
+        """남은 예산 안에 모델로 계산할 수 있는 쌍 수 (쌍당 비용 추정치가 없으면 예산이 남아 있는 한 전부)"""
+        if budget is None:
+            return requested
+        remaining_ms = budget - (time.perf_counter() - started) * 1000
+        if remaining_ms <= 0:
+            return 0
+        if not self._pair_cost_ms:
+            return requested
+        return min(requested, int(remaining_ms // self._pair_cost_ms))
+
+    def _update_pair_cost(self, cost_ms: float):
+        if self._pair_cost_ms is None:
+            self._pair_cost_ms = cost_ms
+        else:
+            self._pair_cost_ms = 0.8 * self._pair_cost_ms + 0.2 * cost_ms
+
+    def rerank(self, query: str, candidates: List[Tuple[Document, float]], k: int = 5,
+               candidate_k: int = 20,
+               distances: Optional[List[float]] = None) -> Tuple[List[Tuple[Document, float]], str]:
+        """
+        캐스케이드 리랭킹
+
+        Args:
+            query: 검색 쿼리
+            candidates: bi-encoder (문서, 거리) 후보 (거리 오름차순, 최대 policy.max_candidates개)
+            k: 최종 결과 수
+            candidate_k: 캐스케이드가 없을 때 리랭킹했을 후보 수 (절감량 추정 기준)
+            distances: 경로 판단에 쓸 bi-encoder 거리 (오름차순, 기본은 candidates의 거리)
+                       후보 순서가 융합 순위처럼 거리와 다를 때 dense 검색 거리를 따로 넘긴다.
+
+        Returns:
+            ((문서, 점수) 리스트, 선택된 경로)
+            점수는 리랭킹된 문서는 cross-encoder 점수, 그 외는 1 - 거리
+        """
+        started = time.perf_counter()
+        if distances is None:
+            distances = [distance for _, distance in candidates]
+        path, rerank_n = self.policy.decide(distances, k, candidate_k)
+
+        if path == "skip":
+            results = [(doc, 1 - distance) for doc, distance in candidates[:k]]
+        else:
+            to_rerank = candidates[:rerank_n]
+            scores = self._score_within_budget(query, [doc for doc, _ in to_rerank], started)
+
+            reranked = sorted(((doc, score) for (doc, _), score in zip(to_rerank, scores) if score is not None),
+                              key=lambda x: x[1], reverse=True)
+            # 예산 초과로 점수를 못 받은 후보는 bi-encoder 순서대로 뒤에 붙임
+            remaining = [(doc, 1 - distance) for (doc, distance), score in zip(to_rerank, scores) if score is None]
+            remaining += [(doc, 1 - distance) for doc, distance in candidates[rerank_n:]]
+            results = (reranked + remaining)[:k]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.incr(f"rerank.cascade.path.{path}")
+        metrics.observe("rerank.cascade.latency_ms", elapsed_ms)
+        if self._pair_cost_ms is not None:
+            full_estimate = self._pair_cost_ms * min(candidate_k, len(candidates))
+            metrics.observe("rerank.cascade.full_estimate_ms", full_estimate)
+
+        logger.info(f"🎚️ 캐스케이드 리랭킹: 경로={path}, 리랭킹 후보={rerank_n}, {elapsed_ms:.1f}ms")
+        return results, path
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """경로별 비율과 p95 지연시간 절감량"""
+        counts = {path: metrics.counter(f"rerank.cascade.path.{path}") for path in CASCADE_PATHS}
+        total = sum(counts.values())
+        latency = metrics.histogram("rerank.cascade.latency_ms").summary()
+        full_estimate = metrics.histogram("rerank.cascade.full_estimate_ms").summary()
+
+        return {
+            "queries": total,
+            "paths": {path: {"count": count, "ratio": round(count / total, 4) if total else 0.0}
+                      for path, count in counts.items()},
+            "budget_exhausted": metrics.counter("rerank.cascade.budget_exhausted"),
+            "latency_ms": latency,
+            "full_rerank_estimate_ms": full_estimate,
+            "p95_saved_ms": round(max(0.0, full_estimate["p95"] - latency["p95"]), 3),
+        }
+
+
+def get_shared_cascade(reranker: CrossEncoderReranker,
+                       latency_budget_ms: Optional[float] = 300.0) -> CascadeReranker:
+    """리랭커 모델과 예산별로 하나씩 두는 공유 캐스케이드 (쌍당 비용 추정치를 쿼리 사이에 이어서 사용)"""
+    key = (reranker.model_name, latency_budget_ms)
+    with _shared_lock:
+        cascade = _shared_cascades.get(key)
+        if cascade is None:
+            cascade = _shared_cascades[key] = CascadeReranker(
+                reranker, CascadePolicy(latency_budget_ms=latency_budget_ms)
+            )
+        return cascade
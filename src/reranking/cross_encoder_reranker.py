@@ -1,22 +1,163 @@
-from typing import List, Tuple
+import threading
+from collections import OrderedDict
+from typing import List, Tuple, Dict, Any, Hashable, Optional
 from sentence_transformers import CrossEncoder
 from langchain_core.documents import Document
+from src.logging.logger_factory import LoggerFactory
+from src.utils.micro_batcher import MicroBatcher
+from src.utils.metrics import metrics
+
+logger = LoggerFactory.get_logger("obsidian_rag.cross_encoder_reranker")
+
+# 프로세스 내 공유 리랭커 (모델명별 1개)
+_shared_rerankers: Dict[str, "CrossEncoderReranker"] = {}
+_shared_lock = threading.Lock()
 
 
 class CrossEncoderReranker:
     """Cross-encoder 기반 리랭킹 클래스"""
 
-    def __init__(self, model_name: str = "jhgan/ko-sroberta-multitask"):
+    def __init__(self,
+                 model_name: str = "jhgan/ko-sroberta-multitask",
+                 max_length: int = 512,
+                 batch_size: int = 32,
+                 cache_size: int = 4096,
+                 max_batch_pairs: int = 128,
+                 batch_wait_ms: float = 0.0,
+                 request_timeout: float = 30.0):
         """
         Cross-encoder 리랭커 초기화
 
         Args:
             model_name: 사용할 cross-encoder 모델명
+            max_length: (쿼리, 문서) 쌍의 최대 토큰 수 (초과분은 토크나이저가 잘라냄)
+            batch_size: predict 배치 크기
+            cache_size: (쿼리, 청크) 점수 LRU 캐시 크기 (0이면 캐시 사용 안 함)
+            max_batch_pairs: 동시 리랭킹 요청을 묶어 한 번에 predict할 최대 (쿼리, 문서) 쌍 수
+            batch_wait_ms: 동시 요청을 묶기 위해 첫 요청 후 기다리는 시간 (0이면 대기 없이 greedy)
+            request_timeout: 묶음 predict 결과를 기다리는 최대 시간 (초)
         """
         self.model_name = model_name
-        print(f"🎯 Cross-encoder 리랭커 로딩: {model_name}")
-        self.cross_encoder = CrossEncoder(model_name)
-        print("✅ Cross-encoder 로딩 완료!")
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.request_timeout = request_timeout
+
+        logger.info(f"🎯 Cross-encoder 리랭커 로딩: {model_name}")
+        self.cross_encoder = CrossEncoder(model_name, max_length=max_length)
+        logger.info("✅ Cross-encoder 로딩 완료!")
+
+        self._cache: "OrderedDict[Tuple[str, Hashable], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # 동시에 들어온 리랭킹 요청들의 (쿼리, 문서) 쌍을 모아서 predict 한 번으로 계산
+        self._batcher = MicroBatcher(self._predict_batch, name="rerank", max_batch_size=max_batch_pairs,
+                                     max_wait_ms=batch_wait_ms, item_size=len)
+
+    @staticmethod
+    def _doc_key(doc: Document) -> Hashable:
+        """캐시용 청크 식별자 (같은 ID라도 내용이 바뀌면 다른 키)"""
+        meta = doc.metadata
+        chunk_id = meta.get("chunk_id") or doc.id or f"{meta.get('id', '')}#chunk_{meta.get('chunk_index', 0)}"
+        return chunk_id, hash(doc.page_content)
+
+    def _truncate(self, query: str, contents: List[str]) -> List[str]:
+        """
+        문서를 (쿼리, 문서) 쌍이 max_length 토큰에 들어가는 길이로 자름 (모델 토크나이저 기준)
+        잘린 뒤의 텍스트는 어차피 모델 입력에서 빠지므로, predict 배치의 토큰화/패딩 비용만 줄어든다.
+        """
+        tokenizer = getattr(self.cross_encoder, "tokenizer", None)
+        if tokenizer is None:
+            return contents
+
+        query_tokens = len(tokenizer(query, add_special_tokens=False)["input_ids"])
+        budget = max(1, self.max_length - query_tokens - tokenizer.num_special_tokens_to_add(pair=True))
+        try:
+            # fast 토크나이저: 원문 문자 위치로 잘라서 텍스트를 그대로 보존
+            offsets = tokenizer(contents, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+            return [content if len(spans) <= budget else content[:spans[budget - 1][1]]
+                    for content, spans in zip(contents, offsets)]
+        except NotImplementedError:
+            token_ids = tokenizer(contents, add_special_tokens=False)["input_ids"]
+            return [content if len(ids) <= budget else tokenizer.decode(ids[:budget])
+                    for content, ids in zip(contents, token_ids)]
+
+    def _cache_get(self, key) -> Any:
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _cache_put(self, key, score: float):
+        with self._cache_lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def cached_scores(self, query: str, documents: List[Document]) -> List[Optional[float]]:
+        """
+        캐시에 있는 (쿼리, 문서) 점수만 조회 (모델 호출 없음, 적중 수만 기록)
+
+        Returns:
+            문서 순서대로의 점수 (캐시에 없으면 None)
+        """
+        if self.cache_size <= 0:
+            return [None] * len(documents)
+
+        scores = [self._cache_get((query, self._doc_key(doc))) for doc in documents]
+        hits = sum(1 for value in scores if value is not None)
+        with self._cache_lock:
+            self.cache_hits += hits
+        metrics.incr("cache.rerank.hits", hits)
+        return scores
+
+    def score(self, query: str, documents: List[Document]) -> List[float]:
+        """
+        (쿼리, 문서) 쌍 점수 계산 (캐시에 없는 쌍만 모델로 계산)
+
+        Args:
+            query: 검색 쿼리
+            documents: 점수를 매길 문서들
+
+        Returns:
+            문서 순서대로의 cross-encoder 점수
+        """
+        scores: List[Any] = self.cached_scores(query, documents)
+        missing = [(i, (query, self._doc_key(doc))) for i, doc in enumerate(documents) if scores[i] is None]
+
+        with self._cache_lock:
+            self.cache_misses += len(missing)
+        metrics.incr("cache.rerank.misses", len(missing))
+
+        if missing:
+            contents = self._truncate(query, [documents[i].page_content for i, _ in missing])
+            pairs = [[query, content] for content in contents]
+            with metrics.timed("stage.rerank"):
+                predicted = self._batcher.run(pairs, timeout=self.request_timeout)
+            for (i, key), value in zip(missing, predicted):
+                scores[i] = float(value)
+                if self.cache_size > 0:
+                    self._cache_put(key, scores[i])
+
+        logger.debug(f"리랭킹 점수 계산: {len(documents)}개 중 캐시 {len(documents) - len(missing)}개, "
+                     f"모델 {len(missing)}개")
+        return scores
+
+    def _predict_batch(self, requests: List[List[List[str]]]) -> List[List[float]]:
+        """여러 요청의 (쿼리, 문서) 쌍을 이어 붙여 한 번에 predict 후 요청별로 나눔"""
+        pairs = [pair for request in requests for pair in request]
+        predicted = self.cross_encoder.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+
+        results = []
+        offset = 0
+        for request in requests:
+            results.append([float(value) for value in predicted[offset:offset + len(request)]])
+            offset += len(request)
+        return results
 
     def rerank(self, query: str, documents: List[Document], top_k: int = 5) -> List[Tuple[Document, float]]:
         """
@@ -33,17 +174,10 @@ class CrossEncoderReranker:
         if not documents:
             return []
 
-        print(f"🔄 {len(documents)}개 문서를 Cross-encoder로 리랭킹 중...")
-
-        # 쿼리-문서 쌍 생성
-        query_doc_pairs = []
-        for doc in documents:
-            # 문서 내용이 너무 길면 잘라내기 (cross-encoder 입력 길이 제한)
-            content = doc.page_content[:512] if len(doc.page_content) > 512 else doc.page_content
-            query_doc_pairs.append([query, content])
+        logger.info(f"🔄 {len(documents)}개 문서를 Cross-encoder로 리랭킹 중...")
 
-        # Cross-encoder로 점수 계산
-        scores = self.cross_encoder.predict(query_doc_pairs)
+        # Cross-encoder로 점수 계산 (캐시 적중분은 재계산하지 않음)
+        scores = self.score(query, documents)
 
         # 문서와 점수를 함께 묶어서 점수 내림차순 정렬
         doc_scores = list(zip(documents, scores))
@@ -52,9 +186,24 @@ class CrossEncoderReranker:
         # 상위 k개만 반환
         top_results = doc_scores[:top_k]
 
-        print(f"✅ 리랭킹 완료! 상위 {len(top_results)}개 문서 반환")
+        logger.info(f"✅ 리랭킹 완료! 상위 {len(top_results)}개 문서 반환")
         return top_results
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """점수 캐시 적중률 통계"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "size": len(self._cache),
+            "capacity": self.cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": round(self.cache_hits / total, 4) if total else 0.0,
+        }
+
+    def batch_stats(self) -> Dict[str, Any]:
+        """동시 리랭킹 요청 묶음 통계"""
+        return self._batcher.stats()
+
     def rerank_with_details(self, query: str, documents: List[Document], top_k: int = 5) -> List[Tuple[Document, float]]:
         """
         상세 정보와 함께 리랭킹 (디버깅용)
@@ -67,4 +216,13 @@ class CrossEncoderReranker:
             print(f"{i+1}. {title} (점수: {score:.4f})")
             print(f"   내용: {doc.page_content[:100]}...")
 
-        return results
\ No newline at end of file
+        return results
+
+
+def get_shared_reranker(model_name: str = "jhgan/ko-sroberta-multitask") -> CrossEncoderReranker:
+    """모델명별로 한 번만 로딩하는 공유 리랭커 (그래프 노드, 서버 등에서 재사용)"""
+    with _shared_lock:
+        reranker = _shared_rerankers.get(model_name)
+        if reranker is None:
+            reranker = _shared_rerankers[model_name] = CrossEncoderReranker(model_name)
+        return reranker
@@ -0,0 +1 @@
+"""Lexical and metadata retrievers used alongside dense search."""
@@ -0,0 +1,195 @@
+"""
+BM25 어휘 인덱스와 제목/메타데이터 조회
+벡터DB에 저장된 청크 텍스트로 메모리 내 역색인을 만들어, 임베딩이 놓치기 쉬운 고유명사/약어/코드 같은
+정확한 단어 일치를 찾는다. 한국어는 조사가 붙어 단어가 달라지므로 한글 단어는 글자 bigram도 함께 색인한다.
+인덱스는 벡터DB의 index_version이 바뀌면 백그라운드에서 다시 만들고, 새 인덱스가 준비될 때까지는 이전 인덱스로 검색한다.
+"""
+import math
+import re
+import threading
+import weakref
+from collections import defaultdict, Counter
+from typing import List, Dict, Any, Tuple, Optional
+
+from langchain_core.documents import Document
+
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.lexical_index")
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자 단어 + 한글 단어의 글자 bigram"""
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _collections(vector_db) -> List[Tuple[Optional[str], Any]]:
+    """(샤드 이름, Chroma 컬렉션) 목록 (샤딩 벡터DB면 로딩된 샤드만, 콜드 샤드는 열지 않음)"""
+    if hasattr(vector_db, "shards") and hasattr(vector_db, "configs"):
+        return [(name, shard_db.vectorstore._collection) for name, shard_db in list(vector_db.shards.items())]
+    return [(None, vector_db.vectorstore._collection)]
+
+
+class LexicalIndex:
+    """청크 단위 BM25 인덱스 + 노트 제목/태그 인덱스"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.texts: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.avg_length = 0.0
+        # 제목/태그 토큰 → 노트별 첫 청크 번호
+        self.title_postings: Dict[str, set] = defaultdict(set)
+        self.title_tokens: Dict[int, int] = {}
+        self.version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, text: str, metadata: Dict[str, Any]):
+        """청크 하나 색인"""
+        position = len(self.texts)
+        self.texts.append(text)
+        self.metadatas.append(metadata)
+
+        counts = Counter(tokenize(text))
+        self.doc_lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            self.postings[term].append((position, tf))
+
+        # 노트의 첫 청크만 제목/태그 인덱스에 등록
+        if metadata.get("chunk_index", 0) == 0:
+            title_terms = set(tokenize(f"{metadata.get('title', '')} {metadata.get('tags', '')}"))
+            for term in title_terms:
+                self.title_postings[term].add(position)
+            self.title_tokens[position] = len(title_terms)
+
+    def finalize(self):
+        """평균 문서 길이 계산 (색인 후 한 번 호출)"""
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    @classmethod
+    def build(cls, vector_db, batch_size: int = 2000) -> "LexicalIndex":
+        """벡터DB에 저장된 청크로 인덱스 생성 (임베딩 없이 텍스트/메타데이터만 읽음)"""
+        index = cls()
+        # 버전을 먼저 읽어서, 만드는 도중 바뀐 내용은 다음 재생성에서 반영되게 함
+        index.version = vector_db.index_version
+        for shard, collection in _collections(vector_db):
+            total = collection.count()
+            for offset in range(0, total, batch_size):
+                batch = collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+                for text, metadata in zip(batch["documents"], batch["metadatas"]):
+                    metadata = dict(metadata or {})
+                    if shard is not None:
+                        metadata["shard"] = shard
+                    index.add(text or "", metadata)
+        index.finalize()
+        logger.info(f"📚 어휘 인덱스 생성: {len(index)}개 청크, {len(index.postings)}개 토큰 (버전 {index.version})")
+        return index
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """BM25 검색 (점수 내림차순)"""
+        if not self.texts:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        n_docs = len(self.texts)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[position] / (self.avg_length or 1))
+                scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self._document(position), score) for position, score in top]
+
+    def search_titles(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """제목/태그 토큰 일치 비율로 노트 조회 (노트의 첫 청크 반환, 점수 내림차순)"""
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+
+        matches: Dict[int, int] = defaultdict(int)
+        for term in query_terms:
+            for position in self.title_postings.get(term, ()):
+                matches[position] += 1
+
+        # 쿼리 토큰과 제목 토큰이 겹치는 비율 (Dice 계수)
+        scored = [(position, 2 * hits / (len(query_terms) + self.title_tokens.get(position, 0)))
+                  for position, hits in matches.items()]
+        top = sorted(scored, key=lambda item: item[1], reverse=True)[:k]
+        return [(self._document(position), score) for position, score in top]
+
+    def _document(self, position: int) -> Document:
+        return Document(page_content=self.texts[position], metadata=self.metadatas[position])
+
+
+# 벡터DB별 어휘 인덱스와 진행 중인 백그라운드 재생성 스레드
+_indexes: "weakref.WeakKeyDictionary[Any, LexicalIndex]" = weakref.WeakKeyDictionary()
+_rebuilds: "weakref.WeakKeyDictionary[Any, threading.Thread]" = weakref.WeakKeyDictionary()
+_build_lock = threading.Lock()
+
+
+def _rebuild(vector_db):
+    """버전이 따라잡을 때까지 인덱스 재생성 (인덱싱 배치마다 바뀌는 버전을 한 스레드가 모아서 처리)"""
+    try:
+        while True:
+            current = _indexes.get(vector_db)
+            if current is not None and current.version == vector_db.index_version:
+                return
+            index = LexicalIndex.build(vector_db)
+            with _build_lock:
+                _indexes[vector_db] = index
+    except Exception as e:
+        logger.warning(f"⚠️ 어휘 인덱스 재생성 실패 (이전 인덱스 유지): {e}")
+    finally:
+        with _build_lock:
+            _rebuilds.pop(vector_db, None)
+
+
+def _schedule_rebuild(vector_db) -> threading.Thread:
+    """재생성 스레드 시작 (이미 실행 중이면 그 스레드 반환)"""
+    with _build_lock:
+        thread = _rebuilds.get(vector_db)
+        if thread is None:
+            thread = _rebuilds[vector_db] = threading.Thread(
+                target=_rebuild, args=(vector_db,), name="lexical-index-rebuild", daemon=True
+            )
+            thread.start()
+        return thread
+
+
+def get_lexical_index(vector_db, wait: bool = False) -> Optional[LexicalIndex]:
+    """
+    벡터DB의 어휘 인덱스
+
+    버전이 바뀌었으면 백그라운드 재생성을 시작하고 그동안은 이전 인덱스를 반환한다 (검색 지연 없음).
+    아직 인덱스가 없으면 wait=True일 때만 생성을 기다리고, 아니면 None을 반환한다.
+
+    Args:
+        vector_db: VectorDB 또는 ShardedVectorDB
+        wait: 인덱스가 하나도 없을 때 생성될 때까지 기다릴지 (워밍업용)
+    """
+    index = _indexes.get(vector_db)
+    if index is not None and index.version == vector_db.index_version:
+        return index
+
+    thread = _schedule_rebuild(vector_db)
+    if index is None and wait:
+        thread.join()
+        index = _indexes.get(vector_db)
+    return index
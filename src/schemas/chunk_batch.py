@@ -0,0 +1,79 @@
+"""Columnar chunk batch used inside the indexing pipeline."""
+from array import array
+from typing import Dict, Any, List, Iterator, Tuple
+
+from src.schemas.document import Chunk
+
+
+class ChunkBatch:
+    """
+    인덱싱 경로 전용 컬럼형 청크 묶음
+    청크마다 pydantic 모델과 메타데이터 사본을 만드는 대신 텍스트/번호를 평행 배열로 보관하고,
+    문서 메타데이터는 문서당 한 번만 저장해 청크는 문서 번호로 참조한다.
+    청크별 메타데이터 딕셔너리와 Chunk 모델은 벡터DB 저장이나 외부 API로 넘길 때만 만든다.
+    """
+
+    __slots__ = ("document_ids", "document_metadata", "chunk_counts", "texts", "doc_index", "chunk_index")
+
+    def __init__(self):
+        # 문서 단위 컬럼
+        self.document_ids: List[str] = []
+        self.document_metadata: List[Dict[str, Any]] = []
+        self.chunk_counts = array("I")
+        # 청크 단위 컬럼
+        self.texts: List[str] = []
+        self.doc_index = array("I")
+        self.chunk_index = array("I")
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add_document(self, document_id: str, metadata: Dict[str, Any], chunk_texts: List[str]):
+        """문서 하나와 그 청크들을 추가 (메타데이터는 복사하지 않고 참조만 보관)"""
+        position = len(self.document_ids)
+        self.document_ids.append(document_id)
+        self.document_metadata.append(metadata)
+        self.chunk_counts.append(len(chunk_texts))
+
+        self.texts.extend(chunk_texts)
+        self.doc_index.extend([position] * len(chunk_texts))
+        self.chunk_index.extend(range(len(chunk_texts)))
+
+    def chunk_id(self, i: int) -> str:
+        """i번째 청크 ID (문서 ID#chunk_N)"""
+        return f"{self.document_ids[self.doc_index[i]]}#chunk_{self.chunk_index[i]}"
+
+    @property
+    def ids(self) -> List[str]:
+        """전체 청크 ID"""
+        return [self.chunk_id(i) for i in range(len(self))]
+
+    def metadata(self, i: int) -> Dict[str, Any]:
+        """i번째 청크의 메타데이터 (문서 메타데이터 + 청크 정보, 호출 시 생성)"""
+        position = self.doc_index[i]
+        return {**self.document_metadata[position],
+                "chunk_id": self.chunk_id(i),
+                "chunk_index": self.chunk_index[i],
+                "total_chunks": self.chunk_counts[position]}
+
+    def metadatas(self) -> List[Dict[str, Any]]:
+        """전체 청크 메타데이터 (벡터DB 저장 직전에만 사용)"""
+        return [self.metadata(i) for i in range(len(self))]
+
+    def records(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """(청크 ID, 텍스트, 메타데이터) 순회"""
+        for i in range(len(self)):
+            yield self.chunk_id(i), self.texts[i], self.metadata(i)
+
+    def to_chunks(self) -> List[Chunk]:
+        """pydantic Chunk 리스트로 변환 (API 경계에서만 사용)"""
+        return [
+            Chunk(
+                id=chunk_id,
+                content=text,
+                document_id=self.document_ids[self.doc_index[i]],
+                chunk_index=self.chunk_index[i],
+                metadata=metadata,
+            )
+            for i, (chunk_id, text, metadata) in enumerate(self.records())
+        ]
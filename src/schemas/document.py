@@ -1,6 +1,7 @@
 """Document and chunk schemas."""
+import operator
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Annotated
 
 from pydantic import BaseModel, Field
 
@@ -31,16 +32,50 @@ class Chunk(BaseModel):
         description="청크 메타데이터"
     )
 
+class IndexingBatch(BaseModel):
+    """인덱싱 그래프에서 병렬로 처리되는 노트 배치 (Send 페이로드)"""
+    batch_index: int = Field(description="배치 순번 (0부터)")
+    file_paths: List[str] = Field(
+        default_factory=list,
+        description="배치에 포함된 마크다운 파일 경로"
+    )
+    file_mtimes: List[float] = Field(
+        default_factory=list,
+        description="파일별 수정 시간 (체크포인트 기록용)"
+    )
+
 class IndexingState(BaseModel):
-    documents: List[Document] = Field(
+    """인덱싱 그래프의 state (문서/청크 본문은 배치 안에서만 다루고, 여기는 개수와 진행 상황만 보관)"""
+    total_files: int = Field(default=0, description="인덱싱할 전체 파일 수")
+    total_batches: int = Field(default=0, description="전체 배치 수")
+    pending_batches: int = Field(default=0, description="이번 실행에서 처리할 배치 수 (체크포인트로 완료된 배치 제외)")
+    skipped_files: int = Field(default=0, description="체크포인트 기준 이미 저장되어 건너뛴 파일 수")
+    deleted_notes: int = Field(default=0, description="볼트에서 사라져 벡터DB에서 삭제한 노트 수")
+    batches: List[IndexingBatch] = Field(
         default_factory=list,
-        description="읽어온 문서들"
+        description="이번 실행에서 처리할 배치 (plan 노드가 계산, 파일 경로와 수정 시간만 보관)"
+    )
+    processed_files: Annotated[int, operator.add] = Field(
+        default=0,
+        description="읽기를 마친 파일 수"
     )
-    chunks: List[Chunk] = Field(
+    total_documents: Annotated[int, operator.add] = Field(
+        default=0,
+        description="읽어온 문서 수"
+    )
+    total_chunks: Annotated[int, operator.add] = Field(
+        default=0,
+        description="저장된 청크 수"
+    )
+    completed_batches: Annotated[List[int], operator.add] = Field(
         default_factory=list,
-        description="분할된 청크들"
+        description="완료된 배치 번호"
+    )
+    failed_batches: Annotated[List[str], operator.add] = Field(
+        default_factory=list,
+        description="실패한 배치와 에러 메시지"
     )
     error: Optional[str] = Field(
         default=None,
         description="에러 메시지"
-    )
\ No newline at end of file
+    )
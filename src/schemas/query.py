@@ -1,9 +1,14 @@
 """Query and search result schemas."""
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Annotated
 
 from pydantic import BaseModel, Field
 
 
+def merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """병렬 브랜치 결과 병합용 reducer (같은 값을 다시 넣어도 결과가 같음)"""
+    return {**left, **right}
+
+
 class Query(BaseModel):
     """쿼리 모델"""
     text: str = Field(description="검색 쿼리 텍스트")
@@ -34,6 +39,18 @@ class QueryState(BaseModel):
         default=None,
         description="쿼리 임베딩"
     )
+    deadline: Optional[float] = Field(
+        default=None,
+        description="검색 브랜치 공통 마감 시각 (time.monotonic 기준)"
+    )
+    branch_results: Annotated[Dict[str, List[SearchResult]], merge_dicts] = Field(
+        default_factory=dict,
+        description="검색 브랜치별 결과 (dense, lexical, title)"
+    )
+    branch_status: Annotated[Dict[str, str], merge_dicts] = Field(
+        default_factory=dict,
+        description="검색 브랜치와 리랭킹(rerank)의 상태 (ok, timeout, error, disabled)"
+    )
     retrieved_results: List[SearchResult] = Field(
         default_factory=list,
         description="검색된 결과들"
@@ -0,0 +1,284 @@
+"""
+우선순위 기반 요청 허용 제어 (admission control)
+같은 임베딩 백엔드를 인덱싱(대량 문서 임베딩)과 검색(쿼리 임베딩)이 함께 쓸 때, 동시에 백엔드로 보내는
+요청 수를 제한하고 대기 중인 요청은 대화형(쿼리) 먼저, 대량(인덱싱)은 나중에 들여보낸다.
+대량 요청은 최대 max_bulk_in_flight개까지만 동시에 실행되므로 쿼리용 자리가 항상 남는다
+(max_in_flight=1이면 남길 자리가 없으므로, 실행 중인 대량 요청 하나가 끝나야 쿼리가 들어간다).
+대기열이 가득 차거나 대기 시간이 길어지면 요청을 쌓아 두지 않고 AdmissionRejected로 거절한다.
+
+    admission = AdmissionController("embedding", max_in_flight=4, max_queue_depth=64)
+    with admission.slot(INTERACTIVE):
+        response = requests.post(f"{base_url}/api/embed", json={"model": model, "input": texts})
+    async with admission.aslot(BULK):
+        response = await client.post("/api/embed", json={"model": model, "input": texts})
+"""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from src.utils.metrics import metrics
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.admission")
+
+# 우선순위 (작을수록 먼저)
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+
+class AdmissionRejected(RuntimeError):
+    """대기열이 가득 찼거나 대기 시간을 넘겨서 거절된 요청"""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason  # "queue_full" 또는 "timeout"
+
+
+class _Waiter:
+    """대기 중인 요청 하나 (우선순위, 도착 순서로 정렬)"""
+
+    __slots__ = ("priority", "seq", "granted", "cancelled", "future")
+
+    def __init__(self, priority: int, seq: int, future: Optional[asyncio.Future] = None):
+        self.priority = priority
+        self.seq = seq
+        self.granted = False
+        self.cancelled = False
+        # 코루틴 대기자는 스레드 대신 이벤트 루프의 future로 허용 알림을 받음
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """우선순위 대기열 + 동시 실행 한도 (스레드/코루틴 공용)"""
+
+    def __init__(self,
+                 name: str = "embedding",
+                 max_in_flight: int = 4,
+                 max_bulk_in_flight: Optional[int] = None,
+                 max_queue_depth: int = 64,
+                 interactive_timeout: Optional[float] = 10.0,
+                 bulk_timeout: Optional[float] = None):
+        """
+        Args:
+            name: 지표 이름 (admission.<name>.admitted.interactive 등)
+            max_in_flight: 동시에 실행할 수 있는 전체 요청 수
+            max_bulk_in_flight: 동시에 실행할 수 있는 대량 요청 수 (기본: max_in_flight - 1, 최소 1,
+                max_in_flight와 같으면 쿼리용 자리를 따로 남기지 않음)
+            max_queue_depth: 대기열 최대 길이 (넘으면 새 요청을 바로 거절)
+            interactive_timeout: 대화형 요청의 최대 대기 시간 (초, None이면 무제한)
+            bulk_timeout: 대량 요청의 최대 대기 시간 (초, None이면 무제한)
+        """
+        if max_in_flight <= 0:
+            raise ValueError(f"max_in_flight는 양수여야 합니다: {max_in_flight}")
+
+        if max_bulk_in_flight is None:
+            max_bulk_in_flight = max(1, max_in_flight - 1)
+        if not 1 <= max_bulk_in_flight <= max_in_flight:
+            raise ValueError(f"max_bulk_in_flight는 1 이상 max_in_flight({max_in_flight}) 이하여야 합니다: "
+                             f"{max_bulk_in_flight}")
+        if max_bulk_in_flight == max_in_flight:
+            logger.warning(f"⚠️ {name}: 대량 요청이 모든 자리({max_in_flight}개)를 쓸 수 있어, "
+                           f"쿼리는 실행 중인 대량 요청이 끝날 때까지 기다릴 수 있습니다")
+
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_bulk_in_flight = max_bulk_in_flight
+        self.max_queue_depth = max_queue_depth
+        self.timeouts = {INTERACTIVE: interactive_timeout, BULK: bulk_timeout}
+
+        self._cond = threading.Condition()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self.in_flight = 0
+        self.bulk_in_flight = 0
+        self.queued = {INTERACTIVE: 0, BULK: 0}
+        self.admitted = {INTERACTIVE: 0, BULK: 0}
+        self.rejected = {"queue_full": 0, "timeout": 0}
+
+    def _grant(self):
+        """대기열 앞에서부터 자리가 나는 만큼 허용 (락 안에서 호출)"""
+        while self._waiters and self.in_flight < self.max_in_flight:
+            waiter = self._waiters[0]
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            # 맨 앞이 대량 요청이면 대기 중인 대화형 요청이 없다는 뜻이므로 대량 한도만 확인
+            if waiter.priority == BULK and self.bulk_in_flight >= self.max_bulk_in_flight:
+                break
+            heapq.heappop(self._waiters)
+            waiter.granted = True
+            self.queued[waiter.priority] -= 1
+            self.in_flight += 1
+            if waiter.priority == BULK:
+                self.bulk_in_flight += 1
+            if waiter.future is not None:
+                waiter.future.get_loop().call_soon_threadsafe(_resolve, waiter.future)
+            else:
+                self._cond.notify_all()
+
+    def _enqueue(self, priority: int, future: Optional[asyncio.Future] = None) -> _Waiter:
+        """대기열에 등록하고 자리가 있으면 바로 허용 (락 안에서 호출, 대기열이 가득 차면 거절)"""
+        depth = sum(self.queued.values())
+        metrics.observe(f"admission.{self.name}.queue_depth", depth)
+        if depth >= self.max_queue_depth:
+            self.rejected["queue_full"] += 1
+            metrics.incr(f"admission.{self.name}.rejected.queue_full")
+            raise AdmissionRejected(
+                f"{self.name} 대기열이 가득 찼습니다 ({depth}개 대기 중). 잠시 후 다시 시도하세요.", "queue_full"
+            )
+
+        waiter = _Waiter(priority, next(self._seq), future)
+        heapq.heappush(self._waiters, waiter)
+        self.queued[priority] += 1
+        self._grant()
+        return waiter
+
+    def _give_up(self, waiter: _Waiter) -> bool:
+        """대기 중인 요청 취소 (락 안에서 호출, 이미 허용된 뒤였으면 False)"""
+        if waiter.granted:
+            return False
+        waiter.cancelled = True
+        self.queued[waiter.priority] -= 1
+        return True
+
+    def _timed_out(self, priority: int, timeout: float) -> AdmissionRejected:
+        self.rejected["timeout"] += 1
+        metrics.incr(f"admission.{self.name}.rejected.timeout")
+        return AdmissionRejected(
+            f"{self.name} 대기 시간 초과 ({timeout:.1f}초, {PRIORITY_NAMES[priority]}). 잠시 후 다시 시도하세요.",
+            "timeout",
+        )
+
+    def _record_admitted(self, priority: int, started: float):
+        label = PRIORITY_NAMES[priority]
+        with self._cond:
+            self.admitted[priority] += 1
+        metrics.incr(f"admission.{self.name}.admitted.{label}")
+        metrics.observe(f"admission.{self.name}.wait_ms.{label}", (time.perf_counter() - started) * 1000)
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None):
+        """
+        실행 자리 하나 확보 (자리가 없으면 우선순위 순서대로 대기)
+
+        Args:
+            priority: INTERACTIVE 또는 BULK
+            timeout: 최대 대기 시간 (None이면 우선순위별 기본값)
+
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나 대기 시간을 넘긴 경우
+        """
+        timeout = self.timeouts[priority] if timeout is None else timeout
+        started = time.perf_counter()
+        with self._cond:
+            waiter = self._enqueue(priority)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not waiter.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._give_up(waiter)
+                    raise self._timed_out(priority, timeout)
+                self._cond.wait(remaining)
+        self._record_admitted(priority, started)
+
+    async def aacquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None):
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않고, 대기용 스레드도 쓰지 않음)"""
+        timeout = self.timeouts[priority] if timeout is None else timeout
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        with self._cond:
+            waiter = self._enqueue(priority, future)
+
+        if not waiter.granted:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                with self._cond:
+                    gave_up = self._give_up(waiter)
+                if gave_up:
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                    raise self._timed_out(priority, timeout) from None
+                # 포기하기 직전에 허용된 경우: 취소면 자리를 반환하고, 시간 초과면 그대로 진행
+                if isinstance(e, asyncio.CancelledError):
+                    self.release(priority)
+                    raise
+        self._record_admitted(priority, started)
+
+    def release(self, priority: int = INTERACTIVE):
+        """확보한 자리 반환"""
+        with self._cond:
+            self.in_flight -= 1
+            if priority == BULK:
+                self.bulk_in_flight -= 1
+            self._grant()
+
+    @contextlib.contextmanager
+    def slot(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> Iterator[None]:
+        """자리를 확보한 동안 블록 실행"""
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """slot의 비동기 버전"""
+        await self.aacquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        """실행/대기 중인 요청 수, 한도, 허용/거절 수"""
+        return {
+            "in_flight": self.in_flight,
+            "bulk_in_flight": self.bulk_in_flight,
+            "queued": {PRIORITY_NAMES[p]: count for p, count in self.queued.items()},
+            "max_in_flight": self.max_in_flight,
+            "max_bulk_in_flight": self.max_bulk_in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": {PRIORITY_NAMES[p]: count for p, count in self.admitted.items()},
+            "rejected": dict(self.rejected),
+            "wait_ms": {
+                label: metrics.histogram(f"admission.{self.name}.wait_ms.{label}").summary()
+                for label in PRIORITY_NAMES.values()
+            },
+        }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+# 프로세스 전체가 공유하는 임베딩 백엔드 허용 제어 (인덱싱과 검색이 같은 한도를 씀)
+_embedding_admission: Optional[AdmissionController] = None
+_embedding_admission_lock = threading.Lock()
+
+
+def get_embedding_admission() -> AdmissionController:
+    """공유 임베딩 허용 제어 (설정은 EMBED_MAX_IN_FLIGHT, EMBED_MAX_QUEUE, EMBED_QUERY_TIMEOUT 환경 변수)"""
+    global _embedding_admission
+    with _embedding_admission_lock:
+        if _embedding_admission is None:
+            _embedding_admission = AdmissionController(
+                "embedding",
+                max_in_flight=int(os.getenv("EMBED_MAX_IN_FLIGHT", "4")),
+                max_queue_depth=int(os.getenv("EMBED_MAX_QUEUE", "64")),
+                interactive_timeout=float(os.getenv("EMBED_QUERY_TIMEOUT", "10")),
+            )
+            logger.info(f"🚦 임베딩 허용 제어: 동시 {_embedding_admission.max_in_flight}개 "
+                        f"(대량 최대 {_embedding_admission.max_bulk_in_flight}개), "
+                        f"대기열 {_embedding_admission.max_queue_depth}개")
+        return _embedding_admission
@@ -0,0 +1,81 @@
+"""
+클라이언트별 동시 요청 제한
+HTTP 모드에서 한 서버 프로세스가 여러 MCP 클라이언트(세션)를 받을 때, 한 클라이언트가 도구 호출을 한꺼번에
+많이 보내도 다른 클라이언트가 밀리지 않도록 세션마다 동시에 실행되는 도구 호출 수를 제한한다.
+한도를 넘은 호출은 거절하지 않고 자리가 날 때까지 기다린다.
+
+    limiter = ClientLimiter(max_concurrent=4)
+    async with limiter.slot(session):
+        return await handle_tool(name, arguments)
+"""
+import asyncio
+import contextlib
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, Hashable
+
+from src.utils.metrics import metrics
+
+
+class ClientLimiter:
+    """세션별 세마포어 (세션 객체가 사라지면 세마포어도 함께 정리)"""
+
+    def __init__(self, max_concurrent: int = 4):
+        """
+        Args:
+            max_concurrent: 클라이언트 하나가 동시에 실행할 수 있는 도구 호출 수
+        """
+        if max_concurrent <= 0:
+            raise ValueError(f"max_concurrent는 양수여야 합니다: {max_concurrent}")
+
+        self.max_concurrent = max_concurrent
+        self._semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._shared: Dict[Hashable, asyncio.Semaphore] = {}
+        self.active = 0
+        self.waiting = 0
+        self.throttled = 0
+
+    def _semaphore(self, client: Any) -> asyncio.Semaphore:
+        try:
+            semaphores = self._semaphores
+            semaphore = semaphores.get(client)
+        except TypeError:
+            # 약한 참조를 지원하지 않는 키 (예: 세션 밖에서의 직접 호출)
+            semaphores = self._shared
+            semaphore = semaphores.get(client)
+        if semaphore is None:
+            semaphore = semaphores[client] = asyncio.Semaphore(self.max_concurrent)
+        return semaphore
+
+    @contextlib.asynccontextmanager
+    async def slot(self, client: Any) -> AsyncIterator[None]:
+        """클라이언트의 실행 자리 하나를 잡고 있는 동안 도구 실행 (한도를 넘으면 대기)"""
+        semaphore = self._semaphore(client)
+        if semaphore.locked():
+            self.throttled += 1
+            metrics.incr("clients.throttled")
+
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        metrics.observe("clients.wait_ms", (time.perf_counter() - started) * 1000)
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """연결된 클라이언트 수, 실행/대기 중인 호출 수, 한도 때문에 기다린 호출 수"""
+        return {
+            "clients": len(self._semaphores) + len(self._shared),
+            "max_concurrent_per_client": self.max_concurrent,
+            "active": self.active,
+            "waiting": self.waiting,
+            "throttled": self.throttled,
+        }
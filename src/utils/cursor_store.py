@@ -0,0 +1,121 @@
+"""
+페이지네이션 커서 저장소
+검색/목록 도구가 만든 순위 목록을 메모리에 보관하고, 목록 ID와 다음 페이지 위치를 담은 불투명한 커서 문자열을
+돌려준다. 다음 페이지는 보관한 목록에서 잘라서 주므로 다시 임베딩/검색/디렉터리 탐색을 하지 않는다.
+
+    cursor = cursors.create(results, offset=10, page_size=10, index_version=db.index_version)
+    page = cursors.resolve(cursor)    # page.items, page.offset, page.next_cursor, page.context
+"""
+import base64
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from src.utils.metrics import metrics
+
+
+class CursorExpiredError(ValueError):
+    """알 수 없거나 만료된 커서"""
+
+
+class CursorPage(NamedTuple):
+    """커서가 가리키는 한 페이지"""
+    items: List[Any]
+    offset: int
+    total: int
+    next_cursor: Optional[str]
+    context: Dict[str, Any]
+
+
+class CursorStore:
+    """순위 목록 보관소 (최대 개수 LRU + 유효 시간, 스레드 안전)"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 900.0):
+        """
+        Args:
+            max_entries: 보관할 최대 목록 수 (넘으면 가장 오래 안 쓴 목록부터 제거)
+            ttl_seconds: 마지막 사용 후 목록을 유지하는 시간
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(entry_id: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{entry_id}:{offset}".encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode(cursor: str) -> tuple:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            entry_id, offset = raw.rsplit(":", 1)
+            return entry_id, int(offset)
+        except (ValueError, UnicodeDecodeError):
+            raise CursorExpiredError(f"잘못된 커서입니다: {cursor}")
+
+    def _evict(self, now: float):
+        """만료되었거나 개수를 넘은 목록 제거 (락 안에서 호출)"""
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry["expires"] <= now]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def create(self, items: Sequence[Any], offset: int, page_size: int, **context) -> Optional[str]:
+        """
+        목록 보관 후 offset 위치의 커서 발급
+
+        Args:
+            items: 순위 목록 전체
+            offset: 다음 페이지 시작 위치 (목록 끝이면 커서를 만들지 않음)
+            page_size: 페이지 크기
+            **context: 페이지를 만들 때 필요한 정보 (쿼리, 인덱스 버전 등)
+
+        Returns:
+            커서 문자열 (남은 항목이 없으면 None)
+        """
+        if offset >= len(items):
+            return None
+
+        entry_id = secrets.token_urlsafe(12)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[entry_id] = {
+                "items": list(items),
+                "page_size": page_size,
+                "context": context,
+                "expires": now + self.ttl_seconds,
+            }
+            self._evict(now)
+        metrics.incr("cursor.created")
+        return self._encode(entry_id, offset)
+
+    def resolve(self, cursor: str) -> CursorPage:
+        """커서가 가리키는 페이지 (만료/알 수 없는 커서면 CursorExpiredError)"""
+        entry_id, offset = self._decode(cursor)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                metrics.incr("cursor.expired")
+                raise CursorExpiredError("커서가 만료되었습니다. 처음부터 다시 요청하세요.")
+            entry["expires"] = now + self.ttl_seconds
+            self._entries.move_to_end(entry_id)
+
+        items = entry["items"]
+        end = offset + entry["page_size"]
+        metrics.incr("cursor.pages")
+        return CursorPage(
+            items=items[offset:end],
+            offset=offset,
+            total=len(items),
+            next_cursor=self._encode(entry_id, end) if end < len(items) else None,
+            context=entry["context"],
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
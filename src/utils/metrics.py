@@ -0,0 +1,210 @@
+"""
+프로세스 내 성능 지표 수집기
+카운터와 지연시간 히스토그램(최근 N개 샘플 기준 p50/p95/p99)을 이름별로 보관한다.
+
+기록은 락 없이 스레드별 저장소에만 쓰고(각 저장소는 그 스레드만 수정), 조회할 때 모든 스레드의 값을 합친다.
+검색/임베딩/리랭킹 경로마다 지표를 남겨도 스레드끼리 락을 두고 경쟁하지 않는다.
+종료된 스레드의 저장소는 새 스레드가 등록되거나 조회할 때 하나의 보관 저장소로 합쳐서 저장소 수가 늘어나지 않게 한다.
+
+    metrics.incr("cache.search.hits")
+    with metrics.timed("stage.embed"):
+        vectors = model.encode(texts)
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+# 히스토그램마다 백분위 계산에 남기는 최근 샘플 수
+DEFAULT_RESERVOIR_SIZE = 2048
+
+
+class LatencyHistogram:
+    """최근 샘플 기반 지연시간 히스토그램"""
+
+    def __init__(self, reservoir_size: Optional[int] = DEFAULT_RESERVOIR_SIZE):
+        """
+        Args:
+            reservoir_size: 백분위 계산에 사용할 최근 샘플 수
+        """
+        self._samples = deque(maxlen=reservoir_size)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, value: float):
+        """샘플 기록 (ms 등 단위는 호출하는 쪽에서 통일)"""
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+
+    @classmethod
+    def merged(cls, histograms: Iterable["LatencyHistogram"],
+               reservoir_size: Optional[int] = None) -> "LatencyHistogram":
+        """
+        여러 스레드의 히스토그램을 합친 히스토그램 (샘플은 스레드별 최근 샘플의 합집합)
+
+        Args:
+            histograms: 합칠 히스토그램
+            reservoir_size: 합친 결과에 남길 최근 샘플 수 (None이면 전부)
+        """
+        result = cls(reservoir_size=reservoir_size)
+        for histogram in histograms:
+            result._samples.extend(list(histogram._samples))
+            result.count += histogram.count
+            result.total += histogram.total
+        return result
+
+    def percentile(self, p: float) -> float:
+        """최근 샘플의 p 백분위 값 (0~100)"""
+        samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, max(0, round(p / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self) -> Dict[str, Any]:
+        """개수, 평균, p50/p95/p99 요약"""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3),
+        }
+
+
+class _ThreadShard:
+    """스레드 하나가 쓰는 카운터/히스토그램 (쓰기는 소유 스레드만)"""
+
+    __slots__ = ("counters", "histograms", "owner")
+
+    def __init__(self, owner: Optional[threading.Thread] = None):
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        # 소유 스레드 (None이면 종료된 스레드 값을 합쳐 둔 보관 저장소)
+        self.owner = owner
+
+    def is_retired(self) -> bool:
+        return self.owner is not None and not self.owner.is_alive()
+
+
+def _merge_shards(shards: List[_ThreadShard]) -> _ThreadShard:
+    """저장소 여러 개를 합친 새 보관 저장소 (히스토그램은 기본 샘플 수만 유지)"""
+    merged = _ThreadShard()
+    for shard in shards:
+        for name, value in shard.counters.items():
+            merged.counters[name] = merged.counters.get(name, 0) + value
+    names = {name for shard in shards for name in shard.histograms}
+    for name in names:
+        merged.histograms[name] = LatencyHistogram.merged(
+            (shard.histograms[name] for shard in shards if name in shard.histograms),
+            reservoir_size=DEFAULT_RESERVOIR_SIZE,
+        )
+    return merged
+
+
+class MetricsRegistry:
+    """이름별 카운터/히스토그램 저장소 (스레드별 저장소 + 조회 시 합산)"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_ThreadShard] = []
+        # 종료된 스레드들의 값을 합쳐 둔 저장소 (합칠 때마다 새 객체로 교체해서 조회 중인 쪽과 겹치지 않게 함)
+        self._retired = _ThreadShard()
+        # 스레드별 저장소 등록/정리에만 사용 (스레드마다 처음 한 번, 조회 시)
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+
+    def _shard(self) -> _ThreadShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _ThreadShard(threading.current_thread())
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_dead_shards(self):
+        """종료된 스레드의 저장소를 보관 저장소에 합치고 목록에서 제거 (락 안에서 호출)"""
+        dead = [shard for shard in self._shards if shard.is_retired()]
+        if not dead:
+            return
+        self._retired = _merge_shards([self._retired, *dead])
+        dead_ids = {id(shard) for shard in dead}
+        self._shards = [shard for shard in self._shards if id(shard) not in dead_ids]
+
+    def _all_shards(self) -> List[_ThreadShard]:
+        with self._lock:
+            self._retire_dead_shards()
+            return [self._retired, *self._shards]
+
+    def incr(self, name: str, value: int = 1):
+        """카운터 증가"""
+        counters = self._shard().counters
+        counters[name] = counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """히스토그램에 샘플 기록"""
+        histograms = self._shard().histograms
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = LatencyHistogram()
+        histogram.record(value)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """블록 실행 시간을 <name>.latency_ms에, 호출 수를 <name>.calls에 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.incr(f"{name}.calls")
+            self.observe(f"{name}.latency_ms", (time.perf_counter() - started) * 1000)
+
+    def counter(self, name: str) -> int:
+        """카운터 값"""
+        return sum(shard.counters.get(name, 0) for shard in self._all_shards())
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """히스토그램 (모든 스레드 합산, 없으면 빈 히스토그램)"""
+        return LatencyHistogram.merged(
+            shard.histograms[name] for shard in self._all_shards() if name in shard.histograms
+        )
+
+    def counters(self, prefix: str = "") -> Dict[str, int]:
+        """접두사로 필터링한 카운터 목록"""
+        totals: Dict[str, int] = {}
+        for shard in self._all_shards():
+            for name, value in dict(shard.counters).items():
+                if name.startswith(prefix):
+                    totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def histogram_names(self, prefix: str = "") -> List[str]:
+        """접두사로 필터링한 히스토그램 이름 목록"""
+        names = set()
+        for shard in self._all_shards():
+            names.update(name for name in list(shard.histograms) if name.startswith(prefix))
+        return sorted(names)
+
+    @property
+    def uptime_seconds(self) -> float:
+        """레지스트리 생성(프로세스 시작) 후 경과 시간"""
+        return time.monotonic() - self.started_at
+
+    def rate(self, name: str) -> float:
+        """프로세스 시작 후 초당 카운터 증가량"""
+        uptime = self.uptime_seconds
+        return self.counter(name) / uptime if uptime > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """전체 지표 스냅샷"""
+        return {
+            "counters": self.counters(),
+            "histograms": {name: self.histogram(name).summary() for name in self.histogram_names()},
+        }
+
+
+# 프로세스 전역 레지스트리
+metrics = MetricsRegistry()
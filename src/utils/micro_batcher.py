@@ -0,0 +1,273 @@
+"""
+요청 간 동적 마이크로 배칭
+동시에 들어온 작은 모델 호출(쿼리 임베딩, 리랭킹 점수 계산)을 모아서 한 번의 배치 추론으로 실행하고
+각 호출자에게 자기 몫의 결과를 돌려준다.
+
+기본은 대기 없는 greedy 방식이다: 작업 스레드가 놀고 있으면 들어온 요청을 바로 실행하므로 단일 쿼리
+지연시간은 늘지 않고, 배치가 실행되는 동안 쌓인 요청들이 다음 배치로 묶인다. max_wait_ms를 주면
+첫 요청 후 그 시간만큼 더 모은다.
+
+    batcher = MicroBatcher(lambda texts: model.encode(texts), name="embed_query", max_batch_size=32)
+    vector = batcher.run(text, timeout=30)          # 스레드
+    vector = await batcher.asubmit(text)            # 코루틴 (이벤트 루프를 막지 않음)
+
+배치 함수 자체가 코루틴(httpx 요청 등)이면 AsyncMicroBatcher를 쓴다. 작업 스레드 없이 이벤트 루프 안에서
+같은 방식으로 묶어서 실행한다.
+
+    abatcher = AsyncMicroBatcher(embed_texts_async, name="embed_query", max_batch_size=32)
+    vector = await abatcher.submit(text)
+"""
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from src.utils.metrics import metrics
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.micro_batcher")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """요청을 모아 배치 함수 한 번으로 처리하는 스케줄러 (전용 작업 스레드 1개)"""
+
+    def __init__(self,
+                 process_batch: Callable[[List[T]], List[R]],
+                 name: str,
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 0.0,
+                 item_size: Optional[Callable[[T], int]] = None):
+        """
+        Args:
+            process_batch: 요청 리스트를 받아 같은 순서의 결과 리스트를 반환하는 배치 함수
+            name: 지표/스레드 이름 (batcher.<name>.batches 등)
+            max_batch_size: 배치 하나의 최대 크기 (item_size 합 기준)
+            max_wait_ms: 첫 요청 후 배치를 더 모으는 최대 시간 (0이면 greedy)
+            item_size: 요청 하나의 크기 (기본 1, 예: 리랭킹 요청은 (쿼리, 문서) 쌍 수)
+        """
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size는 양수여야 합니다: {max_batch_size}")
+
+        self.process_batch = process_batch
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.item_size = item_size or (lambda _: 1)
+
+        self._pending: Deque[Tuple[T, Future, float]] = deque()
+        self._pending_size = 0
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item: T) -> Future:
+        """요청 등록 (결과는 반환된 Future로 받음)"""
+        future: Future = Future()
+        with self._cond:
+            self._pending.append((item, future, time.perf_counter()))
+            self._pending_size += self.item_size(item)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def run(self, item: T, timeout: Optional[float] = None) -> R:
+        """요청 등록 후 결과를 기다림 (timeout을 넘기면 아직 배치에 들어가지 않은 요청은 취소하고 TimeoutError)"""
+        future = self.submit(item)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    async def asubmit(self, item: T) -> R:
+        """요청 등록 후 결과를 비동기로 기다림 (대기하던 코루틴이 취소되면 요청도 취소됨)"""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _take_batch(self) -> List[Tuple[T, Future, float]]:
+        """
+        대기 중인 요청에서 max_batch_size까지 꺼냄 (락 안에서 호출, 첫 요청은 크기와 관계없이 포함)
+        꺼낸 Future는 실행 중으로 바꿔서 이후 취소되지 않게 하고, 이미 취소된 요청은 버린다.
+        """
+        batch = []
+        size = 0
+        while self._pending:
+            item_size = self.item_size(self._pending[0][0])
+            if batch and size + item_size > self.max_batch_size:
+                break
+            entry = self._pending.popleft()
+            self._pending_size -= item_size
+            if not entry[1].set_running_or_notify_cancel():
+                metrics.incr(f"batcher.{self.name}.cancelled")
+                continue
+            batch.append(entry)
+            size += item_size
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                if self.max_wait > 0:
+                    deadline = time.monotonic() + self.max_wait
+                    while self._pending_size < self.max_batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                self._execute(batch)
+            except Exception as e:
+                # 작업 스레드가 죽으면 이후 요청이 모두 멈추므로, 어떤 오류든 기록만 하고 계속 처리
+                logger.error(f"❌ {self.name} 배치 후처리 실패: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _execute(self, batch: List[Tuple[T, Future, float]]):
+        started = time.perf_counter()
+        for _, _, submitted in batch:
+            metrics.observe(f"batcher.{self.name}.queue_ms", (started - submitted) * 1000)
+
+        try:
+            results = self.process_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"배치 결과 수 불일치: 요청 {len(batch)}개, 결과 {len(results)}개")
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name} 배치 처리 실패 ({len(batch)}개 요청): {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+        self.batches += 1
+        self.items += len(batch)
+        metrics.incr(f"batcher.{self.name}.batches")
+        metrics.incr(f"batcher.{self.name}.items", len(batch))
+        metrics.observe(f"batcher.{self.name}.batch_size", len(batch))
+        metrics.observe(f"batcher.{self.name}.batch_ms", (time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """실행한 배치 수, 처리한 요청 수, 평균 배치 크기"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
+
+
+class _LoopQueue:
+    """이벤트 루프 하나의 대기열과 배치 실행 태스크"""
+
+    def __init__(self):
+        self.pending: Deque[Tuple[Any, "asyncio.Future", float]] = deque()
+        self.drainer: Optional["asyncio.Task"] = None
+
+
+class AsyncMicroBatcher(Generic[T, R]):
+    """
+    MicroBatcher의 코루틴 버전 (배치 함수가 코루틴, 작업 스레드 없이 이벤트 루프별 대기열로 처리)
+    실행 중인 배치가 없으면 같은 루프 차례에 들어온 요청만 모아 바로 실행하고, 배치가 실행되는 동안
+    쌓인 요청은 다음 배치로 묶는다.
+    """
+
+    def __init__(self,
+                 process_batch: Callable[[List[T]], Awaitable[List[R]]],
+                 name: str,
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 0.0):
+        """
+        Args:
+            process_batch: 요청 리스트를 받아 같은 순서의 결과 리스트를 반환하는 코루틴 함수
+            name: 지표 이름 (MicroBatcher와 같은 batcher.<name>.* 지표에 합산)
+            max_batch_size: 배치 하나의 최대 요청 수
+            max_wait_ms: 첫 요청 후 배치를 더 모으는 최대 시간 (0이면 greedy)
+        """
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size는 양수여야 합니다: {max_batch_size}")
+
+        self.process_batch = process_batch
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopQueue]" = weakref.WeakKeyDictionary()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: T) -> R:
+        """요청 등록 후 결과를 기다림 (기다리던 코루틴이 취소되면 아직 배치에 들어가지 않은 요청은 빠짐)"""
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(loop)
+        if queue is None:
+            queue = self._queues[loop] = _LoopQueue()
+
+        future = loop.create_future()
+        queue.pending.append((item, future, time.perf_counter()))
+        if queue.drainer is None or queue.drainer.done():
+            queue.drainer = loop.create_task(self._drain(queue))
+        return await future
+
+    async def _drain(self, queue: _LoopQueue):
+        while queue.pending:
+            if self.max_wait > 0 and len(queue.pending) < self.max_batch_size:
+                await asyncio.sleep(self.max_wait)
+            batch = []
+            while queue.pending and len(batch) < self.max_batch_size:
+                entry = queue.pending.popleft()
+                if entry[1].done():
+                    metrics.incr(f"batcher.{self.name}.cancelled")
+                    continue
+                batch.append(entry)
+            if batch:
+                await self._execute(batch)
+
+    async def _execute(self, batch: List[Tuple[T, "asyncio.Future", float]]):
+        started = time.perf_counter()
+        for _, _, submitted in batch:
+            metrics.observe(f"batcher.{self.name}.queue_ms", (started - submitted) * 1000)
+
+        try:
+            results = await self.process_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"배치 결과 수 불일치: 요청 {len(batch)}개, 결과 {len(results)}개")
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name} 배치 처리 실패 ({len(batch)}개 요청): {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+        self.batches += 1
+        self.items += len(batch)
+        metrics.incr(f"batcher.{self.name}.batches")
+        metrics.incr(f"batcher.{self.name}.items", len(batch))
+        metrics.observe(f"batcher.{self.name}.batch_size", len(batch))
+        metrics.observe(f"batcher.{self.name}.batch_ms", (time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """실행한 배치 수, 처리한 요청 수, 평균 배치 크기"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": sum(len(queue.pending) for queue in list(self._queues.values())),
+        }
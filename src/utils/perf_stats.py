@@ -0,0 +1,89 @@
+"""
+인덱스/성능 통계 리포트
+프로세스 내 지표 레지스트리(src.utils.metrics)에 쌓인 카운터와 히스토그램을 도구별/단계별 지연시간,
+임베딩 처리율, 캐시 적중률로 정리한다. MCP의 get_obsidian_rag_stats와 같은 내용을 파이썬에서도 조회할 수 있다.
+
+    from src.utils.perf_stats import performance_stats
+    stats = performance_stats(db)     # stats["stages"]["embed"]["latency_ms"]["p95"]
+"""
+from typing import Any, Dict, Optional
+
+from src.utils.metrics import metrics
+
+TOOL_METRIC_PREFIX = "tool."
+STAGE_METRIC_PREFIX = "stage."
+CACHE_METRIC_PREFIX = "cache."
+BRANCH_METRIC_PREFIX = "retrieval.branch."
+
+
+def latency_stats(prefix: str) -> Dict[str, Dict[str, Any]]:
+    """접두사 아래 이름별 호출 수와 지연시간 분포 (<prefix><name>.latency_ms 기준)"""
+    names = [name[len(prefix):-len(".latency_ms")]
+             for name in metrics.histogram_names(prefix) if name.endswith(".latency_ms")]
+    return {
+        name: {
+            "calls": metrics.counter(f"{prefix}{name}.calls"),
+            "latency_ms": metrics.histogram(f"{prefix}{name}.latency_ms").summary(),
+        }
+        for name in names
+    }
+
+
+def tool_stats() -> Dict[str, Dict[str, Any]]:
+    """MCP 도구별 호출 수와 지연시간 (클라이언트별 동시 실행 한도 대기 포함)"""
+    return latency_stats(TOOL_METRIC_PREFIX)
+
+
+def stage_stats() -> Dict[str, Dict[str, Any]]:
+    """검색 단계별(embed, ann, rerank, format) 호출 수와 지연시간"""
+    return latency_stats(STAGE_METRIC_PREFIX)
+
+
+def embedding_stats() -> Dict[str, Any]:
+    """임베딩 요청 수/텍스트 수와 프로세스 시작 후 초당 처리율"""
+    return {
+        "calls": metrics.counter("stage.embed.calls"),
+        "texts": metrics.counter("stage.embed.texts"),
+        "calls_per_second": round(metrics.rate("stage.embed.calls"), 3),
+        "texts_per_second": round(metrics.rate("stage.embed.texts"), 3),
+    }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """캐시별 적중/미적중 수와 적중률 (cache.<이름>.hits / .misses 카운터 기준)"""
+    caches: Dict[str, Dict[str, Any]] = {}
+    for name, value in metrics.counters(CACHE_METRIC_PREFIX).items():
+        cache, _, field = name[len(CACHE_METRIC_PREFIX):].rpartition(".")
+        caches.setdefault(cache, {"hits": 0, "misses": 0})[field] = value
+
+    for stats in caches.values():
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+    return dict(sorted(caches.items()))
+
+
+def branch_stats() -> Dict[str, Dict[str, int]]:
+    """검색 브랜치별 성공/마감 초과/일부 샤드 실패/오류 수 (retrieval.branch.<이름>.<ok|timeout|partial|error> 카운터 기준)"""
+    branches: Dict[str, Dict[str, int]] = {}
+    for name, value in metrics.counters(BRANCH_METRIC_PREFIX).items():
+        branch, _, outcome = name[len(BRANCH_METRIC_PREFIX):].rpartition(".")
+        branches.setdefault(branch, {"ok": 0, "timeout": 0, "partial": 0, "error": 0})[outcome] = value
+    return dict(sorted(branches.items()))
+
+
+def performance_stats(vector_db: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    인덱스 통계와 도구/단계별 지연시간, 임베딩 처리율, 캐시 적중률, 검색 브랜치별 마감 초과 수
+
+    Args:
+        vector_db: 인덱스 통계를 조회할 VectorDB/ShardedVectorDB (None이면 인덱스 통계 생략)
+    """
+    return {
+        "uptime_seconds": round(metrics.uptime_seconds, 1),
+        "index": vector_db.index_stats() if vector_db is not None else None,
+        "tools": tool_stats(),
+        "stages": stage_stats(),
+        "embedding": embedding_stats(),
+        "caches": cache_stats(),
+        "retrieval_branches": branch_stats(),
+    }
@@ -0,0 +1,122 @@
+"""
+인덱스 버전별 검색 결과 캐시
+같은 대화 안에서 같은 검색어가 반복될 때 임베딩/ANN 검색/응답 포맷팅을 다시 하지 않도록
+(정규화한 검색어, k, 필터, 인덱스 버전)을 키로 결과를 보관하는 LRU 캐시.
+인덱스 버전(인덱스 ID + 세대 번호)이 바뀌면 이전 버전의 결과는 모두 버린다.
+
+    cache = ResultCache(max_entries=256)
+    key = make_cache_key(query, k, filters)
+    response = cache.get(key, db.index_version)
+    if response is None:
+        response = ...
+        cache.put(key, db.index_version, response)
+"""
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.metrics import metrics
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.result_cache")
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """유니코드 정규화(NFC, 한글 자모 조합 차이 제거) + 앞뒤 공백 제거 + 연속 공백 축약"""
+    return _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFC", query)).strip()
+
+
+def make_cache_key(query: str, k: int, filters: Optional[Dict[str, Any]] = None) -> Tuple[str, int, str]:
+    """캐시 키 (필터는 키 순서와 무관하게 같은 문자열이 되도록 정렬해서 직렬화)"""
+    return normalize_query(query), int(k), json.dumps(filters or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ResultCache:
+    """인덱스 버전이 바뀌면 비워지는 LRU 결과 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries: int = 256, name: str = "search"):
+        """
+        Args:
+            max_entries: 보관할 최대 결과 수 (넘으면 가장 오래 안 쓴 결과부터 제거)
+            name: 지표 이름 접두사 (cache.<name>.hits 등)
+        """
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _metric(self, suffix: str) -> str:
+        return f"cache.{self.name}.{suffix}"
+
+    def _check_version(self, version: str):
+        """인덱스 버전이 바뀌었으면 전체 무효화 (락 안에서 호출)"""
+        if version == self._version:
+            return
+        if self._entries:
+            self.invalidations += 1
+            metrics.incr(self._metric("invalidations"))
+            logger.info(f"♻️ 인덱스 변경으로 {self.name} 캐시 무효화: {self._version} → {version} "
+                        f"({len(self._entries)}개 제거)")
+            self._entries.clear()
+        self._version = version
+
+    def get(self, key: Tuple, version: str) -> Optional[Any]:
+        """캐시된 결과 (없거나 인덱스 버전이 다르면 None)"""
+        with self._lock:
+            self._check_version(version)
+            entry_key = key + (version,)
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                metrics.incr(self._metric("hits"))
+                return self._entries[entry_key]
+            self.misses += 1
+            metrics.incr(self._metric("misses"))
+            return None
+
+    def put(self, key: Tuple, version: str, value: Any):
+        """결과 저장 (get 이후 검색 도중 인덱스가 바뀌어 현재 버전과 다르면 저장 안 함)"""
+        with self._lock:
+            if version != self._version:
+                return
+            entry_key = key + (version,)
+            self._entries[entry_key] = value
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                metrics.incr(self._metric("evictions"))
+
+    def clear(self):
+        """전체 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/미적중 수, 적중률, 현재 크기, 무효화 횟수"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "index_version": self._version,
+            }
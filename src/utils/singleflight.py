@@ -0,0 +1,111 @@
+"""
+진행 중인 동일 요청 합치기 (singleflight)
+여러 MCP 세션이나 병렬 도구 호출이 같은 순간에 같은 쿼리를 보내면, 먼저 온 요청 하나만 실제로
+임베딩/검색을 실행하고 나머지는 그 결과(또는 예외)를 함께 기다린다. 완료된 결과는 보관하지 않는다
+(결과 재사용은 캐시의 역할).
+
+    flight = SingleFlight("embed_query")
+    vector = flight.do(text, lambda: self._embed(text))                 # 스레드 간
+    vector = await flight.ado(text, lambda: self._aembed(text))         # 같은 이벤트 루프의 코루틴 간
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from src.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """키별 진행 중 요청 합치기 (동기: 스레드 간, 비동기: 같은 이벤트 루프 안)"""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 지표 이름 (singleflight.<name>.leaders / .shared)
+        """
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def _count(self, leader: bool):
+        if leader:
+            self.leaders += 1
+            metrics.incr(f"singleflight.{self.name}.leaders")
+        else:
+            self.shared += 1
+            metrics.incr(f"singleflight.{self.name}.shared")
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        같은 키의 요청이 진행 중이면 그 결과를 기다리고, 없으면 직접 실행
+
+        Args:
+            key: 요청 식별 키 (같은 결과를 내는 요청끼리 같아야 함)
+            fn: 실제 작업
+
+        Returns:
+            작업 결과 (작업이 실패하면 기다리던 모든 호출자에게 같은 예외 전파)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            self._count(leader)
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        do의 비동기 버전 (작업은 별도 태스크로 실행되므로 한 호출자가 취소되어도 나머지는 결과를 받음)
+
+        Args:
+            key: 요청 식별 키
+            fn: 코루틴을 반환하는 함수
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[loop_key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._forget(loop_key, task))
+            self._count(leader)
+        return await asyncio.shield(task)
+
+    def _forget(self, loop_key: Tuple[int, Hashable], task: "asyncio.Future"):
+        with self._lock:
+            if self._tasks.get(loop_key) is task:
+                del self._tasks[loop_key]
+        # 모든 호출자가 취소된 뒤 실패한 경우 "예외가 회수되지 않음" 경고 방지
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """직접 실행한 요청 수와 다른 요청의 결과를 함께 받은 요청 수"""
+        total = self.leaders + self.shared
+        return {
+            "leaders": self.leaders,
+            "shared": self.shared,
+            "shared_ratio": round(self.shared / total, 3) if total else 0.0,
+            "in_flight": len(self._calls) + len(self._tasks),
+        }
@@ -0,0 +1,115 @@
+"""
+백그라운드 워밍업과 준비 상태
+서버가 연결을 바로 받을 수 있도록 모델 로딩, 컬렉션 열기, 더미 추론 같은 준비 작업을 별도 스레드에서
+단계별로 실행하고, 단계마다 소요 시간을 기록한다. 도구는 status()로 준비 상태를 알려줄 수 있다.
+
+    warmup = Warmup([("vectordb", ensure_vectordb), ("embedding", lambda: embeddings.embed_query("워밍업"))])
+    warmup.start()
+    if not await warmup.await_ready(timeout=2.0):
+        return warmup.status()
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.metrics import metrics
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.warmup")
+
+
+class Warmup:
+    """단계별 백그라운드 준비 작업 (실패한 단계가 있어도 나머지 단계는 계속 진행)"""
+
+    def __init__(self, phases: List[Tuple[str, Callable[[], Any]]]):
+        """
+        Args:
+            phases: (단계 이름, 실행 함수) 리스트, 순서대로 실행
+        """
+        self.phases = phases
+        self.state = "pending"  # pending → warming → ready / failed
+        self.current_phase: Optional[str] = None
+        self.phase_status: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name, _ in phases}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Warmup":
+        """워밍업 스레드 시작 (이미 시작했으면 무시)"""
+        if self._thread is None:
+            self._started_at = time.perf_counter()
+            self.state = "warming"
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        logger.info(f"🔥 백그라운드 워밍업 시작: {[name for name, _ in self.phases]}")
+        failed = False
+        for name, func in self.phases:
+            self.current_phase = name
+            self.phase_status[name] = {"status": "running"}
+            started = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                failed = True
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.phase_status[name] = {"status": "failed", "ms": round(elapsed_ms, 1), "error": str(e)}
+                logger.warning(f"⚠️ 워밍업 단계 실패 ({name}, {elapsed_ms:.0f}ms): {e}")
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.phase_status[name] = {"status": "done", "ms": round(elapsed_ms, 1)}
+            metrics.observe(f"warmup.{name}.ms", elapsed_ms)
+            logger.info(f"✅ 워밍업 단계 완료 ({name}): {elapsed_ms:.0f}ms")
+
+        self.current_phase = None
+        self._finished_at = time.perf_counter()
+        self.state = "failed" if failed else "ready"
+        logger.info(f"🔥 워밍업 종료 ({self.state}): 총 {self.elapsed_seconds:.2f}초")
+        self._done.set()
+
+    @property
+    def done(self) -> bool:
+        """모든 단계 실행 완료 여부 (실패 포함)"""
+        return self._done.is_set()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._started_at is None:
+            return 0.0
+        return (self._finished_at or time.perf_counter()) - self._started_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """워밍업이 끝날 때까지 대기 (timeout 안에 끝났으면 True)"""
+        return self._done.wait(timeout)
+
+    async def await_ready(self, timeout: Optional[float] = None) -> bool:
+        """wait의 비동기 버전 (이벤트 루프를 막지 않음)"""
+        if self.done:
+            return True
+        return await asyncio.to_thread(self._done.wait, timeout)
+
+    def status(self) -> Dict[str, Any]:
+        """준비 상태, 진행 중인 단계, 단계별 소요 시간"""
+        return {
+            "state": self.state,
+            "current_phase": self.current_phase,
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "phases": dict(self.phase_status),
+        }
+
+    def describe(self) -> str:
+        """도구 응답에 넣을 준비 상태 문장"""
+        if self.state == "pending":
+            return "⏳ 서버 준비 전입니다."
+        if self.state == "warming":
+            return (f"⏳ 서버 준비 중입니다 (단계: {self.current_phase}, {self.elapsed_seconds:.1f}초 경과). "
+                    f"잠시 후 다시 시도하세요.")
+        failed = [name for name, status in self.phase_status.items() if status["status"] == "failed"]
+        if failed:
+            return f"⚠️ 일부 준비 단계가 실패했습니다: {', '.join(failed)}"
+        return f"✅ 서버 준비 완료 ({self.elapsed_seconds:.1f}초)"
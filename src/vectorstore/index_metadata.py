@@ -0,0 +1,100 @@
+"""
+벡터DB 인덱스 메타데이터
+인덱스를 만든 임베딩 설정(fingerprint)을 함께 저장해서 쿼리 벡터와 문서 벡터가 항상 같은 공간에 있도록 보장
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+INDEX_METADATA_FILE = "index_meta.json"
+
+
+class IndexMetadata(BaseModel):
+    """인덱스 메타데이터 모델"""
+    embedding_type: str = Field(description="임베딩 타입 (google, kosimcse, ollama)")
+    model_name: str = Field(description="임베딩 모델명")
+    output_dim: Optional[int] = Field(
+        default=None,
+        description="Matryoshka 차원 축소 시 출력 차원 (None이면 모델 전체 차원)"
+    )
+    created_at: str = Field(
+        default_factory=lambda: datetime.now().isoformat(timespec="seconds"),
+        description="인덱스 생성 시간"
+    )
+    index_id: str = Field(
+        default_factory=lambda: uuid.uuid4().hex,
+        description="인덱스 고유 ID (삭제 후 재생성 시 새로 발급)"
+    )
+    generation: int = Field(default=0, description="인덱스 변경 시마다 증가하는 세대 번호")
+    distance_metric: str = Field(
+        default="l2",
+        description="검색 거리 척도 (Chroma hnsw:space, 기록이 없는 이전 인덱스는 Chroma 기본값 l2)"
+    )
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """쿼리/문서 벡터 호환성 판단에 쓰는 임베딩 설정"""
+        return {
+            "embedding_type": self.embedding_type,
+            "model_name": self.model_name,
+            "output_dim": self.output_dim,
+        }
+
+    @property
+    def version(self) -> str:
+        """캐시 무효화 등에 쓰는 인덱스 버전 문자열 (인덱스 ID + 세대)"""
+        return f"{self.index_id[:8]}-{self.generation}"
+
+
+def embedding_fingerprint(embedding_type: str, embeddings) -> Dict[str, Any]:
+    """현재 임베딩 인스턴스의 fingerprint 생성"""
+    model_name = getattr(embeddings, "model_name", None) or getattr(embeddings, "model", "unknown")
+    return {
+        "embedding_type": embedding_type,
+        "model_name": str(model_name),
+        "output_dim": getattr(embeddings, "output_dim", None),
+    }
+
+
+def load_index_metadata(persist_directory: str) -> Optional[IndexMetadata]:
+    """인덱스 메타데이터 로드 (없으면 None)"""
+    path = os.path.join(persist_directory, INDEX_METADATA_FILE)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return IndexMetadata(**json.load(f))
+
+
+def index_metadata_stamp(persist_directory: str) -> Optional[Tuple[int, int]]:
+    """메타데이터 파일의 (수정 시간 ns, 크기) (없으면 None, 다른 인스턴스/프로세스의 갱신 감지용)"""
+    try:
+        stat = os.stat(os.path.join(persist_directory, INDEX_METADATA_FILE))
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def directory_size(path: str) -> int:
+    """디렉터리 아래 파일 크기 합계 (바이트, 없으면 0)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def save_index_metadata(persist_directory: str, metadata: IndexMetadata):
+    """인덱스 메타데이터 저장 (임시 파일 작성 후 교체)"""
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, INDEX_METADATA_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata.model_dump(), f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
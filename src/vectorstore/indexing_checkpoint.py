@@ -0,0 +1,97 @@
+"""
+인덱싱 진행 체크포인트
+배치가 벡터DB에 저장될 때마다 완료된 노트(수정 시간 포함), 매니페스트 커서, 임베딩 fingerprint를 기록해서
+중단된 인덱싱을 처음부터 다시 하지 않고 이어서 진행할 수 있게 한다.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from pydantic import BaseModel, Field
+
+CHECKPOINT_FILE = "indexing_checkpoint.json"
+
+
+def manifest_hash(note_ids: List[str]) -> str:
+    """정렬된 노트 목록의 해시 (배치 분할이 이전 실행과 같은지 판단)"""
+    digest = hashlib.sha256()
+    for note_id in note_ids:
+        digest.update(note_id.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class IndexingCheckpoint(BaseModel):
+    """인덱싱 체크포인트 모델"""
+    fingerprint: Dict[str, Any] = Field(description="인덱싱에 사용한 임베딩 설정")
+    manifest_hash: str = Field(default="", description="배치 분할 기준이 된 노트 목록 해시")
+    batch_size: int = Field(default=0, description="배치 크기")
+    total_batches: int = Field(default=0, description="매니페스트 전체 배치 수")
+    batch_cursor: int = Field(default=0, description="이 번호 이전의 배치는 모두 완료됨")
+    completed_batches: List[int] = Field(
+        default_factory=list,
+        description="커서 이후에 먼저 완료된 배치 번호 (병렬 실행으로 순서가 뒤바뀐 경우)"
+    )
+    completed_notes: Dict[str, float] = Field(
+        default_factory=dict,
+        description="저장을 마친 노트 ID → 저장 당시 파일 수정 시간"
+    )
+    updated_at: str = Field(
+        default_factory=lambda: datetime.now().isoformat(timespec="seconds"),
+        description="마지막 갱신 시간"
+    )
+
+    def is_note_done(self, note_id: str, mtime: float) -> bool:
+        """노트가 같은 내용(수정 시간)으로 이미 저장되었는지"""
+        return self.completed_notes.get(note_id) == mtime
+
+    def start_manifest(self, manifest: str, batch_size: int, total_batches: int):
+        """새 매니페스트로 실행 시작 (매니페스트가 바뀌면 배치 커서만 초기화, 완료 노트는 유지)"""
+        if manifest != self.manifest_hash or batch_size != self.batch_size:
+            self.manifest_hash = manifest
+            self.batch_size = batch_size
+            self.batch_cursor = 0
+            self.completed_batches = []
+        self.total_batches = total_batches
+
+    def mark_batch(self, batch_index: int, notes: Dict[str, float]):
+        """배치 완료 기록 후 연속 구간만큼 커서 전진"""
+        self.completed_notes.update(notes)
+        if batch_index >= self.batch_cursor and batch_index not in self.completed_batches:
+            self.completed_batches.append(batch_index)
+
+        done = set(self.completed_batches)
+        while self.batch_cursor in done:
+            done.discard(self.batch_cursor)
+            self.batch_cursor += 1
+        self.completed_batches = sorted(done)
+        self.updated_at = datetime.now().isoformat(timespec="seconds")
+
+
+def load_checkpoint(persist_directory: str) -> Optional[IndexingCheckpoint]:
+    """체크포인트 로드 (없으면 None)"""
+    path = os.path.join(persist_directory, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return IndexingCheckpoint(**json.load(f))
+
+
+def save_checkpoint(persist_directory: str, checkpoint: IndexingCheckpoint):
+    """체크포인트 저장 (임시 파일 작성 후 교체)"""
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, CHECKPOINT_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint.model_dump(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def clear_checkpoint(persist_directory: str):
+    """체크포인트 삭제"""
+    path = os.path.join(persist_directory, CHECKPOINT_FILE)
+    if os.path.exists(path):
+        os.remove(path)
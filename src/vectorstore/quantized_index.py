@@ -0,0 +1,489 @@
+"""
+양자화 벡터 인덱스
+1차 후보 탐색은 메모리에 올린 압축 코드(int8 스칼라 양자화 / binary 코드)로 수행하고,
+상위 후보만 디스크에 저장된 float16/float32 원본 벡터로 재채점(rescoring)한다.
+"""
+import json
+import os
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.quantized_index")
+
+QUANTIZATION_TYPES = ("int8", "binary")
+
+# 1차 탐색 시 한 번에 float32로 풀어서 계산할 행 수 (임시 메모리 상한)
+_SCAN_BLOCK_ROWS = 16384
+
+# 삭제된 행이 이만큼 쌓이면 save() 시 압축 정리 (전체 행 대비 비율, 최소 행 수)
+_COMPACT_DEAD_RATIO = 0.25
+_COMPACT_MIN_DEAD_ROWS = 256
+
+# 바이트 단위 popcount 테이블 (binary 코드의 해밍 거리 계산용)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화 (코사인 유사도 계산용)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class QuantizedIndex:
+    """압축 코드 1차 탐색 + 원본 벡터 재채점 인덱스"""
+
+    def __init__(self,
+                 index_dir: str,
+                 quantization: str = "int8",
+                 rescore_dtype: str = "float16",
+                 rescore_multiplier: Optional[int] = None):
+        """
+        양자화 인덱스 초기화
+
+        Args:
+            index_dir: 인덱스 파일 저장 경로
+            quantization: 압축 방식 ("int8", "binary")
+            rescore_dtype: 디스크에 보관할 원본 벡터 타입 ("float16", "float32")
+            rescore_multiplier: 재채점할 후보 수 배율 (k * 배율, 기본: int8=4, binary=16)
+        """
+        if quantization not in QUANTIZATION_TYPES:
+            raise ValueError(f"지원하지 않는 양자화 방식: {quantization} (가능: {QUANTIZATION_TYPES})")
+
+        self.index_dir = index_dir
+        self.quantization = quantization
+        self.rescore_dtype = np.dtype(rescore_dtype)
+        # binary 코드는 근사 오차가 커서 더 많은 후보를 재채점
+        self.rescore_multiplier = rescore_multiplier or (16 if quantization == "binary" else 4)
+
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._codes: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+        self._full: Optional[np.memmap] = None
+        # 파일 세대 (압축 정리 시 새 세대 파일을 다 쓴 뒤 meta.json 교체로 전환)
+        self._generation = 0
+        self._dead_count = 0
+
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------
+    # 저장 / 로드
+    # ------------------------------------------------------------------
+    # 행 데이터(ID, 압축 코드, 스케일, 원본 벡터, 삭제 행 번호)는 세대별 파일 끝에 append만 하고,
+    # meta.json에는 확정된 행 수/삭제 수만 기록한다. 로드할 때 확정 길이를 넘는 꼬리(기록 도중 중단된 추가분)는 잘라낸다.
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.index_dir, "meta.json")
+
+    def _path(self, kind: str, generation: Optional[int] = None) -> str:
+        """세대별 데이터 파일 경로 (kind: ids, codes, scale, full, dead)"""
+        generation = self._generation if generation is None else generation
+        extension = {
+            "ids": "jsonl", "codes": "bin", "scale": "f32", "full": self.rescore_dtype.name, "dead": "i64",
+        }[kind]
+        return os.path.join(self.index_dir, f"{kind}.{generation}.{extension}")
+
+    @property
+    def _full_path(self) -> str:
+        return self._path("full")
+
+    @property
+    def _code_dtype(self) -> np.dtype:
+        return np.dtype(np.uint8 if self.quantization == "binary" else np.int8)
+
+    @property
+    def _code_width(self) -> int:
+        """행 하나의 압축 코드 길이 (int8: dim, binary: dim/8 올림)"""
+        return (self.dim + 7) // 8 if self.quantization == "binary" else self.dim
+
+    def _load(self):
+        """디스크에서 인덱스 로드 (확정되지 않은 꼬리 데이터는 잘라냄)"""
+        if not os.path.exists(self._meta_path):
+            return
+
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if "rows" not in meta:
+            logger.warning("⚠️ 이전 형식의 양자화 인덱스입니다. 삭제 후 재구축합니다")
+            self.clear()
+            return
+        if meta["quantization"] != self.quantization or meta["rescore_dtype"] != self.rescore_dtype.name:
+            logger.warning("⚠️ 양자화 설정이 변경되어 기존 양자화 인덱스를 무시합니다 (재구축 필요)")
+            return
+
+        self.dim = meta["dim"]
+        self._generation = meta["generation"]
+        rows = meta["rows"]
+        try:
+            ids = self._read_ids(rows)
+            self._codes = self._read_rows("codes", self._code_dtype, rows * self._code_width)
+            self._codes = self._codes.reshape(rows, self._code_width)
+            if self.quantization == "int8":
+                self._scale = self._read_rows("scale", np.dtype(np.float32), rows)
+            self._truncate(self._full_path, rows * self.dim * self.rescore_dtype.itemsize)
+            dead_rows = self._read_rows("dead", np.dtype(np.int64), meta["dead"])
+        except ValueError as e:
+            logger.warning(f"⚠️ 양자화 인덱스 파일이 손상되었습니다 ({e}). 삭제 후 재구축합니다")
+            self.clear()
+            return
+
+        self.ids = ids
+        self._alive = np.ones(rows, dtype=bool)
+        self._alive[dead_rows] = False
+        self._dead_count = len(dead_rows)
+        self._row_of = {doc_id: row for row, doc_id in enumerate(ids) if self._alive[row]}
+        self._remove_stale_generations()
+        self._open_full()
+        logger.info(f"📦 양자화 인덱스 로드: {self.size}개 벡터 ({self.quantization}, dim={self.dim})")
+
+    @staticmethod
+    def _truncate(path: str, length: int):
+        """파일을 확정 길이로 자름 (확정 길이보다 짧으면 손상)"""
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < length:
+            raise ValueError(f"{os.path.basename(path)}: {size} < {length} bytes")
+        if size > length:
+            with open(path, "r+b") as f:
+                f.truncate(length)
+
+    def _read_rows(self, kind: str, dtype: np.dtype, count: int) -> np.ndarray:
+        """세대 파일에서 확정된 count개 값 읽기"""
+        path = self._path(kind)
+        self._truncate(path, count * dtype.itemsize)
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.fromfile(path, dtype=dtype, count=count)
+
+    def _read_ids(self, rows: int) -> List[str]:
+        """ID 파일에서 확정된 rows줄 읽기"""
+        path = self._path("ids")
+        ids = []
+        length = 0
+        if rows:
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    ids.append(json.loads(line))
+                    length += len(line)
+                    if len(ids) == rows:
+                        break
+        if len(ids) < rows:
+            raise ValueError(f"ids: {len(ids)} < {rows} rows")
+        self._truncate(path, length)
+        return ids
+
+    def _remove_stale_generations(self):
+        """현재 세대가 아닌 데이터 파일 삭제 (압축 정리 도중 중단된 경우 등)"""
+        current = {os.path.basename(self._path(kind)) for kind in ("ids", "codes", "scale", "full", "dead")}
+        for name in os.listdir(self.index_dir):
+            if name != "meta.json" and name not in current and not name.endswith(".tmp"):
+                os.remove(os.path.join(self.index_dir, name))
+
+    def _open_full(self):
+        """재채점용 원본 벡터를 memmap으로 연결 (RAM에 올리지 않음)"""
+        if self.dim is None or not self.ids:
+            self._full = None
+            return
+        self._full = np.memmap(self._full_path, dtype=self.rescore_dtype, mode="r",
+                               shape=(len(self.ids), self.dim))
+
+    def _append(self, kind: str, data: bytes):
+        with open(self._path(kind), "ab") as f:
+            f.write(data)
+
+    def save(self):
+        """
+        추가/삭제 확정 (meta.json의 행 수/삭제 수를 원자적으로 교체)
+        행 데이터는 add/remove 시점에 이미 append되어 있고, 삭제 행이 많이 쌓였으면 압축 정리한다.
+        """
+        if self.dim is None:
+            return
+        if self._dead_count >= max(_COMPACT_MIN_DEAD_ROWS, len(self.ids) * _COMPACT_DEAD_RATIO):
+            self.compact()
+            return
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            "quantization": self.quantization,
+            "rescore_dtype": self.rescore_dtype.name,
+            "dim": self.dim,
+            "generation": self._generation,
+            "rows": len(self.ids),
+            "dead": self._dead_count,
+        }
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def compact(self):
+        """삭제된 행을 뺀 새 세대 파일을 쓰고 전환 (파일 크기 회수)"""
+        if self.dim is None:
+            return
+        keep = np.flatnonzero(self._alive)
+        generation = self._generation + 1
+        logger.info(f"🧹 양자화 인덱스 압축 정리: {len(self.ids)}행 → {len(keep)}행")
+
+        ids = [self.ids[row] for row in keep.tolist()]
+        codes = self._codes[keep]
+        scale = self._scale[keep] if self._scale is not None else None
+        with open(self._path("ids", generation), "wb") as f:
+            f.write("".join(json.dumps(doc_id) + "\n" for doc_id in ids).encode("utf-8"))
+        with open(self._path("codes", generation), "wb") as f:
+            f.write(codes.tobytes())
+        if scale is not None:
+            with open(self._path("scale", generation), "wb") as f:
+                f.write(scale.tobytes())
+        with open(self._path("full", generation), "wb") as f:
+            for start in range(0, len(keep), _SCAN_BLOCK_ROWS):
+                f.write(np.asarray(self._full[keep[start:start + _SCAN_BLOCK_ROWS]]).tobytes())
+        open(self._path("dead", generation), "wb").close()
+
+        # 새 세대 파일을 다 쓴 뒤 meta.json 교체로 전환하므로, 도중에 중단되어도 이전 세대가 그대로 남음
+        self._full = None
+        self._generation = generation
+        self.ids = ids
+        self._codes = codes
+        self._scale = scale
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._dead_count = 0
+        self._row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+        self._write_meta()
+        self._remove_stale_generations()
+        self._open_full()
+
+    def close(self):
+        """원본 벡터 memmap 해제 (인덱스 디렉터리를 지우거나 교체하기 전에 호출)"""
+        self._full = None
+
+    def clear(self):
+        """인덱스 파일 전체 삭제"""
+        self._full = None
+        for name in os.listdir(self.index_dir):
+            os.remove(os.path.join(self.index_dir, name))
+        self.dim = None
+        self.ids = []
+        self._row_of = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._codes = None
+        self._scale = None
+        self._generation = 0
+        self._dead_count = 0
+
+    # ------------------------------------------------------------------
+    # 추가 / 삭제
+    # ------------------------------------------------------------------
+    @property
+    def size(self) -> int:
+        """유효한(삭제되지 않은) 벡터 수"""
+        return int(self._alive.sum())
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """정규화된 벡터를 압축 코드로 변환 (int8은 행별 스케일도 함께 반환)"""
+        if self.quantization == "binary":
+            return np.packbits(vectors > 0, axis=1), None
+
+        # 벡터별 최대 절댓값으로 보정 (증분 추가 시에도 기존 코드와 독립적)
+        scale = np.abs(vectors).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        scale = scale.astype(np.float32)
+        return np.clip(np.rint(vectors / scale[:, None]), -127, 127).astype(np.int8), scale
+
+    def add(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]]):
+        """
+        벡터 추가 (같은 ID가 이미 있으면 기존 행을 무효화하고 새로 추가, save() 호출 시 확정)
+
+        Args:
+            ids: 벡터 ID 리스트 (Chroma 문서 ID와 동일)
+            embeddings: 임베딩 벡터 리스트
+        """
+        if not ids:
+            return
+
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"임베딩 차원 불일치: 인덱스 {self.dim}, 입력 {vectors.shape[1]}")
+
+        self.remove(ids)
+
+        codes, scale = self._encode(vectors)
+        self._append("full", vectors.astype(self.rescore_dtype).tobytes())
+        self._append("codes", codes.tobytes())
+        if scale is not None:
+            self._append("scale", scale.tobytes())
+            self._scale = scale if self._scale is None else np.concatenate([self._scale, scale])
+        self._append("ids", "".join(json.dumps(doc_id) + "\n" for doc_id in ids).encode("utf-8"))
+        self._codes = codes if self._codes is None else np.concatenate([self._codes, codes])
+
+        start = len(self.ids)
+        for offset, doc_id in enumerate(ids):
+            self._row_of[doc_id] = start + offset
+        self.ids.extend(ids)
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+        self._open_full()
+
+    def remove(self, ids: Sequence[str]):
+        """벡터 무효화 (삭제 행 번호를 append, 많이 쌓이면 save() 시 압축 정리)"""
+        rows = [row for row in (self._row_of.pop(doc_id, None) for doc_id in ids) if row is not None]
+        if not rows:
+            return
+        self._alive[rows] = False
+        self._dead_count += len(rows)
+        self._append("dead", np.asarray(rows, dtype=np.int64).tobytes())
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    def _first_pass_scores(self, query: np.ndarray) -> np.ndarray:
+        """압축 코드로 전체 벡터의 근사 점수 계산 (높을수록 유사)"""
+        n_rows = len(self.ids)
+        scores = np.empty(n_rows, dtype=np.float32)
+
+        if self.quantization == "binary":
+            query_bits = np.packbits(query > 0)
+            for start in range(0, n_rows, _SCAN_BLOCK_ROWS):
+                block = self._codes[start:start + _SCAN_BLOCK_ROWS]
+                hamming = _POPCOUNT[np.bitwise_xor(block, query_bits)].sum(axis=1, dtype=np.int32)
+                scores[start:start + len(block)] = -hamming
+        else:
+            for start in range(0, n_rows, _SCAN_BLOCK_ROWS):
+                block = self._codes[start:start + _SCAN_BLOCK_ROWS]
+                scale = self._scale[start:start + _SCAN_BLOCK_ROWS]
+                scores[start:start + len(block)] = (block.astype(np.float32) @ query) * scale
+
+        scores[~self._alive] = -np.inf
+        return scores
+
+    def _exact_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """디스크의 원본 벡터로 정확한 코사인 유사도 계산"""
+        ordered = np.sort(rows)  # 디스크 순차 접근을 위해 정렬
+        exact = np.asarray(self._full[ordered], dtype=np.float32) @ query
+        lookup = dict(zip(ordered.tolist(), exact.tolist()))
+        return np.array([lookup[row] for row in rows.tolist()], dtype=np.float32)
+
+    def _approx_cosine(self, first_pass: np.ndarray) -> np.ndarray:
+        """
+        1차 점수를 근사 코사인 유사도로 변환 (재채점 없이 반환할 때도 같은 거리 척도를 쓰도록)
+        int8은 이미 내적 근사값이고, binary는 부호 비트 해밍 거리 h를 cos(pi * h / dim)로 추정한다.
+        """
+        if self.quantization == "binary":
+            return np.cos(np.pi * -first_pass / self.dim).astype(np.float32)
+        return first_pass
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+        """점수 상위 k개 행 인덱스 (내림차순)"""
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.argpartition(-scores, k - 1)[:k]
+        return rows[np.argsort(-scores[rows])]
+
+    def search(self, query_embedding: Sequence[float], k: int = 5,
+               rescore: bool = True) -> List[Tuple[str, float]]:
+        """
+        양자화 검색
+
+        Args:
+            query_embedding: 쿼리 임베딩
+            k: 반환할 결과 수
+            rescore: 원본 벡터 재채점 여부 (False면 압축 코드의 근사 거리를 그대로 반환, 디스크 읽기 없음)
+
+        Returns:
+            (ID, 코사인 거리) 튜플 리스트 (거리 오름차순)
+        """
+        if self.size == 0:
+            return []
+
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        first_pass = self._first_pass_scores(query)
+
+        if not rescore:
+            rows = self._top_rows(first_pass, k)
+            approx = self._approx_cosine(first_pass[rows])
+            return [(self.ids[row], float(1 - score)) for row, score in zip(rows.tolist(), approx.tolist())]
+
+        candidates = self._top_rows(first_pass, k * self.rescore_multiplier)
+        exact = self._exact_scores(query, candidates)
+        order = np.argsort(-exact)[:k]
+        return [(self.ids[candidates[i]], float(1 - exact[i])) for i in order.tolist()]
+
+    def _brute_force(self, query: np.ndarray, k: int) -> List[str]:
+        """압축 없이 원본 벡터 전체를 스캔한 정답 집합"""
+        n_rows = len(self.ids)
+        scores = np.empty(n_rows, dtype=np.float32)
+        for start in range(0, n_rows, _SCAN_BLOCK_ROWS):
+            block = np.asarray(self._full[start:start + _SCAN_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        scores[~self._alive] = -np.inf
+        return [self.ids[row] for row in self._top_rows(scores, k).tolist()]
+
+    # ------------------------------------------------------------------
+    # 리포트
+    # ------------------------------------------------------------------
+    def memory_report(self) -> Dict[str, Any]:
+        """비압축 float32 인덱스 대비 메모리 사용량 리포트"""
+        n_rows = len(self.ids)
+        dim = self.dim or 0
+        float32_bytes = n_rows * dim * 4
+        code_bytes = int(self._codes.nbytes) if self._codes is not None else 0
+        if self._scale is not None:
+            code_bytes += int(self._scale.nbytes)
+        disk_bytes = os.path.getsize(self._full_path) if os.path.exists(self._full_path) else 0
+
+        return {
+            "quantization": self.quantization,
+            "vectors": self.size,
+            "dim": dim,
+            "float32_ram_bytes": float32_bytes,
+            "quantized_ram_bytes": code_bytes,
+            "rescore_disk_bytes": disk_bytes,
+            "rescore_dtype": self.rescore_dtype.name,
+            "ram_saving_ratio": round(1 - code_bytes / float32_bytes, 4) if float32_bytes else 0.0,
+        }
+
+    def evaluate_recall(self, query_embeddings: Sequence[Sequence[float]], k: int = 10) -> Dict[str, Any]:
+        """
+        비압축 전수 탐색 대비 recall@k 측정
+
+        Args:
+            query_embeddings: 평가용 쿼리 임베딩 리스트
+            k: 비교할 상위 결과 수
+
+        Returns:
+            1차 탐색만 사용했을 때와 재채점 후의 평균 recall@k
+        """
+        first_pass_recalls = []
+        rescored_recalls = []
+        for embedding in query_embeddings:
+            query = _normalize(np.asarray(embedding, dtype=np.float32))
+            truth = set(self._brute_force(query, k))
+            if not truth:
+                continue
+            first_pass = {doc_id for doc_id, _ in self.search(embedding, k, rescore=False)}
+            rescored = {doc_id for doc_id, _ in self.search(embedding, k, rescore=True)}
+            first_pass_recalls.append(len(truth & first_pass) / len(truth))
+            rescored_recalls.append(len(truth & rescored) / len(truth))
+
+        def _mean(values: List[float]) -> float:
+            return round(sum(values) / len(values), 4) if values else 0.0
+
+        return {
+            "k": k,
+            "queries": len(rescored_recalls),
+            "first_pass_recall": _mean(first_pass_recalls),
+            "rescored_recall": _mean(rescored_recalls),
+            "recall_loss": round(1 - _mean(rescored_recalls), 4) if rescored_recalls else 0.0,
+        }
@@ -0,0 +1,128 @@
+"""
+의미 기반 쿼리 캐시
+"회의 일정"과 "회의 일정 알려줘"처럼 살짝 바꿔 말한 쿼리마다 ANN 검색(과 리랭킹)을 다시 하지 않도록,
+최근 쿼리 임베딩을 (최대 항목 수 × 차원) float32 행렬에 보관하고 새 쿼리와의 코사인 유사도가
+임계값 이상인 항목이 있으면 그 결과를 그대로 돌려준다. 인덱스 버전이 바뀌면 전체를 비운다.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.metrics import metrics
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.semantic_cache")
+
+
+class SemanticQueryCache:
+    """최근 쿼리 임베딩 행렬 기반 근사 중복 쿼리 캐시 (링 버퍼, 스레드 안전)"""
+
+    def __init__(self, max_entries: int = 128, threshold: float = 0.95):
+        """
+        Args:
+            max_entries: 보관할 최근 쿼리 수 (넘으면 가장 오래된 항목부터 덮어씀)
+            threshold: 캐시 적중으로 볼 최소 코사인 유사도
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._matrix: Optional[np.ndarray] = None  # (max_entries, dim) 정규화된 쿼리 임베딩
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._next = 0
+        self._size = 0
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _reset(self):
+        self._matrix = None
+        self._entries = [None] * self.max_entries
+        self._next = 0
+        self._size = 0
+
+    def _check_version(self, version: str):
+        """인덱스 버전이 바뀌었으면 전체 무효화 (락 안에서 호출)"""
+        if version == self._version:
+            return
+        if self._size:
+            self.invalidations += 1
+            metrics.incr("cache.semantic.invalidations")
+            logger.info(f"♻️ 인덱스 변경으로 의미 캐시 무효화: {self._version} → {version} ({self._size}개 제거)")
+        self._reset()
+        self._version = version
+
+    def lookup(self, embedding: Sequence[float], k: int, kind: str, version: str) -> Optional[List[Any]]:
+        """
+        유사한 이전 쿼리의 결과 조회
+
+        Args:
+            embedding: 쿼리 임베딩
+            k: 필요한 결과 수 (캐시된 결과가 k개 이상 요청으로 만들어진 것만 사용)
+            kind: 결과 종류 ("vector", "rerank:20" 등, 같은 종류끼리만 비교)
+            version: 현재 인덱스 버전
+
+        Returns:
+            상위 k개 결과 (적중하지 않으면 None)
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            self._check_version(version)
+            if self._size and self._matrix is not None and self._matrix.shape[1] == query.shape[0]:
+                similarities = self._matrix[:self._size] @ query
+                for row in np.argsort(-similarities):
+                    if similarities[row] < self.threshold:
+                        break
+                    entry = self._entries[row]
+                    if entry["kind"] == kind and entry["k"] >= k:
+                        self.hits += 1
+                        metrics.incr("cache.semantic.hits")
+                        metrics.observe("cache.semantic.similarity", float(similarities[row]))
+                        return entry["results"][:k]
+            self.misses += 1
+            metrics.incr("cache.semantic.misses")
+            return None
+
+    def store(self, embedding: Sequence[float], k: int, kind: str, version: str, results: List[Any]):
+        """쿼리 결과 저장 (조회 이후 인덱스 버전이 바뀌었으면 저장 안 함)"""
+        query = self._normalize(embedding)
+        with self._lock:
+            if version != self._version:
+                return
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                self._reset()
+                self._matrix = np.zeros((self.max_entries, query.shape[0]), dtype=np.float32)
+
+            row = self._next
+            self._matrix[row] = query
+            self._entries[row] = {"kind": kind, "k": k, "results": list(results)}
+            self._next = (row + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def clear(self):
+        """전체 비우기"""
+        with self._lock:
+            self._reset()
+            self._version = None
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/미적중 수, 적중률, 현재 크기, 임계값"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": self._size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "invalidations": self.invalidations,
+                "index_version": self._version,
+            }
@@ -0,0 +1,341 @@
+"""
+샤딩된 멀티 볼트 벡터DB
+볼트(또는 볼트의 최상위 폴더)마다 별도의 Chroma 컬렉션과 세대 번호를 두고,
+검색은 모든 샤드에 동시에 요청한 뒤 전역 top-k로 병합한다.
+"""
+import asyncio
+import heapq
+import json
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from langchain_core.documents import Document
+from pydantic import BaseModel, Field
+
+from src.obsidian.obsidian_loader import process_obsidian_vault
+from src.vectorstore.vector_db import VectorDB, dedupe_result_sets, embed_queries, replace_index_directory
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.sharded_db")
+
+
+class PartialShardResults(RuntimeError):
+    """일부 샤드 검색이 실패한 경우: 응답한 샤드의 병합 결과와 실패한 샤드 목록을 함께 전달 (완전한 결과로 캐시하지 않도록)"""
+
+    def __init__(self, results: Any, failed_shards: Dict[str, str]):
+        super().__init__(f"샤드 검색 실패: {', '.join(failed_shards)}")
+        self.results = results
+        self.failed_shards = failed_shards
+
+
+class ShardConfig(BaseModel):
+    """샤드 설정"""
+    name: str = Field(description="샤드 이름 (예: work, personal, archive)")
+    vault_path: str = Field(description="옵시디언 볼트 경로")
+    persist_directory: str = Field(description="샤드 벡터DB 저장 경로 (느린 저장소도 가능)")
+    folder: Optional[str] = Field(
+        default=None,
+        description="볼트 내 최상위 폴더만 인덱싱할 경우 폴더명"
+    )
+    cold: bool = Field(
+        default=False,
+        description="콜드 샤드 여부 (첫 검색 시점에 지연 로딩)"
+    )
+
+    @property
+    def notes_path(self) -> str:
+        """실제로 인덱싱하는 노트 경로"""
+        return os.path.join(self.vault_path, self.folder) if self.folder else self.vault_path
+
+
+def load_shard_configs(config_path: str) -> List[ShardConfig]:
+    """
+    JSON 설정 파일에서 샤드 목록 로드
+
+    형식: {"shards": [{"name": "work", "vault_path": "...", "persist_directory": "...", "cold": false}]}
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    shards = []
+    for item in raw.get("shards", []):
+        item["vault_path"] = os.path.expanduser(item["vault_path"])
+        item["persist_directory"] = os.path.expanduser(item["persist_directory"])
+        shards.append(ShardConfig(**item))
+
+    names = [shard.name for shard in shards]
+    if len(names) != len(set(names)):
+        raise ValueError(f"샤드 이름이 중복되었습니다: {names}")
+    return shards
+
+
+class ShardedVectorDB:
+    """여러 샤드를 하나의 검색 인터페이스로 묶는 클래스"""
+
+    def __init__(self,
+                 shards: List[ShardConfig],
+                 embedding_type: str = "ollama",
+                 quantization: Optional[str] = None,
+                 embedding_dim: Optional[int] = None,
+                 semantic_cache_threshold: Optional[float] = None):
+        """
+        샤딩 벡터DB 초기화
+
+        Args:
+            shards: 샤드 설정 리스트
+            embedding_type: 모든 샤드가 공유할 임베딩 타입
+            quantization: 샤드별 양자화 방식
+            embedding_dim: 임베딩 출력 차원 (ollama 전용)
+            semantic_cache_threshold: 샤드별 의미 캐시 적중 최소 코사인 유사도 (기본 None: 사용 안 함)
+        """
+        if not shards:
+            raise ValueError("샤드가 하나 이상 필요합니다")
+
+        self.configs: Dict[str, ShardConfig] = {shard.name: shard for shard in shards}
+        self.embedding_type = embedding_type
+        self.quantization = quantization
+        self.embedding_dim = embedding_dim
+        self.semantic_cache_threshold = semantic_cache_threshold
+
+        self.embeddings = None
+        self.shards: Dict[str, VectorDB] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="shard-search")
+
+        # 콜드 샤드는 첫 검색 때 연다
+        for shard in shards:
+            if not shard.cold:
+                self._open_shard(shard.name)
+
+        logger.info(f"🧩 샤딩 벡터DB 초기화: {list(self.configs)} (콜드: "
+                    f"{[s.name for s in shards if s.cold]})")
+
+    def _open_shard(self, name: str) -> VectorDB:
+        """샤드 벡터DB 열기 (임베딩 인스턴스는 모든 샤드가 공유)"""
+        with self._lock:
+            if name in self.shards:
+                return self.shards[name]
+
+            config = self.configs[name]
+            shard_db = self._create_shard_db(config.persist_directory)
+            self.shards[name] = shard_db
+            logger.info(f"📂 샤드 로드: {name} ({config.persist_directory}, 세대 {shard_db.generation})")
+            return shard_db
+
+    def _create_shard_db(self, persist_directory: str) -> VectorDB:
+        """샤드 설정을 공유하는 VectorDB 생성 (첫 샤드의 임베딩 인스턴스를 이후 샤드가 재사용)"""
+        shard_db = VectorDB(
+            persist_directory,
+            embedding_type=self.embedding_type,
+            quantization=self.quantization,
+            embedding_dim=self.embedding_dim,
+            embeddings=self.embeddings,
+            semantic_cache_threshold=self.semantic_cache_threshold,
+        )
+        if self.embeddings is None:
+            self.embeddings = shard_db.embeddings
+        return shard_db
+
+    def _all_shards(self) -> List[Tuple[str, VectorDB]]:
+        """모든 샤드 (콜드 샤드 포함, 필요시 로딩)"""
+        return [(name, self.shards.get(name) or self._open_shard(name)) for name in self.configs]
+
+    @property
+    def index_version(self) -> str:
+        """전체 샤드 버전을 합친 문자열 (어느 샤드든 바뀌면 달라짐)"""
+        return ",".join(f"{name}:{self.shards[name].index_version}"
+                        for name in self.configs if name in self.shards)
+
+    def shard_status(self) -> List[Dict[str, Any]]:
+        """샤드별 상태 정보"""
+        status = []
+        for name, config in self.configs.items():
+            shard_db = self.shards.get(name)
+            status.append({
+                "name": name,
+                "path": config.notes_path,
+                "persist_directory": config.persist_directory,
+                "cold": config.cold,
+                "loaded": shard_db is not None,
+                "generation": shard_db.generation if shard_db is not None else None,
+            })
+        return status
+
+    def get_chunk(self, source: str, chunk_index: int) -> Optional[Document]:
+        """노트 파일 경로와 청크 번호로 청크 조회 (샤드를 차례로 확인, 메타데이터에 shard 추가)"""
+        for name, shard_db in self._all_shards():
+            doc = shard_db.get_chunk(source, chunk_index)
+            if doc is not None:
+                doc.metadata = {**doc.metadata, "shard": name}
+                return doc
+        return None
+
+    def index_stats(self) -> Dict[str, Any]:
+        """로딩된 샤드의 합계와 샤드별 인덱스 통계 (통계 때문에 콜드 샤드를 열지 않음)"""
+        shards = {name: shard_db.index_stats() for name, shard_db in list(self.shards.items())}
+        return {
+            "chunks": sum(stats["chunks"] for stats in shards.values()),
+            "notes": sum(stats["notes"] for stats in shards.values()),
+            "index_version": self.index_version,
+            "disk_bytes": sum(stats["disk_bytes"] for stats in shards.values()),
+            "shards": shards,
+            "unloaded_shards": [name for name in self.configs if name not in shards],
+        }
+
+    def semantic_cache_stats(self) -> Dict[str, Any]:
+        """로딩된 샤드별 의미 캐시 통계"""
+        return {name: shard_db.semantic_cache_stats() for name, shard_db in self.shards.items()}
+
+    def search_with_score(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """
+        모든 샤드에 병렬 검색 후 전역 top-k 병합
+
+        Args:
+            query: 검색 쿼리
+            k: 최종 결과 수
+
+        Returns:
+            (문서, 거리) 튜플 리스트 (거리 오름차순, 메타데이터에 shard 추가)
+
+        Raises:
+            PartialShardResults: 일부 샤드 검색이 실패한 경우 (나머지 샤드 결과는 예외의 results)
+        """
+        shards = self._all_shards()
+        embedding = self.embeddings.embed_query(query)
+        logger.debug(f"🔍 샤드 {len(shards)}개 병렬 검색: '{query}' (결과 수: {k})")
+        return self._search_shards_by_vector(shards, embedding, k)
+
+    def _search_shards_by_vector(self, shards: List[Tuple[str, VectorDB]], embedding: List[float],
+                                 k: int) -> List[Tuple[Document, float]]:
+        """샤드별 검색을 병렬로 실행하고 거리 기준 전역 top-k 병합"""
+        futures = {
+            name: self._executor.submit(shard_db.search_by_vector_with_score, embedding, k)
+            for name, shard_db in shards
+        }
+
+        merged = []
+        failed: Dict[str, str] = {}
+        for name, future in futures.items():
+            try:
+                for doc, score in future.result():
+                    doc.metadata = {**doc.metadata, "shard": name}
+                    merged.append((doc, score))
+            except Exception as e:
+                logger.warning(f"⚠️ 샤드 검색 실패 ({name}): {e}")
+                failed[name] = str(e)
+
+        results = heapq.nsmallest(k, merged, key=lambda item: item[1])
+        if failed:
+            raise PartialShardResults(results, failed)
+        logger.info(f"✅ 샤드 검색 완료: {len(merged)}개 후보 중 {len(results)}개 반환")
+        return results
+
+    def search_many(self, queries: List[str], k: int = 5, dedupe: bool = False) -> List[List[Tuple[Document, float]]]:
+        """
+        쿼리 여러 개를 모든 샤드에 검색 (임베딩은 한 번, 샤드별 다중 조회는 병렬)
+
+        Args:
+            queries: 검색 쿼리 리스트
+            k: 쿼리당 결과 수
+            dedupe: 여러 쿼리 결과에 나온 같은 청크를 가장 가까운 쿼리 결과에만 남길지 여부
+
+        Returns:
+            쿼리 순서대로의 (문서, 거리) 리스트 (메타데이터에 shard 추가)
+
+        Raises:
+            PartialShardResults: 일부 샤드 검색이 실패한 경우 (나머지 샤드 결과는 예외의 results)
+        """
+        if not queries:
+            return []
+
+        shards = self._all_shards()
+        embeddings = embed_queries(self.embeddings, queries)
+        fetch_k = k * 2 if dedupe else k
+        futures = {
+            name: self._executor.submit(shard_db.search_many_by_vectors, embeddings, fetch_k)
+            for name, shard_db in shards
+        }
+
+        merged: List[List[Tuple[Document, float]]] = [[] for _ in queries]
+        failed: Dict[str, str] = {}
+        for name, future in futures.items():
+            try:
+                for query_index, results in enumerate(future.result()):
+                    for doc, score in results:
+                        doc.metadata = {**doc.metadata, "shard": name}
+                        merged[query_index].append((doc, score))
+            except Exception as e:
+                logger.warning(f"⚠️ 샤드 다중 검색 실패 ({name}): {e}")
+                failed[name] = str(e)
+
+        result_sets = [heapq.nsmallest(fetch_k, results, key=lambda item: item[1]) for results in merged]
+        if dedupe:
+            result_sets = dedupe_result_sets(result_sets, k)
+        if failed:
+            raise PartialShardResults(result_sets, failed)
+        logger.info(f"✅ 샤드 다중 검색 완료: 쿼리 {len(queries)}개, 샤드 {len(shards)}개")
+        return result_sets
+
+    async def asearch_with_score(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """비동기 샤드 검색 (쿼리 임베딩은 aembed_query, 샤드 조회/병합은 워커 스레드에서 실행)"""
+        shards = await asyncio.to_thread(self._all_shards)
+        embedding = await self.embeddings.aembed_query(query)
+        return await asyncio.to_thread(self._search_shards_by_vector, shards, embedding, k)
+
+    def search(self, query: str, k: int = 5) -> List[Document]:
+        """모든 샤드 검색 (문서만 반환)"""
+        return [doc for doc, _ in self.search_with_score(query, k)]
+
+    def rebuild_shard(self, name: str) -> int:
+        """
+        샤드 하나만 다시 인덱싱 (다른 샤드는 그대로 검색 가능)
+
+        Args:
+            name: 샤드 이름
+
+        Returns:
+            저장된 청크 수
+        """
+        if name not in self.configs:
+            raise ValueError(f"알 수 없는 샤드: {name}")
+
+        config = self.configs[name]
+        logger.info(f"🔄 샤드 재구축 시작: {name}")
+
+        documents = process_obsidian_vault(config.vault_path, subfolder=config.folder)
+
+        # 새 디렉터리에 다 만든 뒤 교체하므로 재구축 중에도 기존 샤드로 검색 가능
+        build_path = f"{config.persist_directory.rstrip(os.sep)}.rebuild-{uuid.uuid4().hex[:8]}"
+        try:
+            built_db = self._create_shard_db(build_path)
+            built_db.add_documents(documents)
+            built_db.close()
+        except Exception:
+            shutil.rmtree(build_path, ignore_errors=True)
+            raise
+
+        with self._lock:
+            old_db = self.shards.pop(name, None)
+            if old_db is not None:
+                old_db.close()
+            replace_index_directory(config.persist_directory, build_path)
+
+        self._open_shard(name)
+        logger.info(f"✅ 샤드 재구축 완료: {name} ({len(documents)}개 청크)")
+        return len(documents)
+
+    def rebuild_all(self) -> Dict[str, int]:
+        """모든 샤드 재구축"""
+        return {name: self.rebuild_shard(name) for name in self.configs}
+
+    def close(self):
+        """검색 스레드 풀 종료와 로딩된 샤드 닫기"""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for shard_db in self.shards.values():
+                shard_db.close()
+            self.shards.clear()
@@ -0,0 +1,206 @@
+"""
+벡터DB 스냅샷 내보내기/가져오기
+ID, 텍스트, 메타데이터, 임베딩, 임베딩 fingerprint를 컬럼 단위 NPZ 파트로 묶은 zip 파일에 저장한다.
+내보내기는 배치 단위로 스트리밍해서 메모리 사용량이 볼트 크기와 무관하고,
+가져오기는 저장된 임베딩을 그대로 Chroma에 넣으므로 임베딩 모델을 호출하지 않는다.
+
+사용법:
+    python -m src.vectorstore.snapshot export ~/obsidian_vectordb obsidian_snapshot.zip
+    python -m src.vectorstore.snapshot import obsidian_snapshot.zip ~/obsidian_vectordb
+"""
+import argparse
+import io
+import json
+import os
+import time
+import zipfile
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+from langchain_chroma import Chroma
+
+from src.vectorstore.index_metadata import (
+    IndexMetadata, embedding_fingerprint, load_index_metadata, save_index_metadata
+)
+from src.logging.logger_factory import LoggerFactory
+
+logger = LoggerFactory.get_logger("obsidian_rag.snapshot")
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def _pack_strings(values: List[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """문자열 리스트를 UTF-8 바이트 버퍼 + 오프셋 배열로 변환 (고정폭 유니코드 배열보다 작음, None은 빈 문자열)"""
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(data) for data in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(data: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """_pack_strings 의 역변환"""
+    raw = data.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def export_snapshot(db: Union[str, Any], output_path: str, batch_size: int = 2000,
+                    embedding_dtype: str = "float32") -> Dict[str, Any]:
+    """
+    벡터DB를 스냅샷 파일로 내보내기
+
+    Args:
+        db: 내보낼 벡터DB 경로 (Chroma 컬렉션만 열고 임베딩 모델은 로딩하지 않음) 또는 VectorDB 인스턴스
+        output_path: 스냅샷 zip 파일 경로
+        batch_size: 한 파트에 담을 청크 수 (메모리 사용량 상한)
+        embedding_dtype: 저장할 임베딩 타입 ("float32", "float16")
+
+    Returns:
+        스냅샷 매니페스트
+    """
+    if isinstance(db, str):
+        index_metadata = load_index_metadata(db)
+        if index_metadata is None:
+            raise ValueError(f"인덱스 메타데이터({db}/index_meta.json)가 없습니다. VectorDB 인스턴스로 내보내세요.")
+        collection = Chroma(persist_directory=db)._collection
+    else:
+        collection = db.vectorstore._collection
+        index_metadata = db.index_metadata or IndexMetadata(**embedding_fingerprint(db.embedding_type, db.embeddings))
+    total = collection.count()
+
+    logger.info(f"📦 스냅샷 내보내기 시작: {total}개 청크 → {output_path}")
+    start_time = time.time()
+
+    parts = []
+    dim = None
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for offset in range(0, total, batch_size):
+            batch = collection.get(limit=batch_size, offset=offset,
+                                   include=["documents", "metadatas", "embeddings"])
+            if not batch["ids"]:
+                break
+
+            embeddings = np.asarray(batch["embeddings"], dtype=embedding_dtype)
+            dim = embeddings.shape[1]
+            id_data, id_offsets = _pack_strings(batch["ids"])
+            text_data, text_offsets = _pack_strings(batch["documents"])
+            meta_data, meta_offsets = _pack_strings(
+                [json.dumps(metadata or {}, ensure_ascii=False) for metadata in batch["metadatas"]]
+            )
+
+            buffer = io.BytesIO()
+            np.savez_compressed(
+                buffer,
+                id_data=id_data, id_offsets=id_offsets,
+                text_data=text_data, text_offsets=text_offsets,
+                meta_data=meta_data, meta_offsets=meta_offsets,
+                embeddings=embeddings,
+            )
+            part_name = f"part-{len(parts):05d}.npz"
+            archive.writestr(part_name, buffer.getvalue())
+            parts.append({"name": part_name, "count": len(batch["ids"])})
+            logger.debug(f"  {part_name}: {len(batch['ids'])}개 청크")
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "index_metadata": index_metadata.model_dump(),
+            "collection_name": collection.name,
+            "collection_metadata": collection.metadata,
+            "count": sum(part["count"] for part in parts),
+            "dim": dim,
+            "embedding_dtype": embedding_dtype,
+            "parts": parts,
+        }
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    elapsed = time.time() - start_time
+    logger.info(f"✅ 스냅샷 내보내기 완료: {manifest['count']}개 청크, "
+                f"{os.path.getsize(output_path) / 1024 / 1024:.1f}MB, {elapsed:.1f}초")
+    return manifest
+
+
+def import_snapshot(snapshot_path: str, persist_directory: str) -> Dict[str, Any]:
+    """
+    스냅샷 파일을 새 벡터DB 경로로 가져오기 (임베딩 모델 호출 없음)
+
+    Args:
+        snapshot_path: 스냅샷 zip 파일 경로
+        persist_directory: 생성할 벡터DB 경로 (비어 있어야 함)
+
+    Returns:
+        스냅샷 매니페스트
+    """
+    if os.path.exists(persist_directory) and os.listdir(persist_directory):
+        raise ValueError(f"가져올 경로가 비어 있지 않습니다: {persist_directory}")
+
+    start_time = time.time()
+    with zipfile.ZipFile(snapshot_path, "r") as archive:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+        if manifest["format_version"] != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 버전: {manifest['format_version']}")
+
+        logger.info(f"📥 스냅샷 가져오기 시작: {manifest['count']}개 청크 → {persist_directory}")
+
+        # 임베딩 함수 없이 컬렉션만 생성 (저장된 벡터를 그대로 사용)
+        vectorstore = Chroma(
+            collection_name=manifest["collection_name"],
+            persist_directory=persist_directory,
+            collection_metadata=manifest["collection_metadata"],
+        )
+        collection = vectorstore._collection
+
+        for part in manifest["parts"]:
+            with np.load(io.BytesIO(archive.read(part["name"]))) as data:
+                collection.upsert(
+                    ids=_unpack_strings(data["id_data"], data["id_offsets"]),
+                    documents=_unpack_strings(data["text_data"], data["text_offsets"]),
+                    metadatas=[json.loads(meta) for meta in
+                               _unpack_strings(data["meta_data"], data["meta_offsets"])],
+                    embeddings=data["embeddings"].astype(np.float32),
+                )
+            logger.debug(f"  {part['name']}: {part['count']}개 청크 적재")
+
+    # 같은 임베딩 설정의 새 인덱스로 기록 (새 ID, 세대 1)
+    source_metadata = manifest["index_metadata"]
+    save_index_metadata(persist_directory, IndexMetadata(
+        embedding_type=source_metadata["embedding_type"],
+        model_name=source_metadata["model_name"],
+        output_dim=source_metadata.get("output_dim"),
+        generation=1,
+    ))
+
+    logger.info(f"✅ 스냅샷 가져오기 완료: {collection.count()}개 청크, {time.time() - start_time:.1f}초")
+    return manifest
+
+
+def main():
+    """스냅샷 CLI"""
+    parser = argparse.ArgumentParser(description="옵시디언 벡터DB 스냅샷 내보내기/가져오기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="벡터DB를 스냅샷 파일로 내보내기")
+    export_parser.add_argument("db_path", help="벡터DB 경로")
+    export_parser.add_argument("snapshot_path", help="생성할 스냅샷 파일 경로")
+    export_parser.add_argument("--batch-size", type=int, default=2000)
+    export_parser.add_argument("--float16", action="store_true", help="임베딩을 float16으로 저장")
+
+    import_parser = subparsers.add_parser("import", help="스냅샷 파일을 새 벡터DB로 가져오기")
+    import_parser.add_argument("snapshot_path", help="스냅샷 파일 경로")
+    import_parser.add_argument("db_path", help="생성할 벡터DB 경로")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        db = os.path.expanduser(args.db_path)
+        if load_index_metadata(db) is None:
+            # 메타데이터가 없는 이전 인덱스만 현재 임베딩 설정으로 fingerprint를 만들기 위해 VectorDB로 연다
+            from src.vectorstore.vector_db import VectorDB
+            db = VectorDB(db, embedding_type=os.getenv("EMBEDDING_TYPE", "ollama"))
+        export_snapshot(db, args.snapshot_path, batch_size=args.batch_size,
+                        embedding_dtype="float16" if args.float16 else "float32")
+    else:
+        import_snapshot(args.snapshot_path, os.path.expanduser(args.db_path))
+
+
+if __name__ == "__main__":
+    main()
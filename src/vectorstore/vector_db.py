@@ -1,17 +1,87 @@
+import asyncio
 import os
+import shutil
+import threading
+import uuid
 from dotenv import load_dotenv
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
-from typing import List, Dict, Any, Literal
+from langchain_core.documents import Document
+from typing import List, Dict, Any, Literal, Optional, Tuple
 from src.embeddings.kosimcse_embeddings import KoSimCSEEmbeddings
 from src.embeddings.ollama_embeddings import OllamaEmbeddings
-from src.reranking.cross_encoder_reranker import CrossEncoderReranker
+from src.embeddings.admitted_embeddings import AdmittedEmbeddings
+from src.reranking.cross_encoder_reranker import get_shared_reranker
+from src.reranking.cascade import CascadePolicy, CascadeReranker
+from src.vectorstore.quantized_index import QuantizedIndex
+from src.vectorstore.semantic_cache import SemanticQueryCache
+from src.utils.singleflight import SingleFlight
+from src.utils.metrics import metrics
+from src.utils.admission import get_embedding_admission
+from src.vectorstore.index_metadata import (
+    IndexMetadata, embedding_fingerprint, load_index_metadata, save_index_metadata, index_metadata_stamp,
+    directory_size
+)
 from src.logging.logger_factory import LoggerFactory
 
 load_dotenv()
 
 logger = LoggerFactory.get_logger("obsidian_rag.vector_db")
 
+# 검색 거리 척도 (Chroma 컬렉션과 양자화 인덱스가 같은 코사인 거리를 반환하도록 통일)
+DISTANCE_METRIC = "cosine"
+
+
+def replace_index_directory(live_path: str, built_path: str):
+    """
+    새로 만든 인덱스 디렉터리로 기존 인덱스 교체 (기존 인덱스를 연 VectorDB는 먼저 close()해야 함)
+
+    Args:
+        live_path: 서비스 중인 인덱스 경로
+        built_path: 같은 파일 시스템에 새로 만든 인덱스 경로
+    """
+    old_path = f"{live_path}.old-{uuid.uuid4().hex[:8]}"
+    if os.path.exists(live_path):
+        os.rename(live_path, old_path)
+    os.rename(built_path, live_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def embed_queries(embeddings, queries: List[str]) -> List[List[float]]:
+    """쿼리 여러 개 임베딩 (임베딩 클래스가 embed_queries를 지원하면 배치 요청 한 번, 아니면 쿼리별)"""
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(queries)
+    return [embeddings.embed_query(query) for query in queries]
+
+
+def _result_key(doc: Document):
+    meta = doc.metadata
+    return doc.id or meta.get("chunk_id") or (meta.get("id"), meta.get("chunk_index"))
+
+
+def dedupe_result_sets(result_sets: List[List[Tuple[Document, float]]], k: int) -> List[List[Tuple[Document, float]]]:
+    """
+    여러 쿼리 결과에 같은 청크가 있으면 거리가 가장 가까운 쿼리 결과에만 남기고, 각 결과는 상위 k개로 자름
+
+    Args:
+        result_sets: 쿼리별 (문서, 거리) 리스트 (거리 오름차순)
+        k: 쿼리당 결과 수
+
+    Returns:
+        중복 제거된 쿼리별 결과
+    """
+    best: Dict[Any, Tuple[float, int]] = {}
+    for query_index, results in enumerate(result_sets):
+        for doc, distance in results:
+            key = _result_key(doc)
+            if key not in best or distance < best[key][0]:
+                best[key] = (distance, query_index)
+
+    return [
+        [(doc, distance) for doc, distance in results if best[_result_key(doc)][1] == query_index][:k]
+        for query_index, results in enumerate(result_sets)
+    ]
+
 
 class VectorDB:
     """벡터 데이터베이스 관리 클래스"""
@@ -19,7 +89,14 @@ class VectorDB:
     def __init__(self,
                  persist_directory: str = "./chroma_db",
                  embedding_type: str = "ollama",
-                 use_reranking: bool = False):
+                 use_reranking: bool = False,
+                 quantization: Optional[str] = None,
+                 embedding_dim: Optional[int] = None,
+                 embeddings=None,
+                 cascade_policy: Optional[CascadePolicy] = None,
+                 semantic_cache_size: int = 128,
+                 semantic_cache_threshold: Optional[float] = None,
+                 admission_control: bool = True):
         """
         벡터DB 초기화
 
@@ -27,26 +104,76 @@ class VectorDB:
             persist_directory: 벡터DB 저장 경로
             embedding_type: 사용할 임베딩 타입 ("google", "kosimcse", "ollama")
             use_reranking: Cross-encoder 리랭킹 사용 여부
+            quantization: 1차 후보 탐색용 양자화 방식 (None, "int8", "binary")
+            embedding_dim: 임베딩 출력 차원 (ollama 전용, None이면 인덱스에 기록된 값 또는 전체 차원)
+            embeddings: 공유할 임베딩 인스턴스 (여러 샤드가 하나의 모델을 같이 쓸 때)
+            cascade_policy: 지정 시 search_with_reranking이 적응형 캐스케이드 리랭킹을 사용
+            semantic_cache_size: 의미 캐시에 보관할 최근 쿼리 수
+            semantic_cache_threshold: 이전 쿼리 결과를 재사용할 최소 코사인 유사도 (기본 None: 의미 캐시 사용 안 함, 켤 때만 지정)
+            admission_control: 임베딩 백엔드 호출을 프로세스 공유 허용 제어에 통과시킬지 여부
+                               (쿼리 임베딩이 인덱싱 문서 임베딩보다 먼저 실행됨)
         """
         self.persist_directory = persist_directory
         self.embedding_type = embedding_type
         self.use_reranking = use_reranking
-        self.embeddings = self._create_embeddings()
+        # 인덱스 메타데이터/양자화 인덱스 갱신 보호 (여러 배치가 동시에 저장할 수 있음)
+        self._write_lock = threading.Lock()
+
+        # 인덱스 메타데이터 확인 (차원 미지정 시 인덱스에 기록된 차원을 따름)
+        self._metadata_stamp = index_metadata_stamp(persist_directory)
+        self.index_metadata = load_index_metadata(persist_directory)
+        if (embedding_dim is None and self.index_metadata is not None
+                and self.index_metadata.embedding_type == embedding_type):
+            embedding_dim = self.index_metadata.output_dim
+        self.embedding_dim = embedding_dim
+
+        embeddings = embeddings if embeddings is not None else self._create_embeddings()
+        if admission_control:
+            if hasattr(embeddings, "admission"):
+                # 백엔드 요청마다 자리를 받는 임베딩 (쿼리 묶음 대기 중에는 자리를 점유하지 않음)
+                if embeddings.admission is None:
+                    embeddings.admission = get_embedding_admission()
+            else:
+                embeddings = AdmittedEmbeddings(embeddings, get_embedding_admission())
+        self.embeddings = embeddings
         self.vectorstore = self._create_vectorstore()
+        self._check_index_metadata()
 
         # 리랭커 초기화 (지연 로딩)
         self.reranker = None
+        self.cascade = None
+        self.cascade_policy = cascade_policy
         if use_reranking:
             self._init_reranker()
 
+        # 같은 쿼리/k의 동시 검색은 한 번만 실행
+        self._search_flight = SingleFlight("vector_search")
+
+        # index_stats의 청크/노트 수, 디스크 사용량 (인덱스 버전, 값)
+        self._stats_cache: Optional[Tuple[str, Dict[str, int]]] = None
+
+        # 근사 중복 쿼리 캐시 (선택)
+        self.semantic_cache = None
+        if semantic_cache_threshold is not None and semantic_cache_size > 0:
+            self.semantic_cache = SemanticQueryCache(semantic_cache_size, semantic_cache_threshold)
+
+        # 양자화 인덱스 (선택)
+        self.quantized_index = None
+        if quantization:
+            self._init_quantized_index(quantization)
+
     def _create_embeddings(self):
         """임베딩 인스턴스 생성"""
+        if self.embedding_dim is not None and self.embedding_type != "ollama":
+            logger.warning(f"⚠️ 차원 축소는 ollama 임베딩에서만 지원합니다. embedding_dim={self.embedding_dim} 무시")
+            self.embedding_dim = None
+
         if self.embedding_type == "kosimcse":
             logger.info("🇰🇷 한국어 특화 KoSimCSE 임베딩을 사용합니다")
             return KoSimCSEEmbeddings()
         elif self.embedding_type == "ollama":
             logger.info("🤖 Ollama Qwen3-Embedding-8B 임베딩을 사용합니다")
-            return OllamaEmbeddings()
+            return OllamaEmbeddings(output_dim=self.embedding_dim)
         else:  # default: google
             logger.info("🌍 Google Generative AI 임베딩을 사용합니다")
             return GoogleGenerativeAIEmbeddings(
@@ -54,23 +181,186 @@ class VectorDB:
                 google_api_key=os.getenv("GOOGLE_API_KEY")
             )
 
+    def _check_index_metadata(self):
+        """인덱스를 만든 임베딩 설정과 현재 설정이 같은지 확인"""
+        if self.index_metadata is None:
+            self._check_stored_dimension()
+            return
+
+        current = embedding_fingerprint(self.embedding_type, self.embeddings)
+        if self.index_metadata.fingerprint() != current:
+            raise ValueError(
+                f"인덱스 임베딩 설정 불일치: 인덱스={self.index_metadata.fingerprint()}, 현재={current}. "
+                f"벡터DB를 새로고침하거나 같은 설정을 사용하세요."
+            )
+
+    def _check_stored_dimension(self):
+        """메타데이터 없이 만들어진 기존 인덱스: 차원 축소 설정과 저장된 벡터 차원 비교"""
+        if self.embedding_dim is None:
+            return
+        stored = self.vectorstore._collection.get(limit=1, include=["embeddings"])["embeddings"]
+        if stored is None or len(stored) == 0:
+            return
+
+        stored_dim = len(stored[0])
+        if stored_dim != self.embedding_dim:
+            raise ValueError(
+                f"인덱스 임베딩 차원 불일치: 저장된 벡터={stored_dim}, EMBEDDING_DIM={self.embedding_dim}. "
+                f"벡터DB를 새로고침하거나 같은 설정을 사용하세요."
+            )
+
+    def _sync_index_metadata(self):
+        """같은 경로를 쓰는 다른 인스턴스/프로세스가 인덱스를 갱신했으면 메타데이터 다시 읽기"""
+        stamp = index_metadata_stamp(self.persist_directory)
+        if stamp != self._metadata_stamp:
+            self._metadata_stamp = stamp
+            self.index_metadata = load_index_metadata(self.persist_directory)
+
+    def _bump_generation(self):
+        """인덱스 변경 기록 (첫 저장 시 메타데이터 생성, 이후 세대 번호 증가)"""
+        self._sync_index_metadata()
+        if self.index_metadata is None:
+            self.index_metadata = IndexMetadata(**embedding_fingerprint(self.embedding_type, self.embeddings),
+                                                distance_metric=self.distance_metric)
+            logger.info(f"📝 인덱스 메타데이터 기록: {self.index_metadata.fingerprint()}")
+
+        self.index_metadata.generation += 1
+        save_index_metadata(self.persist_directory, self.index_metadata)
+        self._metadata_stamp = index_metadata_stamp(self.persist_directory)
+
+    @property
+    def generation(self) -> int:
+        """인덱스 세대 번호 (문서가 추가/삭제될 때마다 증가)"""
+        self._sync_index_metadata()
+        return self.index_metadata.generation if self.index_metadata is not None else 0
+
+    @property
+    def index_version(self) -> str:
+        """인덱스 버전 문자열 (재생성 시 ID가 바뀌므로 세대 번호만으로는 구분 안 되는 경우까지 포함)"""
+        self._sync_index_metadata()
+        return self.index_metadata.version if self.index_metadata is not None else "empty"
+
+    def get_chunk(self, source: str, chunk_index: int) -> Optional[Document]:
+        """노트 파일 경로와 청크 번호(0부터)로 저장된 청크 조회 (없으면 None)"""
+        fetched = self.vectorstore._collection.get(
+            where={"$and": [{"source": source}, {"chunk_index": chunk_index}]},
+            limit=1, include=["documents", "metadatas"],
+        )
+        if not fetched["ids"]:
+            return None
+        return Document(page_content=fetched["documents"][0] or "", metadata=fetched["metadatas"][0] or {},
+                        id=fetched["ids"][0])
+
+    def index_stats(self) -> Dict[str, Any]:
+        """
+        청크 수, 노트 수(첫 청크 기준), 인덱스 세대/버전, 디스크 사용량
+        노트 수 조회와 디스크 사용량 계산은 무거우므로 인덱스 버전이 바뀔 때만 다시 계산한다.
+        """
+        version = self.index_version
+        cached = self._stats_cache
+        if cached is None or cached[0] != version:
+            collection = self.vectorstore._collection
+            counts = {
+                "chunks": collection.count(),
+                "notes": len(collection.get(where={"chunk_index": 0}, include=[])["ids"]),
+                "disk_bytes": directory_size(self.persist_directory),
+            }
+            cached = self._stats_cache = (version, counts)
+
+        return {
+            "chunks": cached[1]["chunks"],
+            "notes": cached[1]["notes"],
+            "generation": self.generation,
+            "index_version": version,
+            "disk_bytes": cached[1]["disk_bytes"],
+        }
+
+    def close(self):
+        """Chroma 클라이언트와 양자화 인덱스 파일 연결 해제 (인덱스 디렉터리를 지우거나 교체하기 전에 호출)"""
+        client = getattr(self.vectorstore, "_client", None)
+        if client is not None:
+            try:
+                # chromadb는 경로별 시스템을 클래스 캐시에 공유하므로, 캐시에서 빼고 정지해야 같은 경로를 새로 열 수 있음
+                registry = getattr(type(client), "_identifier_to_system", None)
+                if isinstance(registry, dict):
+                    registry.pop(getattr(client, "_identifier", None), None)
+                system = getattr(client, "_system", None)
+                if system is not None:
+                    system.stop()
+            except Exception as e:
+                logger.warning(f"⚠️ Chroma 클라이언트 종료 실패 ({self.persist_directory}): {e}")
+        if self.quantized_index is not None:
+            self.quantized_index.close()
+        logger.info(f"🔒 벡터DB 닫기: {self.persist_directory}")
+
+    def semantic_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """의미 캐시 적중률 등 통계 (비활성화 시 None)"""
+        return self.semantic_cache.stats() if self.semantic_cache is not None else None
+
     def _create_vectorstore(self):
+        # 새 컬렉션은 양자화 인덱스와 같은 코사인 거리 사용 (기존 컬렉션은 만들 때의 척도를 유지)
         return Chroma(
-            persist_directory=self.persist_directory, embedding_function=self.embeddings
+            persist_directory=self.persist_directory, embedding_function=self.embeddings,
+            collection_metadata={"hnsw:space": DISTANCE_METRIC}
         )
 
+    @property
+    def distance_metric(self) -> str:
+        """Chroma 컬렉션의 실제 거리 척도 (cosine, 이전 버전에서 만든 컬렉션은 l2)"""
+        return (self.vectorstore._collection.metadata or {}).get("hnsw:space", "l2")
+
     def _init_reranker(self):
         """리랭커 초기화"""
         try:
             logger.info("Cross-encoder 리랭커 초기화 중...")
-            self.reranker = CrossEncoderReranker()
+            self.reranker = get_shared_reranker()
+            if self.cascade_policy is not None:
+                self.cascade = CascadeReranker(self.reranker, self.cascade_policy)
             logger.info("✅ 리랭커 초기화 완료")
         except Exception as e:
             logger.warning(f"⚠️ 리랭커 초기화 실패: {e}")
             self.use_reranking = False
 
-    def add_documents(self, documents: List[Dict[str, Any]]):
-        """문서 추가"""
+    def _init_quantized_index(self, quantization: str):
+        """양자화 인덱스 초기화 (비어 있으면 Chroma 임베딩으로 재구축)"""
+        if self.distance_metric != DISTANCE_METRIC:
+            # 양자화 인덱스는 코사인 거리라서 l2 컬렉션과 섞으면 경로마다 점수 척도가 달라짐
+            logger.warning(f"⚠️ 양자화 인덱스는 {DISTANCE_METRIC} 컬렉션에서만 사용합니다 "
+                           f"(현재 {self.distance_metric}). 벡터DB를 새로고침하면 {DISTANCE_METRIC}로 다시 만들어집니다.")
+            return
+
+        index_dir = os.path.join(self.persist_directory, f"quantized_{quantization}")
+        self.quantized_index = QuantizedIndex(index_dir, quantization=quantization)
+        logger.info(f"🗜️ 양자화 인덱스 사용: {quantization}")
+
+        if self.quantized_index.size == 0 and self.vectorstore._collection.count() > 0:
+            self.rebuild_quantized_index()
+
+    def rebuild_quantized_index(self, batch_size: int = 1000):
+        """Chroma에 저장된 임베딩으로 양자화 인덱스 재구축 (모델 호출 없음)"""
+        if self.quantized_index is None:
+            raise ValueError("양자화가 비활성화되어 있습니다")
+
+        collection = self.vectorstore._collection
+        total = collection.count()
+        logger.info(f"🗜️ 양자화 인덱스 재구축 중... ({total}개 벡터)")
+
+        self.quantized_index.clear()
+        for offset in range(0, total, batch_size):
+            batch = collection.get(limit=batch_size, offset=offset, include=["embeddings"])
+            self.quantized_index.add(batch["ids"], batch["embeddings"])
+        self.quantized_index.save()
+
+        logger.info(f"✅ 양자화 인덱스 재구축 완료: {self.quantized_index.size}개 벡터")
+
+    def add_documents(self, documents: List[Dict[str, Any]], ids: Optional[List[str]] = None):
+        """
+        문서 추가
+
+        Args:
+            documents: {"content", "metadata"} 딕셔너리 리스트
+            ids: 청크 ID (지정 시 같은 ID는 덮어쓰므로 재실행해도 중복이 생기지 않음, 미지정 시 UUID)
+        """
         if not documents:
             logger.warning("추가할 문서가 없습니다")
             return
@@ -78,18 +368,70 @@ class VectorDB:
         logger.info(f"📝 {len(documents)}개 문서를 벡터DB에 추가 중...")
         texts = [doc["content"] for doc in documents]
         metadatas = [doc["metadata"] for doc in documents]
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in documents]
 
         try:
-            self.vectorstore.add_texts(texts, metadatas=metadatas)
+            if self.quantized_index is not None:
+                # 양자화 인덱스에도 같은 임베딩을 넣기 위해 직접 임베딩 후 저장
+                embeddings = self.embeddings.embed_documents(texts)
+                self.vectorstore._collection.upsert(
+                    ids=ids, embeddings=embeddings, metadatas=metadatas, documents=texts
+                )
+                with self._write_lock:
+                    self.quantized_index.add(ids, embeddings)
+                    self.quantized_index.save()
+            else:
+                self.vectorstore.add_texts(texts, metadatas=metadatas, ids=ids)
+
+            with self._write_lock:
+                self._bump_generation()
             logger.info(f"✅ {len(documents)}개 문서 벡터DB에 저장 완료!")
         except Exception as e:
             logger.error(f"문서 저장 실패: {e}", exc_info=True)
             raise
 
+    def delete_documents(self, doc_ids: List[str], keep_ids: Optional[List[str]] = None) -> int:
+        """
+        원본 문서(노트) ID에 속한 청크 삭제
+
+        Args:
+            doc_ids: 문서 ID 리스트 (청크 메타데이터의 id, 볼트 기준 상대 경로)
+            keep_ids: 남겨 둘 청크 ID (방금 upsert한 새 청크, 나머지 이전 청크만 삭제)
+
+        Returns:
+            삭제된 청크 수
+        """
+        if not doc_ids:
+            return 0
+
+        collection = self.vectorstore._collection
+        where = {"id": doc_ids[0]} if len(doc_ids) == 1 else {"id": {"$in": list(doc_ids)}}
+        chunk_ids = collection.get(where=where, include=[])["ids"]
+        if keep_ids:
+            keep = set(keep_ids)
+            chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id not in keep]
+        if not chunk_ids:
+            return 0
+
+        collection.delete(ids=chunk_ids)
+        with self._write_lock:
+            if self.quantized_index is not None:
+                self.quantized_index.remove(chunk_ids)
+                self.quantized_index.save()
+            self._bump_generation()
+
+        logger.info(f"🗑️ 문서 {len(doc_ids)}개의 청크 {len(chunk_ids)}개 삭제")
+        return len(chunk_ids)
+
+    def delete_document(self, doc_id: str) -> int:
+        """원본 문서(노트) 하나의 청크 모두 삭제"""
+        return self.delete_documents([doc_id])
+
     def search(self, query: str, k: int = 5):
         """검색"""
         logger.debug(f"🔍 검색 실행: '{query}' (결과 수: {k})")
-        results = self.vectorstore.similarity_search(query, k=k)
+        results = [doc for doc, _ in self.search_by_vector_with_score(self.embeddings.embed_query(query), k)]
         logger.info(f"✅ 검색 완료: {len(results)}개 결과 반환")
 
         # 결과 상세 로깅
@@ -100,9 +442,11 @@ class VectorDB:
         return results
 
     def search_with_score(self, query: str, k: int = 5):
-        """점수 포함 검색"""
+        """점수 포함 검색 (같은 쿼리/k의 검색이 이미 진행 중이면 그 결과를 함께 받음)"""
         logger.debug(f"🔍 점수 포함 검색 실행: '{query}' (결과 수: {k})")
-        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        results = self._search_flight.do(
+            (query, k), lambda: self.search_by_vector_with_score(self.embeddings.embed_query(query), k)
+        )
         logger.info(f"✅ 점수 포함 검색 완료: {len(results)}개 결과 반환")
 
         # 결과 상세 로깅 (점수 포함)
@@ -113,26 +457,162 @@ class VectorDB:
 
         return results
 
+    def search_by_vector_with_score(self, embedding: List[float], k: int = 5) -> List[Tuple[Document, float]]:
+        """이미 계산된 쿼리 임베딩으로 점수 포함 검색 (거리 오름차순, 근사 중복 쿼리는 의미 캐시에서 반환)"""
+        if self.semantic_cache is None:
+            return self._search_by_vector(embedding, k)
+
+        version = self.index_version
+        cached = self.semantic_cache.lookup(embedding, k, "vector", version)
+        if cached is not None:
+            logger.debug(f"⚡ 의미 캐시 적중 (결과 수: {k})")
+            return cached
+
+        results = self._search_by_vector(embedding, k)
+        self.semantic_cache.store(embedding, k, "vector", version, results)
+        return results
+
+    def _search_by_vector(self, embedding: List[float], k: int) -> List[Tuple[Document, float]]:
+        with metrics.timed("stage.ann"):
+            if self.quantized_index is not None:
+                return self._quantized_search_by_vector(embedding, k)
+            return self.vectorstore.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+
+    def search_many(self, queries: List[str], k: int = 5, dedupe: bool = False) -> List[List[Tuple[Document, float]]]:
+        """
+        쿼리 여러 개를 한 번에 검색 (임베딩은 배치 요청 한 번, ANN 조회도 한 번에)
+
+        Args:
+            queries: 검색 쿼리 리스트
+            k: 쿼리당 결과 수
+            dedupe: 여러 쿼리 결과에 나온 같은 청크를 가장 가까운 쿼리 결과에만 남길지 여부
+                    (빠진 자리는 각 쿼리의 다음 후보로 채우기 위해 후보를 2배로 가져옴)
+
+        Returns:
+            쿼리 순서대로의 (문서, 거리) 리스트
+        """
+        if not queries:
+            return []
+
+        logger.debug(f"🔍 다중 검색 실행: 쿼리 {len(queries)}개 (결과 수: {k}, 중복 제거: {dedupe})")
+        fetch_k = k * 2 if dedupe else k
+        result_sets = self.search_many_by_vectors(embed_queries(self.embeddings, queries), fetch_k)
+        if dedupe:
+            result_sets = dedupe_result_sets(result_sets, k)
+        logger.info(f"✅ 다중 검색 완료: 쿼리 {len(queries)}개, 결과 {sum(len(r) for r in result_sets)}개")
+        return result_sets
+
+    def search_many_by_vectors(self, embeddings: List[List[float]], k: int) -> List[List[Tuple[Document, float]]]:
+        """쿼리 임베딩 여러 개로 검색 (의미 캐시에 없는 쿼리만 모아서 ANN 조회 한 번)"""
+        version = self.index_version
+        result_sets: List[Any] = [None] * len(embeddings)
+        if self.semantic_cache is not None:
+            for i, embedding in enumerate(embeddings):
+                result_sets[i] = self.semantic_cache.lookup(embedding, k, "vector", version)
+
+        missing = [i for i, results in enumerate(result_sets) if results is None]
+        if missing:
+            with metrics.timed("stage.ann"):
+                if self.quantized_index is not None:
+                    fetched = self._quantized_search_many([embeddings[i] for i in missing], k)
+                else:
+                    fetched = self._query_collection([embeddings[i] for i in missing], k)
+            for i, results in zip(missing, fetched):
+                result_sets[i] = results
+                if self.semantic_cache is not None:
+                    self.semantic_cache.store(embeddings[i], k, "vector", version, results)
+        return result_sets
+
+    def _query_collection(self, embeddings: List[List[float]], k: int) -> List[List[Tuple[Document, float]]]:
+        """Chroma 컬렉션에 쿼리 임베딩 여러 개를 한 번에 조회"""
+        response = self.vectorstore._collection.query(
+            query_embeddings=embeddings, n_results=k, include=["documents", "metadatas", "distances"]
+        )
+        return [
+            [(Document(page_content=text or "", metadata=metadata or {}, id=doc_id), distance)
+             for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)]
+            for ids, texts, metadatas, distances in zip(
+                response["ids"], response["documents"], response["metadatas"], response["distances"]
+            )
+        ]
+
+    async def asearch_with_score(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """
+        비동기 점수 포함 검색
+        쿼리 임베딩은 aembed_query로, 로컬 Chroma/양자화 인덱스 조회는 워커 스레드에서 실행해 이벤트 루프를 막지 않음
+        (같은 쿼리/k의 검색이 이미 진행 중이면 그 결과를 함께 받음)
+        """
+        logger.debug(f"🔍 비동기 점수 포함 검색 실행: '{query}' (결과 수: {k})")
+        async def search() -> List[Tuple[Document, float]]:
+            embedding = await self.embeddings.aembed_query(query)
+            return await asyncio.to_thread(self.search_by_vector_with_score, embedding, k)
+
+        results = await self._search_flight.ado((query, k), search)
+        logger.info(f"✅ 비동기 점수 포함 검색 완료: {len(results)}개 결과 반환")
+        return results
+
+    def _quantized_search_by_vector(self, embedding: List[float], k: int) -> List[Tuple[Document, float]]:
+        """양자화 인덱스 검색 후 Chroma에서 문서 조회"""
+        return self._quantized_search_many([embedding], k)[0]
+
+    def _quantized_search_many(self, embeddings: List[List[float]], k: int) -> List[List[Tuple[Document, float]]]:
+        """쿼리별 양자화 인덱스 검색 후 전체 결과의 문서를 Chroma에서 한 번에 조회"""
+        hit_sets = [self.quantized_index.search(embedding, k=k) for embedding in embeddings]
+        ids = list(dict.fromkeys(doc_id for hits in hit_sets for doc_id, _ in hits))
+        if not ids:
+            return [[] for _ in hit_sets]
+
+        fetched = self.vectorstore._collection.get(ids=ids, include=["documents", "metadatas"])
+        documents = {
+            doc_id: Document(page_content=text, metadata=metadata or {}, id=doc_id)
+            for doc_id, text, metadata in zip(fetched["ids"], fetched["documents"], fetched["metadatas"])
+        }
+        return [
+            [(documents[doc_id], distance) for doc_id, distance in hits if doc_id in documents]
+            for hits in hit_sets
+        ]
+
+    def quantization_report(self, queries: List[str], k: int = 10) -> Dict[str, Any]:
+        """
+        양자화 인덱스의 메모리 절감량과 비압축 전수 탐색 대비 recall 손실 리포트
+
+        Args:
+            queries: 평가용 쿼리 리스트
+            k: recall@k 의 k
+
+        Returns:
+            메모리 사용량 및 recall 지표 딕셔너리
+        """
+        if self.quantized_index is None:
+            raise ValueError("양자화가 비활성화되어 있습니다")
+
+        query_embeddings = [self.embeddings.embed_query(query) for query in queries]
+        report = {
+            **self.quantized_index.memory_report(),
+            **self.quantized_index.evaluate_recall(query_embeddings, k=k),
+        }
+        logger.info(
+            f"📊 양자화 리포트: RAM {report['float32_ram_bytes']:,} → {report['quantized_ram_bytes']:,} bytes "
+            f"(절감 {report['ram_saving_ratio']:.1%}), recall@{k} {report['rescored_recall']:.3f}"
+        )
+        return report
+
     def search_with_reranking(self, query: str, k: int = 5, candidate_k: int = 20):
         """리랭킹 포함 검색"""
         if not self.use_reranking or self.reranker is None:
             logger.warning("⚠️ 리랭킹이 비활성화되어 있습니다. 일반 검색을 수행합니다.")
             return self.search(query, k)
 
-        logger.info(f"🔍 하이브리드 검색 시작: '{query}' (후보: {candidate_k}, 최종: {k})")
+        if self.cascade is not None:
+            return [doc for doc, _ in self._cascade_rerank(query, k, candidate_k)]
 
-        # 1단계: bi-encoder로 후보 추림
-        logger.debug(f"🔍 1단계: bi-encoder로 상위 {candidate_k}개 후보 검색")
-        candidates = self.search(query, k=candidate_k)
+        logger.info(f"🔍 하이브리드 검색 시작: '{query}' (후보: {candidate_k}, 최종: {k})")
 
-        if not candidates:
+        reranked = self._rerank_search(query, k, candidate_k)
+        if not reranked:
             logger.info("검색 결과가 없습니다")
             return []
 
-        # 2단계: cross-encoder로 리랭킹
-        logger.debug(f"🎯 2단계: cross-encoder로 상위 {k}개 리랭킹")
-        reranked = self.reranker.rerank(query, candidates, top_k=k)
-
         logger.info(f"✅ 하이브리드 검색 완료: {len(reranked)}개 결과")
 
         # 리랭킹 결과 상세 로깅
@@ -150,13 +630,64 @@ class VectorDB:
             print("⚠️ 리랭킹이 비활성화되어 있습니다. 일반 검색을 수행합니다.")
             return [(doc, score) for doc, score in self.search_with_score(query, k)]
 
-        # 1단계: bi-encoder로 후보 추림
-        print(f"🔍 1단계: bi-encoder로 상위 {candidate_k}개 후보 검색")
-        candidates = self.search(query, k=candidate_k)
+        if self.cascade is not None:
+            return self._cascade_rerank(query, k, candidate_k)
+
+        return self._rerank_search(query, k, candidate_k)
 
+    def _rerank_search(self, query: str, k: int, candidate_k: int) -> List[Tuple[Document, float]]:
+        """bi-encoder 후보 검색 + cross-encoder 리랭킹 (근사 중복 쿼리는 리랭킹 결과까지 의미 캐시에서 반환)"""
+        embedding = self.embeddings.embed_query(query)
+        kind = f"rerank:{candidate_k}"
+        version = self.index_version
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.lookup(embedding, k, kind, version)
+            if cached is not None:
+                logger.debug(f"⚡ 의미 캐시 적중 (리랭킹 결과 {k}개)")
+                return cached
+
+        # 1단계: bi-encoder로 후보 추림
+        logger.debug(f"🔍 1단계: bi-encoder로 상위 {candidate_k}개 후보 검색")
+        candidates = [doc for doc, _ in self.search_by_vector_with_score(embedding, candidate_k)]
         if not candidates:
             return []
 
         # 2단계: cross-encoder로 리랭킹 (점수 포함)
-        print(f"🎯 2단계: cross-encoder로 상위 {k}개 리랭킹")
-        return self.reranker.rerank(query, candidates, top_k=k)
+        logger.debug(f"🎯 2단계: cross-encoder로 상위 {k}개 리랭킹")
+        reranked = self.reranker.rerank(query, candidates, top_k=k)
+        if self.semantic_cache is not None:
+            self.semantic_cache.store(embedding, k, kind, version, reranked)
+        return reranked
+
+    def _cascade_rerank(self, query: str, k: int, candidate_k: int) -> List[Tuple[Document, float]]:
+        """캐스케이드 리랭킹: 후보를 넉넉히 가져온 뒤 점수 분포에 따라 리랭킹 범위를 결정"""
+        fetch_k = max(candidate_k, self.cascade.policy.max_candidates)
+        candidates = self.search_with_score(query, k=fetch_k)
+        if not candidates:
+            return []
+
+        results, path = self.cascade.rerank(query, candidates, k=k, candidate_k=candidate_k)
+        logger.info(f"✅ 캐스케이드 검색 완료: {len(results)}개 결과 (경로: {path})")
+        return results
+
+
+# 프로세스 내 공유 벡터DB (경로/설정별 1개, 그래프 노드가 실행/배치마다 새로 열지 않도록)
+_shared_vector_dbs: Dict[Tuple, VectorDB] = {}
+_shared_lock = threading.Lock()
+
+
+def get_vectordb(persist_directory: str, embedding_type: str = "ollama", **kwargs) -> VectorDB:
+    """
+    경로와 설정이 같은 VectorDB 인스턴스를 재사용
+
+    Args:
+        persist_directory: 벡터DB 저장 경로
+        embedding_type: 임베딩 타입
+        **kwargs: VectorDB 생성자 추가 인자 (use_reranking, quantization 등)
+    """
+    key = (os.path.abspath(persist_directory), embedding_type, tuple(sorted(kwargs.items())))
+    with _shared_lock:
+        vector_db = _shared_vector_dbs.get(key)
+        if vector_db is None:
+            vector_db = _shared_vector_dbs[key] = VectorDB(persist_directory, embedding_type=embedding_type, **kwargs)
+        return vector_db
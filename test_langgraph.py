@@ -15,7 +15,8 @@ def test_indexing():
         config={
             "db_path": "./obsidian_vectordb",
             "chunk_size": 1000,
-            "chunk_overlap": 200
+            "chunk_overlap": 200,
+            "batch_size": 50
         }
     )
 
@@ -23,8 +24,8 @@ def test_indexing():
         print(f"❌ 에러 발생: {result['error']}")
         return False
     else:
-        print(f"✅ 문서 읽기 완료: {len(result['documents'])}개")
-        print(f"✅ 청크 생성 완료: {len(result['chunks'])}개")
+        print(f"✅ 문서 읽기 완료: {result['total_documents']}개")
+        print(f"✅ 청크 생성 완료: {result['total_chunks']}개 (배치 {len(result['completed_batches'])}/{result['pending_batches']}개, 건너뛴 파일 {result['skipped_files']}개)")
         print(f"✅ 벡터DB 저장 완료")
         return True
 
@@ -0,0 +1,107 @@
+"""AdmissionController 우선순위 허용 순서, 대량 요청 한도, 부하 거절 테스트"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.utils.admission import BULK, INTERACTIVE, AdmissionController, AdmissionRejected
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "조건 대기 시간 초과"
+        time.sleep(0.005)
+
+
+def test_bulk_limit_leaves_a_slot_for_queries():
+    admission = AdmissionController("test", max_in_flight=2)
+    assert admission.max_bulk_in_flight == 1
+
+    admission.acquire(BULK)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        admission.acquire(BULK, timeout=0.05)
+    assert excinfo.value.reason == "timeout"
+
+    admission.acquire(INTERACTIVE, timeout=0.05)
+    assert admission.stats()["in_flight"] == 2
+
+
+def test_interactive_waiter_is_admitted_before_earlier_bulk_waiter():
+    admission = AdmissionController("test", max_in_flight=1)
+    admission.acquire(INTERACTIVE)
+    order = []
+
+    def waiter(priority, label):
+        with admission.slot(priority, timeout=2.0):
+            order.append(label)
+
+    bulk = threading.Thread(target=waiter, args=(BULK, "bulk"))
+    bulk.start()
+    _wait_until(lambda: admission.queued[BULK] == 1)
+    query = threading.Thread(target=waiter, args=(INTERACTIVE, "query"))
+    query.start()
+    _wait_until(lambda: admission.queued[INTERACTIVE] == 1)
+
+    admission.release(INTERACTIVE)
+    bulk.join(2.0)
+    query.join(2.0)
+
+    assert order == ["query", "bulk"]
+    assert admission.in_flight == 0
+
+
+def test_full_queue_rejects_without_waiting():
+    admission = AdmissionController("test", max_in_flight=1, max_queue_depth=1)
+    admission.acquire(INTERACTIVE)
+    errors = []
+
+    def queued_bulk():
+        try:
+            admission.acquire(BULK, timeout=0.3)
+        except AdmissionRejected as e:
+            errors.append(e.reason)
+
+    queued = threading.Thread(target=queued_bulk)
+    queued.start()
+    _wait_until(lambda: admission.queued[BULK] == 1)
+
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected) as excinfo:
+        admission.acquire(INTERACTIVE, timeout=5.0)
+    assert excinfo.value.reason == "queue_full"
+    assert time.monotonic() - started < 0.2
+
+    queued.join(2.0)
+    assert errors == ["timeout"]
+    assert admission.stats()["rejected"] == {"queue_full": 1, "timeout": 1}
+
+
+def test_async_waiter_timeout_and_cancellation_free_the_queue():
+    admission = AdmissionController("test", max_in_flight=1)
+
+    async def scenario():
+        await admission.aacquire(INTERACTIVE)
+        with pytest.raises(AdmissionRejected):
+            await admission.aacquire(INTERACTIVE, timeout=0.05)
+
+        task = asyncio.create_task(admission.aacquire(BULK, timeout=5.0))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert admission.queued == {INTERACTIVE: 0, BULK: 0}
+
+        admission.release(INTERACTIVE)
+        async with admission.aslot(BULK):
+            assert admission.bulk_in_flight == 1
+
+    asyncio.run(scenario())
+    assert admission.in_flight == 0
+
+
+@pytest.mark.parametrize("max_bulk_in_flight", [0, 3])
+def test_bulk_limit_must_fit_in_total_limit(max_bulk_in_flight):
+    with pytest.raises(ValueError):
+        AdmissionController("test", max_in_flight=2, max_bulk_in_flight=max_bulk_in_flight)
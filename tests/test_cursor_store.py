@@ -0,0 +1,61 @@
+"""CursorStore 페이지 이동, 목록 스냅샷, 만료/LRU 제거 테스트"""
+import time
+
+import pytest
+
+from src.utils.cursor_store import CursorExpiredError, CursorStore
+
+
+def test_pages_walk_the_stored_list_until_the_end():
+    store = CursorStore()
+    cursor = store.create(list(range(7)), offset=3, page_size=3, kind="search", index_version="v1")
+
+    page = store.resolve(cursor)
+    assert page.items == [3, 4, 5]
+    assert page.total == 7
+    assert page.context == {"kind": "search", "index_version": "v1"}
+
+    last = store.resolve(page.next_cursor)
+    assert last.items == [6]
+    assert last.next_cursor is None
+
+
+def test_no_cursor_when_nothing_is_left():
+    assert CursorStore().create([1, 2], offset=2, page_size=2) is None
+
+
+def test_pages_come_from_a_snapshot_of_the_list():
+    store = CursorStore()
+    items = ["a", "b", "c", "d"]
+    cursor = store.create(items, offset=2, page_size=2)
+    # 첫 페이지를 만든 뒤 원본 목록(또는 인덱스)이 바뀌어도 다음 페이지는 첫 검색의 순위를 따름
+    items.clear()
+
+    assert store.resolve(cursor).items == ["c", "d"]
+
+
+def test_expired_cursor_raises():
+    store = CursorStore(ttl_seconds=0.05)
+    cursor = store.create([1, 2, 3], offset=1, page_size=1)
+    time.sleep(0.1)
+
+    with pytest.raises(CursorExpiredError):
+        store.resolve(cursor)
+    assert len(store) == 0
+
+
+def test_least_recently_used_list_is_evicted():
+    store = CursorStore(max_entries=2)
+    first = store.create([1, 2], offset=1, page_size=1)
+    second = store.create([3, 4], offset=1, page_size=1)
+    store.resolve(first)  # first를 최근 사용으로
+    store.create([5, 6], offset=1, page_size=1)
+
+    assert store.resolve(first).items == [2]
+    with pytest.raises(CursorExpiredError):
+        store.resolve(second)
+
+
+def test_malformed_cursor_raises():
+    with pytest.raises(CursorExpiredError):
+        CursorStore().resolve("not-a-cursor")
@@ -0,0 +1,67 @@
+"""IndexingCheckpoint 배치 커서 전진과 이어서 인덱싱(resume) 테스트"""
+from src.vectorstore.indexing_checkpoint import (
+    IndexingCheckpoint, clear_checkpoint, load_checkpoint, manifest_hash, save_checkpoint,
+)
+
+FINGERPRINT = {"embedding_type": "ollama", "model_name": "test", "output_dim": None}
+
+
+def test_cursor_advances_only_over_contiguous_batches():
+    checkpoint = IndexingCheckpoint(fingerprint=FINGERPRINT)
+    checkpoint.start_manifest("m1", batch_size=2, total_batches=4)
+
+    checkpoint.mark_batch(1, {"b.md": 2.0})
+    assert checkpoint.batch_cursor == 0
+    assert checkpoint.completed_batches == [1]
+
+    checkpoint.mark_batch(0, {"a.md": 1.0})
+    assert checkpoint.batch_cursor == 2
+    assert checkpoint.completed_batches == []
+
+
+def test_resume_from_saved_checkpoint(tmp_path):
+    checkpoint = IndexingCheckpoint(fingerprint=FINGERPRINT)
+    manifest = manifest_hash(["a.md", "b.md", "c.md"])
+    checkpoint.start_manifest(manifest, batch_size=1, total_batches=3)
+    checkpoint.mark_batch(0, {"a.md": 1.0})
+    checkpoint.mark_batch(2, {"c.md": 3.0})
+    save_checkpoint(str(tmp_path), checkpoint)
+
+    # 중단 후 같은 매니페스트로 다시 시작하면 커서와 먼저 끝난 배치가 유지됨
+    resumed = load_checkpoint(str(tmp_path))
+    resumed.start_manifest(manifest, batch_size=1, total_batches=3)
+
+    assert resumed.batch_cursor == 1
+    assert resumed.completed_batches == [2]
+    assert resumed.is_note_done("a.md", 1.0)
+    assert not resumed.is_note_done("b.md", 2.0)
+
+    resumed.mark_batch(1, {"b.md": 2.0})
+    assert resumed.batch_cursor == 3
+
+
+def test_changed_note_is_not_considered_done():
+    checkpoint = IndexingCheckpoint(fingerprint=FINGERPRINT)
+    checkpoint.mark_batch(0, {"a.md": 1.0})
+
+    assert checkpoint.is_note_done("a.md", 1.0)
+    assert not checkpoint.is_note_done("a.md", 5.0)
+
+
+def test_new_manifest_resets_cursor_but_keeps_completed_notes():
+    checkpoint = IndexingCheckpoint(fingerprint=FINGERPRINT)
+    checkpoint.start_manifest("m1", batch_size=2, total_batches=2)
+    checkpoint.mark_batch(0, {"a.md": 1.0})
+
+    checkpoint.start_manifest("m2", batch_size=2, total_batches=3)
+
+    assert checkpoint.batch_cursor == 0
+    assert checkpoint.total_batches == 3
+    assert checkpoint.is_note_done("a.md", 1.0)
+
+
+def test_clear_checkpoint(tmp_path):
+    save_checkpoint(str(tmp_path), IndexingCheckpoint(fingerprint=FINGERPRINT))
+    clear_checkpoint(str(tmp_path))
+
+    assert load_checkpoint(str(tmp_path)) is None
@@ -0,0 +1,117 @@
+"""MicroBatcher / AsyncMicroBatcher 묶음 실행, 실패 전파, 취소 테스트"""
+import asyncio
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from src.utils.micro_batcher import AsyncMicroBatcher, MicroBatcher
+
+
+def test_requests_queued_during_a_batch_run_together():
+    batches = []
+    release = threading.Event()
+
+    def process(items):
+        batches.append(list(items))
+        release.wait(1)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, name="test_greedy", max_batch_size=8)
+    first = batcher.submit(0)
+    time.sleep(0.05)  # 첫 요청은 대기 없이 바로 실행됨
+    rest = [batcher.submit(i) for i in range(1, 4)]
+    release.set()
+
+    assert [future.result(1) for future in [first, *rest]] == [0, 2, 4, 6]
+    assert batches == [[0], [1, 2, 3]]
+
+
+def test_max_batch_size_splits_batches():
+    batches = []
+    gate = threading.Event()
+
+    def process(items):
+        gate.wait(1)
+        batches.append(list(items))
+        return items
+
+    batcher = MicroBatcher(process, name="test_split", max_batch_size=2)
+    futures = [batcher.submit(i) for i in range(5)]
+    gate.set()
+
+    assert [future.result(1) for future in futures] == list(range(5))
+    assert all(len(batch) <= 2 for batch in batches)
+
+
+def test_batch_failure_is_raised_to_each_caller_and_worker_survives():
+    def process(items):
+        if "bad" in items:
+            raise ValueError("boom")
+        return items
+
+    batcher = MicroBatcher(process, name="test_fail")
+    with pytest.raises(ValueError):
+        batcher.run("bad", timeout=1)
+    assert batcher.run("ok", timeout=1) == "ok"
+
+
+def test_timed_out_request_is_cancelled_before_it_runs():
+    processed = []
+    release = threading.Event()
+
+    def process(items):
+        release.wait(1)
+        processed.extend(items)
+        return items
+
+    batcher = MicroBatcher(process, name="test_timeout")
+    blocker = batcher.submit("blocker")
+    time.sleep(0.05)
+    with pytest.raises(FutureTimeoutError):
+        batcher.run("late", timeout=0.05)
+    release.set()
+    blocker.result(1)
+    assert batcher.run("next", timeout=1) == "next"
+
+    assert "late" not in processed
+
+
+def test_async_batcher_batches_one_loop_tick_and_skips_cancelled():
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        await asyncio.sleep(0.02)
+        return [item * 10 for item in items]
+
+    batcher = AsyncMicroBatcher(process, name="test_async", max_batch_size=8)
+
+    async def main():
+        first = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        running = asyncio.ensure_future(batcher.submit(100))
+        await asyncio.sleep(0.005)
+        cancelled = asyncio.ensure_future(batcher.submit(200))
+        kept = asyncio.ensure_future(batcher.submit(300))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return first, await running, await kept
+
+    first, running, kept = asyncio.run(main())
+
+    assert first == [0, 10, 20]
+    assert (running, kept) == (1000, 3000)
+    assert batches == [[0, 1, 2], [100], [300]]
+
+
+def test_async_batch_failure_is_raised_to_callers():
+    async def process(items):
+        raise ValueError("boom")
+
+    batcher = AsyncMicroBatcher(process, name="test_async_fail")
+
+    async def main():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main()))
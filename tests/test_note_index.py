@@ -0,0 +1,137 @@
+"""노트 오프셋 인덱스의 섹션 범위, UTF-8 경계 읽기, 파일 변경 시 재생성 테스트"""
+import os
+
+import pytest
+
+from src.obsidian.note_index import (
+    NoteIndexStore, build_note_index, read_lines, read_range, utf8_boundary,
+)
+
+NOTE = """---
+title: 주간 회의
+tags: meeting
+---
+# 회의
+
+개요 문단
+
+## 결정 사항
+
+- 배포는 금요일
+
+```python
+# 코드 블록 안의 주석은 헤딩이 아님
+```
+
+## 후속 작업
+
+- 문서 정리
+
+# 부록
+
+끝
+"""
+
+
+@pytest.fixture
+def note_path(tmp_path):
+    path = tmp_path / "note.md"
+    path.write_bytes(NOTE.encode("utf-8"))
+    return str(path)
+
+
+def test_frontmatter_and_headings_are_indexed(note_path):
+    index = build_note_index(note_path)
+
+    assert index.title == "주간 회의"
+    assert index.metadata["tags"] == "meeting"
+    assert read_range(note_path, index.body_offset, index.body_offset + 8).startswith("# 회의")
+    assert [section.path for section in index.sections] == [
+        "회의", "회의 > 결정 사항", "회의 > 후속 작업", "부록",
+    ]
+
+
+def test_section_read_stops_at_next_heading_of_same_level(note_path):
+    index = build_note_index(note_path)
+    section = index.find_section("회의 > 결정 사항")
+
+    text = read_range(note_path, section.start, section.end)
+    assert text.startswith("## 결정 사항")
+    assert "배포는 금요일" in text
+    assert "후속 작업" not in text
+
+    parent = index.find_section("회의")
+    assert "문서 정리" in read_range(note_path, parent.start, parent.end)
+    assert "끝" not in read_range(note_path, parent.start, parent.end)
+
+
+def test_find_section_matches_path_suffix_and_partial_title(note_path):
+    index = build_note_index(note_path)
+
+    assert index.find_section("후속 작업").path == "회의 > 후속 작업"
+    assert index.find_section("## 결정").title == "결정 사항"
+    assert index.find_section("없는 섹션") is None
+
+
+def test_section_at_returns_deepest_section(note_path):
+    index = build_note_index(note_path)
+    offset = NOTE.encode("utf-8").index("배포는".encode("utf-8"))
+
+    assert index.section_at(offset).title == "결정 사항"
+    assert index.section_at(0) is None
+
+
+def test_utf8_boundary_snaps_to_character_start(tmp_path):
+    path = tmp_path / "utf8.md"
+    path.write_bytes("가나다".encode("utf-8"))  # 문자당 3바이트
+
+    assert utf8_boundary(str(path), 4) == 3
+    assert utf8_boundary(str(path), 5) == 3
+    assert utf8_boundary(str(path), 3) == 3
+    assert utf8_boundary(str(path), 9) == 9
+
+
+def test_paged_reads_on_snapped_boundaries_keep_every_character(tmp_path):
+    text = "한글 노트 본문입니다. " * 20
+    path = tmp_path / "paged.md"
+    path.write_bytes(text.encode("utf-8"))
+    size = os.path.getsize(path)
+
+    pages, start = [], 0
+    while start < size:
+        end = utf8_boundary(str(path), min(start + 10, size))
+        if end <= start:
+            end = min(start + 10, size)
+        pages.append(read_range(str(path), start, end))
+        start = end
+
+    assert "".join(pages) == text
+
+
+def test_read_lines_uses_checkpoints_and_respects_max_bytes(tmp_path):
+    path = tmp_path / "lines.md"
+    path.write_text("".join(f"줄 {n}\n" for n in range(1, 601)), encoding="utf-8")
+    index = build_note_index(str(path))
+
+    text, last = read_lines(str(path), index, 300, 302, max_bytes=1000)
+    assert text == "줄 300\n줄 301\n줄 302\n"
+    assert last == 302
+
+    text, last = read_lines(str(path), index, 300, 302, max_bytes=10)
+    assert text == "줄 300\n"
+    assert last == 300
+
+
+def test_store_persists_and_rebuilds_when_file_changes(tmp_path, note_path):
+    store = NoteIndexStore(str(tmp_path / "note_index"))
+    first = store.get(note_path)
+    assert len(os.listdir(tmp_path / "note_index")) == 1
+
+    # 새 저장소는 메모리 캐시 없이 저장된 JSON을 읽음
+    assert NoteIndexStore(str(tmp_path / "note_index")).get(note_path) == first
+
+    with open(note_path, "a", encoding="utf-8") as f:
+        f.write("\n# 추가\n")
+    rebuilt = store.get(note_path)
+    assert rebuilt.sections[-1].title == "추가"
+    assert rebuilt.size > first.size
@@ -0,0 +1,104 @@
+"""QuantizedIndex 추가/삭제/압축 정리/재로드와 recall 테스트"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.vectorstore.quantized_index import QuantizedIndex
+
+
+def _vectors(n: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_search_finds_exact_vector_first(tmp_path, quantization):
+    vectors = _vectors(200)
+    index = QuantizedIndex(str(tmp_path), quantization=quantization)
+    index.add([f"doc{i}" for i in range(200)], vectors.tolist())
+    index.save()
+
+    results = index.search(vectors[17].tolist(), k=3)
+
+    assert results[0][0] == "doc17"
+    assert results[0][1] == pytest.approx(0.0, abs=1e-3)  # 코사인 거리
+    assert [distance for _, distance in results] == sorted(distance for _, distance in results)
+
+
+def test_rescore_false_returns_first_pass_without_reading_full_vectors(tmp_path):
+    vectors = _vectors(100)
+    index = QuantizedIndex(str(tmp_path), quantization="int8")
+    index.add([f"doc{i}" for i in range(100)], vectors.tolist())
+    index.save()
+    index._exact_scores = lambda *_: pytest.fail("rescore=False에서 원본 벡터를 읽음")
+
+    results = index.search(vectors[5].tolist(), k=5, rescore=False)
+
+    assert results[0][0] == "doc5"
+    assert results[0][1] == pytest.approx(0.0, abs=0.02)
+
+
+def test_append_persists_across_reload_and_drops_uncommitted_tail(tmp_path):
+    vectors = _vectors(20)
+    index = QuantizedIndex(str(tmp_path), quantization="int8")
+    index.add([f"doc{i}" for i in range(10)], vectors[:10].tolist())
+    index.save()
+    # save() 없이 추가된 행은 확정되지 않은 꼬리로 남음
+    index.add([f"doc{i}" for i in range(10, 20)], vectors[10:].tolist())
+    index.close()
+
+    reloaded = QuantizedIndex(str(tmp_path), quantization="int8")
+
+    assert reloaded.size == 10
+    assert reloaded.search(vectors[3].tolist(), k=1)[0][0] == "doc3"
+    assert all(doc_id != "doc15" for doc_id, _ in reloaded.search(vectors[15].tolist(), k=10))
+
+
+def test_re_adding_an_id_replaces_the_previous_vector(tmp_path):
+    vectors = _vectors(3)
+    index = QuantizedIndex(str(tmp_path), quantization="int8")
+    index.add(["a", "b"], vectors[:2].tolist())
+    index.add(["a"], [vectors[2].tolist()])
+    index.save()
+
+    assert index.size == 2
+    assert index.search(vectors[2].tolist(), k=1)[0][0] == "a"
+    assert [doc_id for doc_id, _ in index.search(vectors[0].tolist(), k=2)].count("a") == 1
+
+
+def test_compaction_rewrites_generation_after_many_removals(tmp_path):
+    vectors = _vectors(400)
+    index = QuantizedIndex(str(tmp_path), quantization="int8")
+    index.add([f"doc{i}" for i in range(400)], vectors.tolist())
+    index.save()
+
+    index.remove([f"doc{i}" for i in range(300)])
+    index.save()
+
+    with open(tmp_path / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["generation"] == 1
+    assert meta["rows"] == 100 and meta["dead"] == 0
+    assert not any(name.split(".")[1] == "0" for name in os.listdir(tmp_path) if name != "meta.json")
+
+    reloaded = QuantizedIndex(str(tmp_path), quantization="int8")
+    assert reloaded.size == 100
+    assert reloaded.search(vectors[350].tolist(), k=1)[0][0] == "doc350"
+    assert all(not doc_id.startswith("doc1") or int(doc_id[3:]) >= 300
+               for doc_id, _ in reloaded.search(vectors[10].tolist(), k=20))
+
+
+@pytest.mark.parametrize("quantization,minimum", [("int8", 0.95), ("binary", 0.7)])
+def test_rescored_recall_against_brute_force(tmp_path, quantization, minimum):
+    vectors = _vectors(1000, dim=64)
+    index = QuantizedIndex(str(tmp_path), quantization=quantization)
+    index.add([f"doc{i}" for i in range(1000)], vectors.tolist())
+    index.save()
+
+    queries = _vectors(20, dim=64, seed=1)
+    report = index.evaluate_recall(queries.tolist(), k=10)
+
+    assert report["queries"] == 20
+    assert report["rescored_recall"] >= minimum
+    assert report["rescored_recall"] >= report["first_pass_recall"]
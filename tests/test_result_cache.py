@@ -0,0 +1,52 @@
+"""ResultCache 인덱스 버전 무효화와 LRU 동작 테스트"""
+from src.utils.result_cache import ResultCache, make_cache_key
+
+
+def test_hit_for_normalized_query_on_same_version():
+    cache = ResultCache(max_entries=4, name="test_hit")
+    cache.get(make_cache_key("회의  일정 ", 5), "v1")
+    cache.put(make_cache_key("회의 일정", 5), "v1", ["result"])
+
+    assert cache.get(make_cache_key(" 회의 일정", 5), "v1") == ["result"]
+    assert cache.get(make_cache_key("회의 일정", 10), "v1") is None
+
+
+def test_index_version_change_invalidates_all_entries():
+    cache = ResultCache(max_entries=4, name="test_version")
+    key = make_cache_key("query", 5)
+    cache.get(key, "v1")
+    cache.put(key, "v1", "old")
+
+    assert cache.get(key, "v2") is None
+    assert len(cache) == 0
+    assert cache.stats()["invalidations"] == 1
+    # 다시 이전 버전으로 조회해도 지워진 결과는 돌아오지 않음
+    assert cache.get(key, "v1") is None
+
+
+def test_put_with_stale_version_is_ignored():
+    cache = ResultCache(max_entries=4, name="test_stale")
+    key = make_cache_key("query", 5)
+    cache.get(key, "v1")
+    # 검색 도중 다른 요청이 새 버전으로 캐시를 갱신한 경우
+    cache.get(make_cache_key("other", 5), "v2")
+
+    cache.put(key, "v1", "stale")
+
+    assert cache.get(key, "v2") is None
+
+
+def test_filters_are_order_independent_and_lru_evicts_oldest():
+    assert make_cache_key("q", 5, {"a": 1, "b": 2}) == make_cache_key("q", 5, {"b": 2, "a": 1})
+
+    cache = ResultCache(max_entries=2, name="test_lru")
+    keys = [make_cache_key(f"q{i}", 5) for i in range(3)]
+    cache.get(keys[0], "v1")
+    cache.put(keys[0], "v1", 0)
+    cache.put(keys[1], "v1", 1)
+    cache.get(keys[0], "v1")  # q0을 최근 사용으로
+    cache.put(keys[2], "v1", 2)
+
+    assert cache.get(keys[0], "v1") == 0
+    assert cache.get(keys[1], "v1") is None
+    assert cache.stats()["evictions"] == 1
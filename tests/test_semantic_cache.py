@@ -0,0 +1,64 @@
+"""SemanticQueryCache 유사도 임계값, 결과 종류/개수, 버전 무효화 테스트"""
+import numpy as np
+
+from src.vectorstore.semantic_cache import SemanticQueryCache
+
+
+def _rotated(base: np.ndarray, other: np.ndarray, cosine: float) -> list:
+    """base와의 코사인 유사도가 cosine인 단위 벡터 (other는 base와 직교)"""
+    return (cosine * base + np.sqrt(1 - cosine ** 2) * other).tolist()
+
+
+BASE = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+ORTHOGONAL = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+
+
+def _cache_with_entry(threshold: float) -> SemanticQueryCache:
+    cache = SemanticQueryCache(max_entries=4, threshold=threshold)
+    cache.lookup(BASE.tolist(), k=5, kind="vector", version="v1")
+    cache.store(BASE.tolist(), k=5, kind="vector", version="v1", results=list(range(5)))
+    return cache
+
+
+def test_hit_only_at_or_above_threshold():
+    cache = _cache_with_entry(threshold=0.95)
+
+    assert cache.lookup(_rotated(BASE, ORTHOGONAL, 0.97), k=5, kind="vector", version="v1") == list(range(5))
+    assert cache.lookup(_rotated(BASE, ORTHOGONAL, 0.90), k=5, kind="vector", version="v1") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_scaled_embedding_is_the_same_query():
+    cache = _cache_with_entry(threshold=0.99)
+
+    assert cache.lookup((BASE * 10).tolist(), k=5, kind="vector", version="v1") == list(range(5))
+
+
+def test_kind_and_k_must_be_compatible():
+    cache = _cache_with_entry(threshold=0.95)
+
+    assert cache.lookup(BASE.tolist(), k=3, kind="vector", version="v1") == [0, 1, 2]
+    assert cache.lookup(BASE.tolist(), k=10, kind="vector", version="v1") is None
+    assert cache.lookup(BASE.tolist(), k=5, kind="rerank:20", version="v1") is None
+
+
+def test_version_change_clears_entries_and_stale_store_is_ignored():
+    cache = _cache_with_entry(threshold=0.95)
+
+    assert cache.lookup(BASE.tolist(), k=5, kind="vector", version="v2") is None
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+    cache.store(BASE.tolist(), k=5, kind="vector", version="v1", results=["stale"])
+    assert cache.lookup(BASE.tolist(), k=1, kind="vector", version="v2") is None
+
+
+def test_ring_buffer_overwrites_oldest_entry():
+    cache = SemanticQueryCache(max_entries=2, threshold=0.99)
+    vectors = np.eye(3, dtype=np.float32)
+    cache.lookup(vectors[0].tolist(), k=1, kind="vector", version="v1")
+    for i, vector in enumerate(vectors):
+        cache.store(vector.tolist(), k=1, kind="vector", version="v1", results=[i])
+
+    assert cache.lookup(vectors[0].tolist(), k=1, kind="vector", version="v1") is None
+    assert cache.lookup(vectors[2].tolist(), k=1, kind="vector", version="v1") == [2]
@@ -0,0 +1,82 @@
+"""SingleFlight 동시 요청 합치기와 취소 테스트"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight("test_threads")
+    calls = []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["result"] * 5
+    assert flight.stats()["shared"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_exception_is_raised_to_every_caller():
+    flight = SingleFlight("test_error")
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    # 실패한 요청은 남지 않고 다음 호출이 다시 실행됨
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight("test_cancel")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flight.ado("key", work))
+        second = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "result"
+    assert calls == [1]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_async_calls_with_different_keys_run_separately():
+    flight = SingleFlight("test_keys")
+
+    async def main():
+        return await asyncio.gather(flight.ado("a", lambda: asyncio.sleep(0, "a")),
+                                    flight.ado("b", lambda: asyncio.sleep(0, "b")),
+                                    flight.ado("a", lambda: asyncio.sleep(0, "other")))
+
+    assert asyncio.run(main()) == ["a", "b", "a"]
+    assert flight.stats()["leaders"] == 2